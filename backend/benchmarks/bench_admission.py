@@ -0,0 +1,119 @@
+"""When admission control turns the worker full, against when loop lag breaks.
+
+Starts synthetic sessions one at a time, each a process whose event loop
+handles a 32 ms audio frame every 32 ms and spends ``--work-ms`` of CPU on
+it, with the agent's ``LoopLagMonitor`` and ``LoadReporter``. After each new
+session settles for ``--settle`` seconds it reports the worker's load as the
+``AdmissionController`` computes it, whether the worker would still accept a
+session, the limiting resource, and the worst session's measured p95 loop
+lag. Sessions keep being added past the point the worker reports full, to
+show where the lag target would have broken.
+
+    uv run python benchmarks/bench_admission.py --work-ms 8 --max-sessions 16
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from wellness.admission import (
+    AdmissionController,
+    AdmissionLimits,
+    LoadReporter,
+    read_reports,
+)
+from wellness.latency import LoopLagMonitor
+
+FRAME = 0.032
+
+
+def session(directory: str, job_id: str, work: float) -> None:
+    async def run():
+        lag = LoopLagMonitor(interval=0.01)
+        lag.start()
+        reporter = LoadReporter(directory, job_id, lag, interval=0.5)
+        reporter.start()
+        loop = asyncio.get_running_loop()
+        next_frame = loop.time()
+        while True:
+            next_frame += FRAME
+            busy_until = time.process_time() + work
+            while time.process_time() < busy_until:
+                pass
+            await asyncio.sleep(max(0.0, next_frame - loop.time()))
+
+    asyncio.run(run())
+
+
+def main(args):
+    directory = tempfile.mkdtemp(prefix="wellness-load-")
+    limits = AdmissionLimits(
+        cpu=args.cpu, loop_lag=args.loop_lag_ms / 1000, session_cpu=0.0
+    )
+    controller = AdmissionController(limits, directory, threshold=args.threshold)
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    full_at = broken_at = None
+    print(
+        f"{args.work_ms}ms CPU per {FRAME * 1000:.0f}ms frame, {os.cpu_count()} CPUs, "
+        f"limits cpu={args.cpu:.0%} loop_lag_p95={args.loop_lag_ms:.0f}ms"
+    )
+    print(
+        f"{'sessions':>8} {'load':>6} {'accepts':>8} {'limit by':>9} "
+        f"{'cpu':>6} {'lag':>6} {'lag p95':>8}"
+    )
+    try:
+        for n in range(1, args.max_sessions + 1):
+            proc = ctx.Process(
+                target=session,
+                args=(directory, f"job-{n}", args.work_ms / 1000),
+                daemon=True,
+            )
+            proc.start()
+            procs.append(proc)
+            time.sleep(args.settle)
+
+            load = controller.load()
+            pressures = controller.pressures
+            limit_by = max(pressures, key=pressures.get)
+            reports = read_reports(directory, stale_after=2.0)
+            lag_p95 = max((r["lag_p95"] for r in reports), default=0.0)
+            if full_at is None and not controller.available:
+                full_at = n
+            if broken_at is None and lag_p95 > limits.loop_lag:
+                broken_at = n
+            print(
+                f"{n:>8} {load:6.2f} {'yes' if controller.available else 'no':>8} "
+                f"{limit_by:>9} {pressures['cpu']:6.2f} {pressures['loop_lag']:6.2f} "
+                f"{lag_p95 * 1000:6.1f}ms"
+            )
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.join()
+        shutil.rmtree(directory, ignore_errors=True)
+    print(
+        f"Full with {full_at or '-'} sessions running; "
+        f"p95 lag over {args.loop_lag_ms:.0f}ms with {broken_at or '-'}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--work-ms", type=float, default=8.0)
+    parser.add_argument("--max-sessions", type=int, default=16)
+    parser.add_argument("--settle", type=float, default=3.0)
+    parser.add_argument("--cpu", type=float, default=0.75)
+    parser.add_argument("--loop-lag-ms", type=float, default=100.0)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    main(parser.parse_args())
@@ -0,0 +1,97 @@
+"""Time of the analytics reports over millions of synthetic check-ins.
+
+Builds ``--count`` check-ins by ``--users`` users over a year straight into
+``CheckinColumns``, then times each report. ``--sqlite N`` also writes N
+of them to a temporary SQLite store and times loading them back as
+columns, the step the ``analytics`` subcommand starts with.
+
+    uv run python benchmarks/bench_analytics.py --count 2000000
+    uv run python benchmarks/bench_analytics.py --sqlite 200000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from wellness import CheckinColumns, SQLiteStore
+from wellness.analytics import History
+
+START = datetime.datetime(2025, 1, 1).timestamp()
+YEAR = 365 * 86400
+
+
+def synthetic(n: int, users: int, seed: int = 0) -> CheckinColumns:
+    """``n`` check-ins with ratings drifting around a per-user mean"""
+    rng = np.random.default_rng(seed)
+    user = rng.integers(users, size=n)
+    base = rng.integers(2, 5, size=(3, users))
+    ratings = np.clip(base[:, user] + rng.integers(-1, 2, size=(3, n)), 1, 5)
+    timestamps = np.sort(START + rng.random(n) * YEAR)
+
+    columns = CheckinColumns()
+    columns.timestamps.frombytes(timestamps.tobytes())
+    for name, values in zip(("mood", "energy", "stress"), ratings):
+        getattr(columns, name).frombytes(values.astype(np.uint8).tobytes())
+    columns.user_ids.frombytes((user + 1).astype(np.uint32).tobytes())
+    columns.goals.frombytes(np.zeros(n, np.uint32).tobytes())
+    columns.summaries.frombytes(np.zeros(n, np.uint32).tobytes())
+    columns.strings += [f"user-{i}" for i in range(users)]
+    return columns
+
+
+def load_sqlite(columns: CheckinColumns, n: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStore(os.path.join(tmp, "wellness.db"))
+        for i in range(n):
+            store.append(columns[i].to_dict())
+        store.sync()
+        t0 = time.perf_counter()
+        loaded = store.columns()
+        elapsed = time.perf_counter() - t0
+        store.close()
+    print(
+        f"sqlite load: {len(loaded)} check-ins in {elapsed:.2f}s "
+        f"({len(loaded) / elapsed:.0f}/s)"
+    )
+
+
+def main(args):
+    t0 = time.perf_counter()
+    columns = synthetic(args.count, args.users)
+    print(
+        f"{args.count} check-ins by {args.users} users "
+        f"(generated in {time.perf_counter() - t0:.2f}s)"
+    )
+
+    t0 = time.perf_counter()
+    history = History(columns)
+    print(f"{'history':>10} {time.perf_counter() - t0:6.2f}s")
+    reports = {
+        "weekly": history.weekly_trends,
+        "cohorts": history.cohort_averages,
+        "anomalies": history.anomalies,
+    }
+    for name, report in reports.items():
+        t0 = time.perf_counter()
+        rows = report()
+        print(f"{name:>10} {time.perf_counter() - t0:6.2f}s {len(rows):9d} rows")
+
+    if args.sqlite:
+        load_sqlite(columns, min(args.sqlite, args.count))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument(
+        "--sqlite", type=int, default=0, help="also time loading N from SQLite"
+    )
+    main(parser.parse_args())
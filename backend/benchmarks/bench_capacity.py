@@ -0,0 +1,196 @@
+"""How many concurrent check-ins one worker process sustains.
+
+Starts N simulated sessions in one event loop, each a full ``AgentSession``
+with its own ``WellnessCompanion`` and the offline stand-ins from
+``fakes.py``, sharing one check-in store and writer like the jobs of a
+worker process. For every N it reports turn latency, event-loop lag and
+memory per session (RSS and tracemalloc), and the largest N whose p95 turn
+latency stayed within ``--tolerance`` of the first level (or ``--slo-ms``).
+
+    uv run python benchmarks/bench_capacity.py --sessions 1 5 10 25 50
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_session import open_store, run_conversation
+from fakes import PROFILES
+
+from wellness import PersistenceWriter
+from wellness.latency import LatencyAggregator, LogHistogram
+
+
+async def watch_loop_lag(lag: LogHistogram, interval: float = 0.05) -> None:
+    """Record how late the event loop wakes up a task that sleeps ``interval``"""
+    while True:
+        t0 = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag.record(time.perf_counter() - t0 - interval)
+
+
+async def watch_rss(peak: list, interval: float = 0.2) -> None:
+    proc = psutil.Process()
+    while True:
+        peak[0] = max(peak[0], proc.memory_info().rss)
+        await asyncio.sleep(interval)
+
+
+async def run_level(n, store, writer, args, vad) -> dict:
+    """Run ``n`` concurrent check-ins and measure them"""
+    gc.collect()
+    rss_before = psutil.Process().memory_info().rss
+    rss_peak = [rss_before]
+    if args.tracemalloc:
+        tracemalloc.reset_peak()
+        traced_before = tracemalloc.get_traced_memory()[0]
+
+    latency = LatencyAggregator()
+    lag = LogHistogram()
+    watchers = [
+        asyncio.create_task(watch_loop_lag(lag)),
+        asyncio.create_task(watch_rss(rss_peak)),
+    ]
+
+    async def _session(i):
+        # Stagger starts so the sessions' turns do not line up exactly
+        await asyncio.sleep(args.pause * i / n)
+        return await run_conversation(
+            store,
+            PROFILES[args.profile],
+            latency,
+            user_id=f"capacity-{n}-{i}",
+            writer=writer,
+            vad=vad,
+            pause=args.pause,
+        )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_session(i) for i in range(n)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    for task in watchers:
+        task.cancel()
+    await writer.drain(timeout=10)
+
+    turns = LogHistogram()
+    failed = 0
+    for result in results:
+        if isinstance(result, BaseException) or not result["saved"]:
+            failed += 1
+            continue
+        for seconds in result["turns"]:
+            turns.record(seconds)
+
+    report = {
+        "sessions": n,
+        "failed": failed,
+        "turn_p50": turns.quantile(0.5),
+        "turn_p95": turns.quantile(0.95),
+        "lag_p99": lag.quantile(0.99),
+        "lag_max": lag.max,
+        "rss_per_session": (rss_peak[0] - rss_before) / n,
+        "elapsed": elapsed,
+        "stages": latency.summary(),
+    }
+    if args.tracemalloc:
+        report["traced_per_session"] = (
+            tracemalloc.get_traced_memory()[1] - traced_before
+        ) / n
+    return report
+
+
+async def main(args):
+    vad = None
+    if args.vad:
+        from livekit.plugins import silero
+
+        vad = silero.VAD.load()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    print(
+        f"profile={args.profile} pause={args.pause}s vad={args.vad} "
+        f"tracemalloc={args.tracemalloc}"
+    )
+    print(
+        f"{'sessions':>8} {'failed':>6} {'turn p50':>9} {'turn p95':>9} {'lag p99':>8} "
+        f"{'lag max':>8} {'RSS/sess':>9} {'traced/sess':>11}"
+    )
+    capacity, budget = 0, args.slo_ms / 1000 if args.slo_ms else None
+    with tempfile.TemporaryDirectory() as tmp:
+        store = open_store(args.backend, tmp, args.log_size)
+        writer = PersistenceWriter(store)
+        for n in args.sessions:
+            r = await run_level(n, store, writer, args, vad)
+            traced = r.get("traced_per_session")
+            print(
+                f"{n:>8} {r['failed']:>6} {r['turn_p50'] * 1000:7.0f}ms "
+                f"{r['turn_p95'] * 1000:7.0f}ms {r['lag_p99'] * 1000:6.1f}ms "
+                f"{r['lag_max'] * 1000:6.1f}ms {r['rss_per_session'] / 2**20:7.2f}MB "
+                + (f"{traced / 2**10:9.0f}KB" if traced is not None else f"{'-':>11}")
+            )
+            if args.stages:
+                print(f"{'':>9}{r['stages']}")
+            if budget is None:
+                budget = r["turn_p95"] * (1 + args.tolerance)
+            if r["failed"] or r["turn_p95"] > budget:
+                break
+            capacity = n
+        writer.close()
+        store.close()
+
+    if capacity:
+        print(
+            f"capacity: {capacity} concurrent sessions within p95 {budget * 1000:.0f}ms"
+        )
+    else:
+        print(
+            f"capacity: below {args.sessions[0]} sessions for p95 {budget * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 5, 10, 25, 50])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--backend", choices=["journal", "sqlite"], default="sqlite")
+    parser.add_argument("--log-size", type=int, default=10000)
+    parser.add_argument(
+        "--pause", type=float, default=2.0, help="user think time between turns"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed p95 turn latency growth over the first level",
+    )
+    parser.add_argument("--slo-ms", type=float, help="fixed p95 turn latency budget")
+    parser.add_argument(
+        "--no-vad", dest="vad", action="store_false", help="skip Silero VAD per session"
+    )
+    parser.add_argument(
+        "--no-tracemalloc",
+        dest="tracemalloc",
+        action="store_false",
+        help="faster, but no Python heap per session",
+    )
+    parser.add_argument(
+        "--stages", action="store_true", help="also print per-stage percentiles"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
@@ -0,0 +1,197 @@
+"""Time to first audio of Murf TTS within one job, with and without keep-alive.
+
+Runs the real ``murf.TTS`` client against a local mock of Murf's streaming
+websocket and HTTP synthesis endpoints. The mock adds ``--handshake-ms`` to
+the first request on each new connection, standing in for the TCP and TLS
+round trips to the real service, and ``--ttfb-ms`` before the first audio.
+
+One job's client runs ``--turns`` turns, ``--gap`` seconds apart, each
+streaming one reply and synthesizing one phrase:
+
+- ``keepalive``: the job's ``speech_session``, as the agent uses
+- ``no-keepalive``: a session that opens a new connection per request
+
+Connections live as long as the job, so only the turns after the first can
+reuse one; LiveKit starts every job in a fresh process.
+
+    uv run python benchmarks/bench_connections.py --turns 10 --gap 0.5
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from livekit.agents import APIError
+from livekit.plugins import murf
+
+from wellness.connections import ConnectionStats, speech_session
+
+SAMPLE_RATE = 24000
+REPLY = "Thanks for checking in today. How are you feeling this morning?"
+PHRASE = "Great, I've saved your check-in."
+
+
+class MockMurf:
+    """Murf's ``stream-input`` websocket and ``stream`` HTTP endpoints"""
+
+    def __init__(self, handshake: float, ttfb: float):
+        self.handshake = handshake
+        self.ttfb = ttfb
+        self.connections = 0
+        self._transports = set()
+        self._chunk = b"\x00\x00" * (SAMPLE_RATE // 50)
+
+    async def _new_connection(self, request):
+        if request.transport not in self._transports:
+            self._transports.add(request.transport)
+            self.connections += 1
+            await asyncio.sleep(self.handshake)
+
+    async def stream_input(self, request):
+        await self._new_connection(request)
+        socket = web.WebSocketResponse(timeout=0.5)
+        await socket.prepare(request)
+        audio = base64.b64encode(self._chunk).decode()
+        async for msg in socket:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            data = json.loads(msg.data)
+            if data.get("text"):
+                await asyncio.sleep(self.ttfb)
+                await socket.send_json(
+                    {"audio": audio, "context_id": data["context_id"]}
+                )
+            if data.get("end"):
+                await socket.send_json(
+                    {"final": True, "context_id": data["context_id"]}
+                )
+        return socket
+
+    async def stream(self, request):
+        await self._new_connection(request)
+        await request.json()
+        await asyncio.sleep(self.ttfb)
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        await resp.write(self._chunk * 5)
+        return resp
+
+    async def start(self) -> tuple[web.AppRunner, str]:
+        app = web.Application()
+        app.router.add_get("/v1/speech/stream-input", self.stream_input)
+        app.router.add_post("/v1/speech/stream", self.stream)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def build_tts(base_url: str, session: aiohttp.ClientSession) -> murf.TTS:
+    return murf.TTS(
+        api_key="mock",
+        base_url=base_url,
+        sample_rate=SAMPLE_RATE,
+        http_session=session,
+    )
+
+
+async def first_audio(stream) -> float:
+    t0 = time.perf_counter()
+    first = None
+    async for _ in stream:
+        if first is None:
+            first = time.perf_counter() - t0
+    return first
+
+
+async def one_turn(engine: murf.TTS) -> tuple[Optional[float], float]:
+    """Time to first audio of a streamed reply (None if it failed) and of a phrase"""
+    stream = engine.stream()
+    stream.push_text(REPLY)
+    stream.end_input()
+    try:
+        reply = await first_audio(stream)
+    except APIError:
+        reply = None
+    async with engine.synthesize(PHRASE) as chunked:
+        phrase = await first_audio(chunked)
+    return reply, phrase
+
+
+async def run(mode: str, base_url: str, args) -> tuple[list, list, str]:
+    replies, phrases = [], []
+    stats = ConnectionStats()
+    if mode == "keepalive":
+        session = speech_session(stats)
+    else:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(force_close=True)
+        )
+    engine = build_tts(base_url, session)
+    engine.prewarm()
+    for _ in range(args.turns):
+        await asyncio.sleep(args.gap)  # the user speaks
+        reply, phrase = await one_turn(engine)
+        replies.append(reply)
+        phrases.append(phrase)
+
+    await engine.aclose()
+    await session.close()
+    return replies, phrases, str(stats) if mode == "keepalive" else ""
+
+
+async def main(args):
+    logging.getLogger("livekit").setLevel(logging.CRITICAL)
+    logging.getLogger("livekit.plugins.murf").setLevel(logging.CRITICAL)
+    print(
+        f"{args.turns} turns {args.gap}s apart, handshake {args.handshake_ms}ms, "
+        f"ttfb {args.ttfb_ms}ms"
+    )
+    print(
+        f"{'mode':>12} {'reply p50':>10} {'reply max':>10} {'failed':>7} "
+        f"{'phrase 1st':>11} {'phrase p50':>11} {'conns':>6}"
+    )
+    for mode in args.modes:
+        server = MockMurf(args.handshake_ms / 1000, args.ttfb_ms / 1000)
+        runner, base_url = await server.start()
+        try:
+            replies, phrases, stats = await run(mode, base_url, args)
+        finally:
+            await runner.cleanup()
+        ok = [r for r in replies if r is not None] or [float("nan")]
+        print(
+            f"{mode:>12} {statistics.median(ok) * 1000:8.0f}ms {max(ok) * 1000:8.0f}ms "
+            f"{replies.count(None):7d} {phrases[0] * 1000:9.0f}ms "
+            f"{statistics.median(phrases[1:] or phrases) * 1000:9.0f}ms "
+            f"{server.connections:6d}"
+        )
+        if stats:
+            print(f"{'':>12} {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--gap", type=float, default=0.5)
+    parser.add_argument("--handshake-ms", type=float, default=150)
+    parser.add_argument("--ttfb-ms", type=float, default=80)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["keepalive", "no-keepalive"],
+        choices=["keepalive", "no-keepalive"],
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""Memory and load/serialize throughput of check-in representations.
+
+Compares, for N check-ins:
+
+- ``dict``: stored dicts with string values, to and from JSON lines (the
+  journal format)
+- ``record``: ``CheckinRecord`` objects, parsed from and written to the
+  same JSON lines
+- ``columns``: ``CheckinColumns``, loaded from JSON lines and to and from
+  their binary form
+
+Memory is measured with ``tracemalloc`` while the N check-ins are held.
+
+    uv run python benchmarks/bench_records.py --count 100000
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from wellness import CheckinColumns, CheckinRecord
+
+GOALS = ["walk, read", "meditate", "call mom, stretch", "finish report", "rest"]
+
+
+def sample(n: int) -> list[str]:
+    """JSON lines of ``n`` check-ins by 1000 users with a few recurring goals"""
+    start = datetime.datetime(2025, 1, 1)
+    return [
+        json.dumps(
+            {
+                "user_id": f"user-{i % 1000}",
+                "mood": str(i % 5 + 1),
+                "energy": str((i * 7) % 5 + 1),
+                "stress": str((i * 3) % 5 + 1),
+                "goals": GOALS[i % len(GOALS)],
+                "timestamp": (start + datetime.timedelta(minutes=i)).isoformat(),
+            }
+        )
+        for i in range(n)
+    ]
+
+
+def held_memory(build) -> tuple:
+    """Bytes allocated by ``build()`` and still held by its result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def rate(n: int, fn, repeat: int) -> float:
+    """Check-ins per second, best of ``repeat`` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return n / best
+
+
+def main(args):
+    n = args.count
+    lines = sample(n)
+
+    dicts, dict_bytes = held_memory(lambda: [json.loads(line) for line in lines])
+    records, record_bytes = held_memory(
+        lambda: [CheckinRecord.from_dict(json.loads(line)) for line in lines]
+    )
+    columns, column_bytes = held_memory(
+        lambda: CheckinColumns.from_dicts(json.loads(line) for line in lines)
+    )
+    blob = columns.to_bytes()
+
+    loads = {
+        "dict": lambda: [json.loads(line) for line in lines],
+        "record": lambda: [CheckinRecord.from_dict(json.loads(line)) for line in lines],
+        "columns": lambda: CheckinColumns.from_bytes(blob),
+    }
+    dumps = {
+        "dict": lambda: "\n".join(json.dumps(d) for d in dicts),
+        "record": lambda: "\n".join(json.dumps(r.to_dict()) for r in records),
+        "columns": columns.to_bytes,
+    }
+    sizes = {
+        "dict": len(dumps["dict"]()),
+        "record": len(dumps["record"]()),
+        "columns": len(blob),
+    }
+    memory = {"dict": dict_bytes, "record": record_bytes, "columns": column_bytes}
+
+    print(f"{n} check-ins, best of {args.repeat}")
+    print(
+        f"{'form':>8} {'memory':>10} {'B/check-in':>10} {'load/s':>11} "
+        f"{'serialize/s':>11} {'serialized':>10}"
+    )
+    for form in ("dict", "record", "columns"):
+        print(
+            f"{form:>8} {memory[form] / 2**20:8.1f}MB {memory[form] / n:10.0f} "
+            f"{rate(n, loads[form], args.repeat):11.0f} "
+            f"{rate(n, dumps[form], args.repeat):11.0f} {sizes[form] / 2**20:8.1f}MB"
+        )
+    print(
+        "columns from JSON lines: "
+        f"{rate(n, lambda: CheckinColumns.from_dicts(map(json.loads, lines)), args.repeat):.0f}/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,209 @@
+"""Disk usage and load time of check-in log layouts on a multi-year history.
+
+Writes ``--years`` of synthetic check-ins (``--per-day`` a day by
+``--users`` users) in each layout:
+
+- ``json``: the original single ``wellness_log.json`` array, loaded and
+  rewritten whole on every save
+- ``journal``: one ``CheckinJournal`` JSON Lines file with its index
+- ``segments``: a ``SegmentedJournalStore`` with daily gzip segments (and
+  zstd when the ``zstandard`` package is installed)
+
+For each it reports the size on disk, the time to save one more check-in,
+the time a session takes to start (open the store, then read the user's
+trend summary and last check-in) and the time to read the last week.
+
+    uv run python benchmarks/bench_segments.py --years 3 --per-day 100
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from wellness import CheckinJournal, SegmentedJournalStore
+
+GOALS = ["walk, read", "meditate", "call mom, stretch", "finish report", "rest"]
+
+
+def history(years: int, per_day: int, users: int, seed: int = 0) -> list[list[dict]]:
+    """Check-ins grouped by day, oldest first"""
+    rng = random.Random(seed)
+    start = datetime.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start -= datetime.timedelta(days=365 * years)
+    days = []
+    for day in range(365 * years):
+        base = start + datetime.timedelta(days=day)
+        offsets = sorted(rng.randrange(86400) for _ in range(per_day))
+        days.append(
+            [
+                {
+                    "user_id": f"user-{rng.randrange(users)}",
+                    "mood": str(rng.randint(1, 5)),
+                    "energy": str(rng.randint(1, 5)),
+                    "stress": str(rng.randint(1, 5)),
+                    "goals": rng.choice(GOALS),
+                    "summary": "Checked in and set a couple of goals for the day.",
+                    "timestamp": (base + datetime.timedelta(seconds=s)).isoformat(),
+                }
+                for s in offsets
+            ]
+        )
+    return days
+
+
+def disk_usage(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    """Median seconds of ``fn()`` over ``repeat`` runs"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+class JsonLog:
+    """The original log: one JSON array, read and rewritten whole"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> list:
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def append(self, record: dict) -> None:
+        records = self.load() if os.path.exists(self.path) else []
+        records.append(record)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+
+
+def main(args):
+    days = history(args.years, args.per_day, args.users)
+    records = [r for day in days for r in day]
+    user = records[-1]["user_id"]
+    extra = dict(records[-1], mood="3")
+    week_ago = time.time() - 7 * 86400
+    week_iso = datetime.datetime.fromtimestamp(week_ago).isoformat()
+    print(
+        f"{len(records)} check-ins over {args.years} years by {args.users} users, "
+        f"median of {args.repeat}"
+    )
+
+    compressions = ["gzip"]
+    try:
+        import zstandard  # noqa: F401
+
+        compressions.append("zstd")
+    except ImportError:
+        pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        layouts = {}
+
+        path = os.path.join(tmp, "wellness_log.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        log = JsonLog(path)
+
+        def json_start():
+            history = log.load()
+            mine = [r for r in history if r.get("user_id") == user]
+            return mine[-1]
+
+        def json_week():
+            return [r for r in log.load() if r["timestamp"] >= week_iso]
+
+        layouts["json"] = (path, lambda: log.append(extra), json_start, json_week)
+
+        path = os.path.join(tmp, "wellness_log.jsonl")
+        journal = CheckinJournal(path)
+        for day in days:
+            journal.append_many(day)
+        journal.trend(user)
+        journal.close()
+
+        def journal_start():
+            store = CheckinJournal(path)
+            store.trend(user)
+            store.last(1, user_id=user)
+            store.close()
+
+        def journal_week():
+            store = CheckinJournal(path)
+            list(store.between(week_ago, float("inf")))
+            store.close()
+
+        layouts["journal"] = (
+            path,
+            lambda: journal.append(extra),
+            journal_start,
+            journal_week,
+        )
+
+        for compression in compressions:
+            seg_path = os.path.join(tmp, f"segments-{compression}")
+            t0 = time.perf_counter()
+            segments = SegmentedJournalStore(seg_path, compression=compression)
+            for day in days:
+                segments.append_many(day)
+            segments.trend(user)
+            built = time.perf_counter() - t0
+            print(f"segments-{compression}: written in {built:.1f}s")
+
+            def segments_start(seg_path=seg_path, compression=compression):
+                store = SegmentedJournalStore(seg_path, compression=compression)
+                store.trend(user)
+                store.last(1, user_id=user)
+                store.close()
+
+            def segments_week(seg_path=seg_path, compression=compression):
+                store = SegmentedJournalStore(seg_path, compression=compression)
+                list(store.between(week_ago, float("inf")))
+                store.close()
+
+            layouts[f"segments-{compression}"] = (
+                seg_path,
+                lambda segments=segments: segments.append(extra),
+                segments_start,
+                segments_week,
+            )
+
+        print(
+            f"{'layout':>14} {'disk':>9} {'save':>9} {'session start':>14} "
+            f"{'last week':>10}"
+        )
+        for name, (path, save, start, week) in layouts.items():
+            size = disk_usage(path)
+            print(
+                f"{name:>14} {size / 2**20:7.1f}MB {timed(save, args.repeat) * 1000:7.2f}ms "
+                f"{timed(start, args.repeat) * 1000:12.2f}ms "
+                f"{timed(week, args.repeat) * 1000:8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--per-day", type=int, default=100)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,351 @@
+"""Turn latency of a scripted check-in conversation, fully offline.
+
+Runs ``WellnessCompanion`` in a real ``AgentSession`` with the stand-in STT,
+LLM and TTS from ``fakes.py``, replaying a check-in that calls every tool.
+The conversation is repeated against stores pre-filled with a growing number
+of check-ins to show how storage cost grows with the log.
+
+With ``--modes`` it instead compares how a message giving all three ratings
+at once is recorded: one ``update_checkin`` call per field (``single``), one
+``update_checkin_fields`` call (``batched``) or the transcript extractor
+without any tool call (``fast-path``).
+
+    uv run python benchmarks/bench_session.py --profile typical --sizes 1 1000 100000
+    uv run python benchmarks/bench_session.py --modes single batched fast-path
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fakes import (
+    PROFILES,
+    FakeAudioOutput,
+    FakeSTT,
+    FakeTTS,
+    LatencyProfile,
+    Reply,
+    ScriptedLLM,
+    SilentAudioInput,
+)
+from livekit.agents import NOT_GIVEN, AgentSession
+from livekit.agents.vad import VAD
+
+from agent import WellnessCompanion
+from wellness import (
+    CheckinJournal,
+    CheckinStore,
+    PersistenceWriter,
+    SQLiteStore,
+)
+from wellness.latency import LatencyAggregator
+from wellness.speculative import SpeculativeSpeech
+from wellness.tts_cache import PhraseCache
+
+USER = "bench-user"
+
+# What the user says, and the LLM's tool calls and answer
+CHECKIN_SCRIPT = {
+    "Hi, I'm ready for my check-in.": Reply(
+        "Welcome back! How is your mood today, from one to five?",
+        [("get_last_checkin", {})],
+    ),
+    "I'd say a four.": Reply(
+        "Glad to hear it. And your energy and stress?",
+        [("update_checkin", {"field": "mood", "value": "4"})],
+    ),
+    "Energy is three and stress is two.": Reply(
+        "Thanks. What would you like to get done today?",
+        [
+            ("update_checkin", {"field": "energy", "value": "3"}),
+            ("update_checkin", {"field": "stress", "value": "2"}),
+        ],
+    ),
+    "Go for a walk and read a chapter.": Reply(
+        "Lovely goals. Short walks are a great way to reset.",
+        [("update_checkin", {"field": "goals", "value": "walk, read a chapter"})],
+    ),
+    "Can you recap?": Reply(
+        "You feel good, with moderate energy and low stress. See you tomorrow!",
+        [("get_checkin", {})],
+    ),
+}
+
+
+RATINGS = "Mood's good, energy's low, and I'm a bit stressed."
+# Gemini's reply to RATINGS, recorded without asking it for the recap
+# (benchmarks/data/llm_streams.jsonl), against which the recap is speculated
+RATINGS_ANSWER = (
+    "Got it, mood four, energy two and a bit of stress. Low energy days happen, "
+    "so let's keep the plan light. What is one thing you'd like to do?"
+)
+RATINGS_FIELDS = {"mood": "4", "energy": "2", "stress": "2"}
+MODES = ("single", "batched", "fast-path")
+
+
+def mode_script(mode: str) -> dict[str, Reply]:
+    """The check-in with all ratings in one message, recorded as ``mode`` does"""
+    greeting, _, _, goals, recap = CHECKIN_SCRIPT
+    if mode == "single":
+        first, *rest = [
+            [("update_checkin", {"field": field, "value": value})]
+            for field, value in RATINGS_FIELDS.items()
+        ]
+        reply = Reply(RATINGS_ANSWER, first, rest)
+    elif mode == "batched":
+        # Strict tool schemas make the model pass null for unmentioned fields
+        fields = dict(RATINGS_FIELDS, goals=None, summary=None)
+        reply = Reply(RATINGS_ANSWER, [("update_checkin_fields", fields)])
+    else:
+        reply = Reply(RATINGS_ANSWER)
+    return {
+        greeting: CHECKIN_SCRIPT[greeting],
+        RATINGS: reply,
+        goals: CHECKIN_SCRIPT[goals],
+        recap: CHECKIN_SCRIPT[recap],
+    }
+
+
+def open_store(backend: str, directory: str, size: int) -> CheckinStore:
+    """A store holding ``size`` check-ins, every tenth by the bench user"""
+    if backend == "sqlite":
+        store = SQLiteStore(os.path.join(directory, "wellness.db"))
+    else:
+        store = CheckinJournal(os.path.join(directory, "wellness_log.jsonl"))
+
+    start = datetime.datetime(2025, 1, 1)
+    batch = []
+    for i in range(size):
+        batch.append(
+            {
+                "user_id": USER if i % 10 == 0 else f"user-{i % 997}",
+                "mood": str(i % 5 + 1),
+                "energy": "3",
+                "stress": "2",
+                "goals": "walk, read",
+                "timestamp": (start + datetime.timedelta(minutes=i)).isoformat(),
+            }
+        )
+        if len(batch) == 10000:
+            store.append_many(batch)
+            batch = []
+    store.append_many(batch)
+    return store
+
+
+async def run_conversation(
+    store: CheckinStore,
+    profile: LatencyProfile,
+    latency: LatencyAggregator,
+    *,
+    user_id: str = USER,
+    writer: Optional[PersistenceWriter] = None,
+    vad: Optional[VAD] = None,
+    pause: float = 0.0,
+    script: Optional[dict[str, Reply]] = None,
+    fast_path: bool = True,
+    speculate: bool = False,
+) -> dict:
+    """Replay the check-in script once; returns turn and tool timings.
+
+    ``pause`` is how long the simulated user waits before each message.
+    """
+    script = script or CHECKIN_SCRIPT
+    stt = FakeSTT(profile)
+    llm = ScriptedLLM(script, profile)
+    speaker = FakeAudioOutput(profile)
+    engine = FakeTTS(profile)
+    speculative = (
+        SpeculativeSpeech(PhraseCache(voice="bench"), engine) if speculate else None
+    )
+
+    session = AgentSession(
+        stt=stt,
+        llm=llm,
+        tts=engine,
+        vad=vad or NOT_GIVEN,
+        turn_detection="stt",
+        preemptive_generation=True,
+        resume_false_interruption=False,  # the fake speaker cannot pause
+    )
+    session.input.audio = SilentAudioInput()
+    session.output.audio = speaker
+
+    turn_done = asyncio.Event()
+    tool_times = defaultdict(list)
+    tool_steps = [0]
+
+    @session.on("agent_state_changed")
+    def _on_state(ev):
+        if ev.new_state == "listening" and ev.old_state != "listening":
+            turn_done.set()
+
+    @session.on("function_tools_executed")
+    def _on_tools(ev):
+        tool_steps[0] += 1
+        for call, output in zip(ev.function_calls, ev.function_call_outputs):
+            if output is not None:
+                tool_times[call.name].append(output.created_at - call.created_at)
+
+    @session.on("metrics_collected")
+    def _on_metrics(ev):
+        latency.collect(ev.metrics)
+
+    agent = WellnessCompanion(
+        store=store,
+        writer=writer,
+        user_id=user_id,
+        fast_path=fast_path,
+        speculative=speculative,
+    )
+    await session.start(agent)
+    await asyncio.sleep(0.1)  # let the audio pipeline attach
+
+    turn_latencies = []
+    for user_text in script:
+        await asyncio.sleep(pause)
+        turn_done.clear()
+        speaker.first_frame_at = None
+        end_of_speech = stt.speak(user_text)
+        await asyncio.wait_for(turn_done.wait(), timeout=30)
+        # A turn whose tools all return None ends without a spoken answer
+        if speaker.first_frame_at is not None:
+            turn_latencies.append(speaker.first_frame_at - end_of_speech)
+
+    await session.aclose()
+    return {
+        "turns": turn_latencies,
+        "tools": tool_times,
+        "tool_steps": tool_steps[0],
+        "llm_requests": llm.requests,
+        "speculation": speculative.stats if speculative else None,
+        "saved": agent.state.timestamp is not None,
+    }
+
+
+def _ms(values) -> str:
+    return f"{statistics.median(values) * 1000:8.1f}" if values else f"{'-':>8}"
+
+
+async def compare_modes(args):
+    profile = PROFILES[args.profile]
+    backend, size = args.backends[0], args.sizes[0]
+    print(
+        f"profile={args.profile} repeat={args.repeat} store={backend} size={size} "
+        f"speculate={args.speculate}"
+    )
+    print(
+        f"{'mode':>10} {'LLM calls':>9} {'tool steps':>10} {'turn p50':>9} "
+        f"{'ratings turn':>12} {'spec hits':>9} {'saved':>7}"
+    )
+    for mode in args.modes:
+        script = mode_script(mode)
+        turns, ratings_turns, requests, steps = [], [], [], []
+        hits, saved = 0, 0.0
+        with tempfile.TemporaryDirectory() as tmp:
+            store = open_store(backend, tmp, size)
+            for _ in range(args.repeat):
+                result = await run_conversation(
+                    store,
+                    profile,
+                    LatencyAggregator(),
+                    script=script,
+                    fast_path=mode == "fast-path",
+                    speculate=args.speculate,
+                )
+                assert result["saved"], "check-in was not saved"
+                assert store.last(user_id=USER)[0]["energy"] == "2", (
+                    "ratings were not recorded"
+                )
+                turns += result["turns"]
+                ratings_turns.append(result["turns"][1])
+                if result["speculation"]:
+                    hits += result["speculation"].hits
+                    saved += result["speculation"].saved
+                requests.append(result["llm_requests"])
+                steps.append(result["tool_steps"])
+            store.close()
+        print(
+            f"{mode:>10} {statistics.mean(requests):9.1f} {statistics.mean(steps):10.1f} "
+            f"{statistics.median(turns) * 1000:7.0f}ms "
+            f"{statistics.median(ratings_turns) * 1000:10.0f}ms "
+            f"{hits:>4}/{args.repeat:<4} {saved / max(hits, 1) * 1000:5.0f}ms"
+        )
+
+
+async def main(args):
+    if args.modes:
+        return await compare_modes(args)
+
+    profile = PROFILES[args.profile]
+    print(f"profile={args.profile} repeat={args.repeat}")
+    print(
+        f"{'store':>8} {'log size':>9} {'turn p50':>9} {'turn max':>9} "
+        f"{'last ms':>8} {'update ms':>9} {'get ms':>8} {'disk KB':>9}"
+    )
+    for backend in args.backends:
+        for size in args.sizes:
+            latency = LatencyAggregator()
+            turns, tools = [], defaultdict(list)
+            with tempfile.TemporaryDirectory() as tmp:
+                store = open_store(backend, tmp, size)
+                for _ in range(args.repeat):
+                    result = await run_conversation(store, profile, latency)
+                    assert result["saved"], "check-in was not saved"
+                    turns += result["turns"]
+                    for name, times in result["tools"].items():
+                        tools[name] += times
+                store.close()
+                disk = sum(
+                    os.path.getsize(os.path.join(root, f))
+                    for root, _, files in os.walk(tmp)
+                    for f in files
+                )
+            print(
+                f"{backend:>8} {size:>9} {statistics.median(turns) * 1000:8.0f}ms "
+                f"{max(turns) * 1000:7.0f}ms {_ms(tools['get_last_checkin'])} "
+                f"{_ms(tools['update_checkin']):>9} {_ms(tools['get_checkin'])} "
+                f"{disk / 1024:9.0f}"
+            )
+            if args.stages:
+                print(f"{'':>19}{latency.summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--backends", nargs="+", default=["journal", "sqlite"])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[1, 1000, 10000, 100000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=MODES,
+        help="compare ways of recording ratings instead of store sizes",
+    )
+    parser.add_argument(
+        "--speculate",
+        action="store_true",
+        help="render the scripted recap while the LLM runs (with --modes)",
+    )
+    parser.add_argument(
+        "--stages", action="store_true", help="also print per-stage percentiles"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    started = time.perf_counter()
+    asyncio.run(main(args))
+    print(f"done in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,100 @@
+"""Write throughput of the SQLite check-in store as concurrent sessions grow.
+
+Each simulated session runs in its own process, like a LiveKit job, and saves
+check-ins one commit at a time against a shared database.
+
+    uv run python benchmarks/bench_store_concurrency.py --sessions 1 2 4 8 16
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from wellness import SQLiteStore
+
+
+def _session(path, session, records, fsync, start, results):
+    store = SQLiteStore(path, fsync=fsync)
+    start.wait()
+    latencies = []
+    for i in range(records):
+        t0 = time.perf_counter()
+        store.append(
+            {
+                "user_id": f"user-{session}",
+                "mood": str(i % 5 + 1),
+                "energy": "3",
+                "goals": "walk, read",
+                "timestamp": f"2025-11-24T09:{i // 60 % 60:02d}:{i % 60:02d}",
+            }
+        )
+        latencies.append(time.perf_counter() - t0)
+    store.close()
+    results.put(latencies)
+
+
+def run(sessions, records, fsync):
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wellness.db")
+        SQLiteStore(path).close()
+
+        start = ctx.Event()
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=_session, args=(path, s, records, fsync, start, results))
+            for s in range(sessions)
+        ]
+        for p in procs:
+            p.start()
+        time.sleep(0.5)  # let every process open its connection
+
+        t0 = time.perf_counter()
+        start.set()
+        latencies = []
+        for _ in procs:
+            latencies.extend(results.get())
+        elapsed = time.perf_counter() - t0
+        for p in procs:
+            p.join()
+
+        stored = len(SQLiteStore(path))
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "writes": len(latencies),
+        "stored": stored,
+        "writes_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument(
+        "--records", type=int, default=200, help="check-ins per session"
+    )
+    parser.add_argument("--fsync", action="store_true", help="synchronous=FULL commits")
+    args = parser.parse_args()
+
+    print(
+        f"{'sessions':>8} {'writes':>7} {'stored':>7} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for n in args.sessions:
+        r = run(n, args.records, args.fsync)
+        print(
+            f"{r['sessions']:>8} {r['writes']:>7} {r['stored']:>7} "
+            f"{r['writes_per_s']:>10.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Time to first audio of the TTS sentence tokenizers on replayed LLM streams.
+
+Each stream in ``data/llm_streams.jsonl`` is a reply as the LLM streamed it:
+text chunks with their arrival time since the request. Replaying a stream
+into a tokenizer shows when its first chunk would be sent to the TTS; time
+to first audio adds the TTS time to first byte of ``--profile``. Replay
+uses the recorded timestamps rather than sleeping, so results are exact
+and instant.
+
+The bundled streams mirror the chunk sizes and gaps of Gemini replies to
+the check-in conversation. ``--record`` replaces them with real streams
+from ``gemini-2.5-flash`` (needs ``GOOGLE_API_KEY``).
+
+    uv run python benchmarks/bench_tokenizer.py
+    uv run python benchmarks/bench_tokenizer.py --record
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fakes import PROFILES
+from livekit.agents import llm, tokenize
+
+from wellness.tokenizer import EarlyChunkTokenizer
+
+STREAMS = os.path.join(os.path.dirname(__file__), "data", "llm_streams.jsonl")
+
+TOKENIZERS = {
+    "sentence": lambda: tokenize.basic.SentenceTokenizer(min_sentence_len=2),
+    "early": lambda: EarlyChunkTokenizer(),
+}
+
+# Prompts used with --record, each answered in the companion's voice
+RECORD_PROMPTS = [
+    "Hi, I'm ready for my check-in.",
+    "I'd say a four.",
+    "Honestly it's been a rough week, I'm pretty overwhelmed.",
+    "Mood's good, energy's low, and I'm a bit stressed.",
+    "Go for a walk and read a chapter.",
+    "Can you recap?",
+    "I didn't sleep well and this morning was chaos.",
+    "I've checked in every day this week!",
+    "I want to finish my report and call my sister.",
+    "Thanks, that's all for today.",
+]
+RECORD_INSTRUCTIONS = (
+    "You are a supportive wellness companion running a short daily voice "
+    "check-in on mood, energy, stress (1-5) and goals. Reply in one to three "
+    "short spoken sentences, without markdown or emojis."
+)
+
+
+def load_streams(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def replay(tokenizer: tokenize.SentenceTokenizer, chunks: list) -> list:
+    """Feed recorded chunks to ``tokenizer``; returns ``(time, text)`` per TTS chunk"""
+    stream = tokenizer.stream()
+    sent = []
+    now = 0.0
+
+    async def _read():
+        async for ev in stream:
+            sent.append((now, ev.token))
+
+    reader = asyncio.create_task(_read())
+    for at, text in chunks:
+        now = at  # read by _read for the tokens this push releases
+        stream.push_text(text)
+        await asyncio.sleep(0)  # let the reader take what was released
+    stream.end_input()
+    await reader
+    return sent
+
+
+async def record(path: str) -> None:
+    """Record the LLM's streamed replies to ``RECORD_PROMPTS``"""
+    from livekit.plugins import google
+
+    model = google.LLM(model="gemini-2.5-flash")
+    with open(path, "w", encoding="utf-8") as f:
+        for prompt in RECORD_PROMPTS:
+            chat_ctx = llm.ChatContext()
+            chat_ctx.add_message(role="system", content=RECORD_INSTRUCTIONS)
+            chat_ctx.add_message(role="user", content=prompt)
+            started, chunks = time.perf_counter(), []
+            async with model.chat(chat_ctx=chat_ctx) as stream:
+                async for chunk in stream:
+                    if chunk.delta and chunk.delta.content:
+                        offset = round(time.perf_counter() - started, 3)
+                        chunks.append([offset, chunk.delta.content])
+            text = "".join(text for _, text in chunks)
+            f.write(json.dumps({"text": text, "chunks": chunks}) + "\n")
+            print(f"{chunks[0][0] * 1000:6.0f}ms  {text}")
+    await model.aclose()
+
+
+async def main(args):
+    if args.record:
+        return await record(args.streams)
+
+    streams = load_streams(args.streams)
+    tts_ttfb = PROFILES[args.profile].tts_ttfb
+    print(
+        f"{len(streams)} streams, profile={args.profile} (TTS TTFB {tts_ttfb * 1000:.0f}ms)"
+    )
+    print(
+        f"{'tokenizer':>10} {'wait p50':>9} {'wait max':>9} {'TTFA p50':>9} "
+        f"{'TTFA max':>9} {'1st words':>9} {'chunks':>7}"
+    )
+    for name in args.tokenizers:
+        waits, ttfa, first_words, counts = [], [], [], []
+        for s in streams:
+            sent = await replay(TOKENIZERS[name](), s["chunks"])
+            first_at, first_text = sent[0]
+            # Wait: from the LLM's first token until the TTS gets text
+            waits.append(first_at - s["chunks"][0][0])
+            ttfa.append(first_at + tts_ttfb)
+            first_words.append(len(first_text.split()))
+            counts.append(len(sent))
+            if args.verbose:
+                print(f"{'':>11}{[text for _, text in sent]}")
+        print(
+            f"{name:>10} {statistics.median(waits) * 1000:7.0f}ms "
+            f"{max(waits) * 1000:7.0f}ms {statistics.median(ttfa) * 1000:7.0f}ms "
+            f"{max(ttfa) * 1000:7.0f}ms {statistics.mean(first_words):9.1f} "
+            f"{statistics.mean(counts):7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", default=STREAMS)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument(
+        "--tokenizers", nargs="+", choices=sorted(TOKENIZERS), default=list(TOKENIZERS)
+    )
+    parser.add_argument(
+        "--record", action="store_true", help="record new streams from the LLM"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print the chunks sent to the TTS"
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,144 @@
+"""CPU per session and VAD decision latency, per-stream vs batched Silero.
+
+Runs N concurrent VAD streams in one process, each fed a 32 ms frame of
+synthetic audio every 32 ms in real time, like the sessions of a worker
+process hosting N rooms. For each N and mode it reports the process CPU
+time per session (as a share of one core), the decision latency from a
+frame being pushed to its ``INFERENCE_DONE`` event, and for batched modes
+the mean batch size.
+
+Modes are ``plugin`` (``silero.VAD``, one inference per window on the
+default executor) and ``batched`` (``BatchedVAD``, one inference per tick
+of ``--tick-ms`` on the batcher's thread).
+
+    uv run python benchmarks/bench_vad.py --sessions 1 10 25 50 100 --seconds 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from livekit import rtc
+from livekit.agents import vad
+from livekit.plugins import silero
+
+from wellness.latency import LogHistogram
+from wellness.vad_batch import load_batched_vad
+
+SAMPLE_RATE = 16000
+WINDOW = 512
+
+
+def frames(seed: int, count: int) -> list[rtc.AudioFrame]:
+    """Alternating bursts of modulated tone and noise, one frame per window"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(WINDOW * count) / SAMPLE_RATE
+    voiced = (np.sin(2 * np.pi * 0.5 * t + seed) > 0).astype(np.float32)
+    tone = np.sin(2 * np.pi * (120 + 10 * (seed % 8)) * t) * voiced
+    audio = 0.3 * tone + 0.02 * rng.standard_normal(t.size)
+    pcm = (audio * 32767).astype(np.int16)
+    return [
+        rtc.AudioFrame(pcm[i : i + WINDOW].tobytes(), SAMPLE_RATE, 1, WINDOW)
+        for i in range(0, pcm.size, WINDOW)
+    ]
+
+
+async def run_stream(detector, audio, start_at, latency: LogHistogram) -> None:
+    stream = detector.stream()
+    pushed = []
+
+    async def feed():
+        for i, frame in enumerate(audio):
+            delay = start_at + i * WINDOW / SAMPLE_RATE - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pushed.append(time.perf_counter())
+            stream.push_frame(frame)
+        stream.end_input()
+
+    feeder = asyncio.create_task(feed())
+    done = 0
+    async for ev in stream:
+        if ev.type == vad.VADEventType.INFERENCE_DONE:
+            latency.record(time.perf_counter() - pushed[done])
+            done += 1
+    await feeder
+
+
+async def run_level(n: int, detector, args) -> dict:
+    count = int(args.seconds * SAMPLE_RATE / WINDOW)
+    audio = [frames(i, count) for i in range(n)]
+    latency = LogHistogram()
+    batcher = getattr(detector, "batcher", None)
+    before = (batcher.stats.batches, batcher.stats.windows) if batcher else (0, 0)
+
+    start = time.perf_counter() + 0.1
+    cpu = time.process_time()
+    await asyncio.gather(
+        # Spread the sessions' frame boundaries over one window, as rooms are
+        *(
+            run_stream(detector, a, start + i * WINDOW / SAMPLE_RATE / n, latency)
+            for i, a in enumerate(audio)
+        )
+    )
+    cpu = time.process_time() - cpu
+    report = {
+        "cpu_per_session": cpu / (args.seconds * n),
+        "p50": latency.quantile(0.5),
+        "p95": latency.quantile(0.95),
+        "p99": latency.quantile(0.99),
+        "batch": None,
+    }
+    if batcher:
+        batches = batcher.stats.batches - before[0]
+        report["batch"] = (batcher.stats.windows - before[1]) / max(batches, 1)
+    return report
+
+
+async def main(args):
+    detectors = {}
+    if "plugin" in args.modes:
+        detectors["plugin"] = silero.VAD.load()
+    if "batched" in args.modes:
+        detectors["batched"] = load_batched_vad(tick=args.tick_ms / 1000)
+
+    print(
+        f"{args.seconds}s of audio per session, batch tick {args.tick_ms}ms, "
+        f"{os.cpu_count()} CPUs"
+    )
+    print(
+        f"{'sessions':>8} {'mode':>8} {'CPU/sess':>9} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'batch':>6}"
+    )
+    for n in args.sessions:
+        for mode, detector in detectors.items():
+            r = await run_level(n, detector, args)
+            batch = f"{r['batch']:6.1f}" if r["batch"] is not None else f"{'-':>6}"
+            print(
+                f"{n:>8} {mode:>8} {r['cpu_per_session'] * 100:8.2f}% "
+                f"{r['p50'] * 1000:6.1f}ms {r['p95'] * 1000:6.1f}ms "
+                f"{r['p99'] * 1000:6.1f}ms {batch}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 10, 25, 50, 100])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=["plugin", "batched"],
+        default=["plugin", "batched"],
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
@@ -0,0 +1,317 @@
+"""Offline stand-ins for the speech pipeline, with configurable latency.
+
+These replace Deepgram, Gemini and Murf so an ``AgentSession`` can run
+without network access: the STT emits scripted transcripts, the LLM replays
+scripted replies and tool calls, and the TTS produces silence. Every delay
+comes from a :class:`LatencyProfile` and a seeded RNG, so runs are repeatable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+from livekit import rtc
+from livekit.agents import (
+    DEFAULT_API_CONNECT_OPTIONS,
+    APIConnectOptions,
+    llm,
+    stt,
+    tts,
+    utils,
+)
+from livekit.agents.voice import io
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated provider delays in seconds; ``jitter`` is a +/- fraction"""
+
+    stt_final: float = 0.15  # end of speech to final transcript
+    llm_ttft: float = 0.35
+    llm_tokens_per_second: float = 80.0
+    tts_ttfb: float = 0.2
+    tts_chars_per_second: float = 15.0  # audio length of synthesized speech
+    playback_speed: float = 0.0  # 1.0 plays in real time, 0 instantly
+    jitter: float = 0.2
+    seed: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    def delay(self, seconds: float) -> float:
+        return max(0.0, seconds * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+
+PROFILES = {
+    "fast": LatencyProfile(stt_final=0.05, llm_ttft=0.1, tts_ttfb=0.05, jitter=0.1),
+    "typical": LatencyProfile(),
+    "slow": LatencyProfile(stt_final=0.3, llm_ttft=0.9, tts_ttfb=0.5, jitter=0.4),
+}
+
+
+class FakeSTT(stt.STT):
+    """Streaming STT that emits transcripts pushed with :meth:`speak`"""
+
+    def __init__(self, profile: LatencyProfile):
+        super().__init__(
+            capabilities=stt.STTCapabilities(streaming=True, interim_results=False)
+        )
+        self.profile = profile
+        self._streams: list[_FakeRecognizeStream] = []
+
+    async def _recognize_impl(self, buffer, *, language=None, conn_options=None):
+        raise NotImplementedError("FakeSTT only supports streaming")
+
+    def stream(
+        self,
+        *,
+        language=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> _FakeRecognizeStream:
+        stream = _FakeRecognizeStream(stt=self, conn_options=conn_options)
+        self._streams.append(stream)
+        return stream
+
+    def speak(self, text: str) -> float:
+        """Simulate the user saying ``text``; returns when they stopped speaking"""
+        stream = self._streams[-1]
+        end_of_speech = time.perf_counter()
+        stream.utterances.put_nowait(text)
+        return end_of_speech
+
+
+class _FakeRecognizeStream(stt.RecognizeStream):
+    def __init__(self, *, stt: FakeSTT, conn_options: APIConnectOptions):
+        self.utterances: asyncio.Queue[str] = asyncio.Queue()
+        super().__init__(stt=stt, conn_options=conn_options)
+
+    async def _run(self) -> None:
+        profile = self._stt.profile
+
+        async def _drain_audio():
+            async for _ in self._input_ch:
+                pass
+
+        drain = asyncio.create_task(_drain_audio())
+        try:
+            while True:
+                text = await self.utterances.get()
+                self._event_ch.send_nowait(
+                    stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH)
+                )
+                await asyncio.sleep(profile.delay(profile.stt_final))
+                self._event_ch.send_nowait(
+                    stt.SpeechEvent(
+                        type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+                        alternatives=[stt.SpeechData(language="en", text=text)],
+                    )
+                )
+                self._event_ch.send_nowait(
+                    stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH)
+                )
+        finally:
+            await utils.aio.cancel_and_wait(drain)
+
+
+@dataclass
+class Reply:
+    """Scripted answer to one user message.
+
+    With ``tool_calls`` the first completion only calls the tools, and
+    ``text`` is returned once their output is in the chat context. Each list
+    in ``followups`` is one more completion that calls tools, made after the
+    previous calls returned, like a model that calls one tool at a time.
+    """
+
+    text: str
+    tool_calls: list[tuple[str, dict]] = field(default_factory=list)
+    followups: list[list[tuple[str, dict]]] = field(default_factory=list)
+
+
+class ScriptedLLM(llm.LLM):
+    """Answers each user message with the :class:`Reply` scripted for it"""
+
+    def __init__(self, script: dict[str, Reply], profile: LatencyProfile):
+        super().__init__()
+        self.script = script
+        self.profile = profile
+        self.requests = 0
+
+    def chat(
+        self,
+        *,
+        chat_ctx: llm.ChatContext,
+        tools=None,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+        parallel_tool_calls=None,
+        tool_choice=None,
+        extra_kwargs=None,
+    ) -> _ScriptedStream:
+        # Tool calls first, then the text once the tool outputs are in the context
+        self.requests += 1
+        user_text, outputs = "", 0
+        for item in reversed(chat_ctx.items):
+            if item.type == "function_call_output":
+                outputs += 1
+            elif item.type == "message" and item.role == "user":
+                user_text = item.text_content or ""
+                break
+        reply = self.script.get(user_text, Reply(text="Okay."))
+        for calls in [reply.tool_calls, *reply.followups]:
+            if outputs < len(calls):
+                reply = Reply(text="", tool_calls=calls)
+                break
+            outputs -= len(calls)
+        else:
+            reply = Reply(text=reply.text)
+        return _ScriptedStream(
+            self, reply, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options
+        )
+
+
+class _ScriptedStream(llm.LLMStream):
+    def __init__(self, llm_: ScriptedLLM, reply: Reply, **kwargs):
+        super().__init__(llm_, **kwargs)
+        self._reply = reply
+
+    async def _run(self) -> None:
+        profile = self._llm.profile
+        request_id = utils.shortuuid()
+        await asyncio.sleep(profile.delay(profile.llm_ttft))
+
+        if self._reply.tool_calls:
+            calls = [
+                llm.FunctionToolCall(
+                    name=name, arguments=json.dumps(args), call_id=utils.shortuuid()
+                )
+                for name, args in self._reply.tool_calls
+            ]
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id=request_id,
+                    delta=llm.ChoiceDelta(role="assistant", tool_calls=calls),
+                )
+            )
+
+        # Stream the text word by word at the profile's token rate
+        words = self._reply.text.split(" ") if self._reply.text else []
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(1 / profile.llm_tokens_per_second)
+            self._event_ch.send_nowait(
+                llm.ChatChunk(
+                    id=request_id,
+                    delta=llm.ChoiceDelta(role="assistant", content=word + " "),
+                )
+            )
+
+        self._event_ch.send_nowait(
+            llm.ChatChunk(
+                id=request_id,
+                usage=llm.CompletionUsage(
+                    completion_tokens=len(words),
+                    prompt_tokens=0,
+                    total_tokens=len(words),
+                ),
+            )
+        )
+
+
+class FakeTTS(tts.TTS):
+    """Synthesizes silence whose length depends on the text"""
+
+    def __init__(self, profile: LatencyProfile):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.profile = profile
+
+    def synthesize(
+        self,
+        text: str,
+        *,
+        conn_options: APIConnectOptions = DEFAULT_API_CONNECT_OPTIONS,
+    ) -> _SilenceStream:
+        return _SilenceStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class _SilenceStream(tts.ChunkedStream):
+    async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        profile = self._tts.profile
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        await asyncio.sleep(profile.delay(profile.tts_ttfb))
+        seconds = max(len(self.input_text) / profile.tts_chars_per_second, 0.02)
+        output_emitter.push(b"\0\0" * int(SAMPLE_RATE * seconds))
+        output_emitter.flush()
+
+
+class SilentAudioInput(io.AudioInput):
+    """Microphone that sends 10 ms of silence at real-time pace"""
+
+    def __init__(self):
+        super().__init__(label="fake-mic")
+        self._samples = SAMPLE_RATE // 100
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        await asyncio.sleep(0.01)
+        return rtc.AudioFrame(
+            data=b"\0\0" * self._samples,
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            samples_per_channel=self._samples,
+        )
+
+
+class FakeAudioOutput(io.AudioOutput):
+    """Speaker that records when the agent's audio started and how long it was"""
+
+    def __init__(self, profile: LatencyProfile):
+        super().__init__(
+            label="fake-speaker",
+            capabilities=io.AudioOutputCapabilities(pause=False),
+            sample_rate=SAMPLE_RATE,
+        )
+        self.profile = profile
+        self.first_frame_at: float | None = None
+        self._pushed = 0.0
+        self._segment_open = False
+        self._playback: asyncio.Task | None = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+        self._pushed += frame.duration
+        self._segment_open = True
+
+    def flush(self) -> None:
+        super().flush()
+        if not self._segment_open:  # nothing was captured since the last flush
+            return
+        duration, self._pushed, self._segment_open = self._pushed, 0.0, False
+        self._playback = asyncio.create_task(self._play(duration))
+
+    def clear_buffer(self) -> None:
+        if self._playback is not None and not self._playback.done():
+            self._playback.cancel()
+            self.on_playback_finished(playback_position=0.0, interrupted=True)
+        elif self._segment_open:
+            self.on_playback_finished(playback_position=self._pushed, interrupted=True)
+        self._pushed, self._segment_open = 0.0, False
+
+    async def _play(self, duration: float) -> None:
+        await asyncio.sleep(duration * self.profile.playback_speed)
+        self.on_playback_finished(playback_position=duration, interrupted=False)
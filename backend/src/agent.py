@@ -126,7 +126,7 @@
 #         # Text-to-speech (TTS) is your agent's voice, turning the LLM's text into speech that the user can hear
 #         # See all available models as well as voice selections at https://docs.livekit.io/agents/models/tts/
 #         tts=murf.TTS(
-#                 voice="en-US-matthew", 
+#                 voice="en-US-matthew",
 #                 style="Conversation",
 #                 tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
 #                 text_pacing=True
@@ -191,179 +191,754 @@
 #     cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
 
 
-import os
-import json
-import datetime
+import asyncio
 import logging
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
 from dotenv import load_dotenv
 
+from wellness.commands import COMMANDS, metrics_dir, open_store, use_prometheus_dir
+
+if __name__ == "__main__":
+    load_dotenv(".env.local")
+    # Commands that do not run the agent exit here, before LiveKit is imported
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+    # The worker's metrics, set up before LiveKit imports prometheus_client
+    if sys.argv[1:2] != ["warm-tts"] and "--profile-startup" not in sys.argv[1:]:
+        use_prometheus_dir()
+
 from livekit.agents import (
+    NOT_GIVEN,
     Agent,
     AgentSession,
     JobContext,
+    JobExecutorType,
     JobProcess,
+    RunContext,
     WorkerOptions,
     cli,
-    metrics,
-    RunContext,
     function_tool,
+    metrics,
     tokenize,
 )
-from livekit.plugins import murf, silero, deepgram, google
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.agents.llm import find_function_tools
+
+from wellness import (
+    CheckinRecord,
+    CheckinStore,
+    PersistenceWriter,
+    Rating,
+    TrendSummary,
+)
+from wellness.admission import AdmissionController, AdmissionLimits, LoadReporter
+from wellness.connections import ConnectionStats, speech_session
+from wellness.extract import asked_scale, extract_ratings, parse_rating
+from wellness.latency import LatencyAggregator, LoopLagMonitor
+from wellness.prewarm import WarmupTimer
+from wellness.profiling import ToolProfiler
+from wellness.speculative import SpeculativeSpeech, utterance_sentences
+from wellness.startup import DOWNLOAD_PLUGINS, PLUGINS, import_breakdown, import_plugins
+from wellness.tokenizer import EarlyChunkTokenizer
+from wellness.trends import SCALES
+from wellness.tts_cache import PhraseCache
+
+if TYPE_CHECKING:
+    from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
 logger = logging.getLogger("agent")
-load_dotenv(".env.local")
+
+
+def open_writer(store: CheckinStore) -> PersistenceWriter:
+    """Background writer that keeps store I/O off the event loop"""
+    writer = PersistenceWriter(
+        store,
+        max_queue=int(os.getenv("WELLNESS_WRITE_QUEUE", "256")),
+        fsync_policy=os.getenv("WELLNESS_FSYNC", "interval"),
+        fsync_interval=float(os.getenv("WELLNESS_FSYNC_INTERVAL", "1.0")),
+    )
+    writer.start()
+    return writer
+
+
+TTS_VOICE = "en-US-matthew"
+TTS_STYLE = "Conversation"
+
+WELCOME_TTS = (
+    "Hi! I'm here for your daily wellness check-in. "
+    "How are you feeling today? "
+    "Could you tell me about your mood, energy, and stress in your own words?"
+)
+
+SCALE_WORDS = {
+    "mood": {1: "very low", 2: "low", 3: "medium", 4: "high", 5: "very high"},
+    "energy": {1: "very low", 2: "low", 3: "medium", 4: "high", 5: "very high"},
+    "stress": {1: "low", 2: "moderate", 3: "moderate", 4: "high", 5: "very high"},
+}
+
+
+def checkin_phrase(mood: int, energy: int, stress: int) -> str:
+    """Spoken recap of the 1-5 mood, energy and stress scales"""
+    mood_text = SCALE_WORDS["mood"].get(mood, "medium")
+    energy_text = SCALE_WORDS["energy"].get(energy, "medium")
+    stress_text = SCALE_WORDS["stress"].get(stress, "moderate")
+    return (
+        f"So your mood seems {mood_text}. "
+        f"Your energy appears {energy_text} and stress level is {stress_text}. "
+        f"What are your goals for today?"
+    )
+
+
+def scripted_phrases() -> list[str]:
+    """Every fixed or templated phrase the agent speaks, for the TTS cache.
+
+    The recap is only ever played sentence by sentence (by speculative
+    synthesis), so its sentences are cached rather than the whole recap.
+    """
+    phrases = {WELCOME_TTS}
+    for mood in range(1, 6):
+        for energy in range(1, 6):
+            for stress in range(1, 6):
+                phrases.update(
+                    utterance_sentences(checkin_phrase(mood, energy, stress))
+                )
+    return sorted(phrases)
+
+
+def admission_controller() -> AdmissionController:
+    """Worker load from host load and per-session reports, limits from the environment"""
+    limits = AdmissionLimits(
+        cpu=float(os.getenv("WELLNESS_ADMIT_CPU", "0.75")),
+        memory=float(os.getenv("WELLNESS_ADMIT_MEMORY", "0.85")),
+        loop_lag=float(os.getenv("WELLNESS_ADMIT_LOOP_LAG_MS", "100")) / 1000,
+        sessions=int(os.getenv("WELLNESS_ADMIT_MAX_SESSIONS", "0")),
+    )
+    return AdmissionController(
+        limits,
+        os.path.join(metrics_dir(), "load"),
+        threshold=float(os.getenv("WELLNESS_LOAD_THRESHOLD", "0.7")),
+    )
+
+
+def open_tts_cache() -> PhraseCache:
+    """Phrase audio cache, with a disk tier unless WELLNESS_TTS_CACHE_DIR is empty"""
+    disk_dir = os.getenv(
+        "WELLNESS_TTS_CACHE_DIR", os.path.join(os.getcwd(), "backend", "tts_cache")
+    )
+    return PhraseCache(
+        voice=TTS_VOICE,
+        style=TTS_STYLE,
+        max_bytes=int(os.getenv("WELLNESS_TTS_CACHE_MB", "32")) * 1024 * 1024,
+        disk_dir=disk_dir or None,
+    )
+
+
+def load_trend(store: CheckinStore, user_id: Optional[str]) -> TrendSummary:
+    """A fixed-size summary of the history, however many check-ins exist"""
+    try:
+        return store.trend(user_id)
+    except Exception as e:
+        logger.warning(f"Failed to load check-in trends: {e}")
+        return TrendSummary()
 
 
 class WellnessCompanion(Agent):
     """Health & Wellness daily check-in agent"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        store: Optional[CheckinStore] = None,
+        writer: Optional[PersistenceWriter] = None,
+        user_id: Optional[str] = None,
+        fast_path: bool = True,
+        speculative: Optional[SpeculativeSpeech] = None,
+        profiler: Optional[ToolProfiler] = None,
+        trend: Optional[TrendSummary] = None,
+    ):
+        store = store if store is not None else open_store()
+        if trend is None:
+            trend = load_trend(store, user_id)
+        if profiler is not None:
+            # Shadow each tool method with its timed wrapper, so the tools
+            # the agent collects below (and the LLM calls) are the timed ones
+            for tool in find_function_tools(self):
+                setattr(self, tool.__name__, profiler.wrap(tool))
+
         super().__init__(
-            instructions="""
-            You are a supportive health and wellness companion. 
+            instructions=f"""
+            You are a supportive health and wellness companion.
             Your goal is to have a short, grounded daily check-in with the user:
             1. Ask about mood, energy, and stress.
             2. Ask about 1-3 goals/intention for the day.
             3. Offer small actionable reflections.
             4. Close the check-in with a summary and confirmation.
             Avoid medical advice or diagnosis.
-            Persist data to wellness_log.json and reference previous sessions.
+            Record everything the user mentioned in a single
+            update_checkin_fields call.
+            Persist data to the wellness log and reference previous sessions
+            using this summary of the user's history:
+            {trend.describe()}
             """
         )
-        self.data_file = os.path.join(os.getcwd(), "backend", "wellness_log.json")
-        self.state = {}  # Current session check-in
-
-        # Load previous data if exists
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, "r", encoding="utf-8") as f:
-                    self.history = json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load wellness log: {e}")
-                self.history = []
-        else:
-            self.history = []
+        self.store = store
+        self.trend = trend
+        self.data_file = self.store.path
+        self.writer = writer
+        self.user_id = user_id  # Participant identity, history is scoped to it
+        self.state = CheckinRecord(user_id=user_id)  # Current session check-in
+        self.saved = False  # Whether the check-in has been written
+        self.fast_path = fast_path  # Read ratings from the transcript
+        self.speculative = speculative  # Renders the scripted recap early
+
+    @property
+    def state(self) -> CheckinRecord:
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        # A stored check-in dict is accepted too
+        if not isinstance(value, CheckinRecord):
+            value = CheckinRecord.from_dict(value)
+        self._state = value
 
     @function_tool
     async def update_checkin(self, context: RunContext, field: str, value: str):
-        allowed = {"mood", "energy", "stress", "goals", "summary"}
-        if field not in allowed:
-            return f"Unknown field '{field}'. Allowed: {', '.join(sorted(allowed))}"
+        """Record one check-in field.
 
-        self.state[field] = value.strip()
+        Args:
+            field: One of 'mood', 'energy', 'stress', 'goals', 'summary'
+            value: The value to record; mood, energy and stress are rated 1-5
+        """
+        return await self._update({field: value})
 
-        # Save when required fields are filled
-        required = ["mood", "energy", "goals"]
-        missing = [f for f in required if not self.state.get(f)]
+    @function_tool
+    async def update_checkin_fields(
+        self,
+        context: RunContext,
+        mood: Optional[str] = None,
+        energy: Optional[str] = None,
+        stress: Optional[str] = None,
+        goals: Optional[str] = None,
+        summary: Optional[str] = None,
+    ):
+        """Record every check-in field the user mentioned, in one call.
+
+        Args:
+            mood: Mood from 1 (very low) to 5 (very high)
+            energy: Energy from 1 (very low) to 5 (very high)
+            stress: Stress from 1 (low) to 5 (very high)
+            goals: The user's goals or intentions for today
+            summary: Short summary of the check-in
+        """
+        fields = {
+            "mood": mood,
+            "energy": energy,
+            "stress": stress,
+            "goals": goals,
+            "summary": summary,
+        }
+        updates = {field: value for field, value in fields.items() if value is not None}
+        if not updates:
+            return "No fields given."
+        return await self._update(updates)
+
+    async def _update(self, updates: dict[str, str]) -> str:
+        """Validate and apply field updates together"""
+        allowed = {"mood", "energy", "stress", "goals", "summary"}
+        values = {}
+        for field, value in updates.items():
+            if field not in allowed:
+                return f"Unknown field '{field}'. Allowed: {', '.join(sorted(allowed))}"
+            if field in SCALES:
+                rating = parse_rating(field, value)
+                if rating is None:
+                    return f"Could not read {field} '{value}' as a rating from 1 to 5"
+                values[field] = Rating(rating)
+            else:
+                values[field] = value.strip()
+        for field, value in values.items():
+            self.state.set(field, value)
+
+        updated = ", ".join(f"'{field}'" for field in values)
+        missing = self.missing()
         if not missing:
-            self.state["timestamp"] = datetime.datetime.now().isoformat()
-            self.history.append(self.state)
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            try:
-                with open(self.data_file, "w", encoding="utf-8") as f:
-                    json.dump(self.history, f, ensure_ascii=False, indent=2)
-            except Exception as e:
-                return f"Check-in complete but failed to save: {e}"
-            return "Check-in complete and saved!"
-        return f"Updated '{field}'. Missing: {', '.join(missing)}"
+            if self.speculative is not None:
+                self.speculative.discard()  # the recap is no longer coming
+            # Saved when the session ends, so the closing summary is kept too
+            return f"Updated {updated}. Check-in complete."
+        result = f"Updated {updated}. Missing: {', '.join(missing)}"
+        if self.speculative is not None and all(getattr(self.state, f) for f in SCALES):
+            # The recap is rendered while the LLM runs, in case the reply says it
+            self.speculative.prepare(self.format_for_tts())
+        return result
+
+    def missing(self) -> list[str]:
+        """Required fields the check-in does not have yet"""
+        return [f for f in ("mood", "energy", "goals") if not getattr(self.state, f)]
+
+    async def save(self) -> bool:
+        """Write the session's check-in once, if it is complete.
+
+        Runs when the session ends, so fields given after the required ones
+        (the closing summary, a late stress rating) are in the stored record.
+        """
+        if self.saved or self.missing():
+            return self.saved
+        self.saved = True  # the agent's exit and the job's shutdown both save
+        self.state.timestamp = time.time()
+        record = self.state.to_dict()
+        try:
+            if self.writer is not None:
+                await self.writer.submit(record)
+            else:
+                self.store.append(record)
+        except Exception as e:
+            self.saved = False
+            logger.error(f"Failed to save check-in: {e}")
+            return False
+        self.trend.update(record)
+        return True
+
+    async def on_exit(self):
+        await self.save()
+
+    def tts_node(self, text, model_settings):
+        """Play speculatively rendered audio when the reply matches it"""
+        if self.speculative is None or not self.speculative.pending:
+            return Agent.default.tts_node(self, text, model_settings)
+        return self.speculative.tts_node(
+            text, lambda t: Agent.default.tts_node(self, t, model_settings)
+        )
+
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        """Record ratings stated plainly in the transcript before the LLM runs.
+
+        Saves the LLM a tool round trip for answers like "mood's good, energy's
+        low". Changing the context discards a preemptive generation, so the
+        context is only touched when something new was recorded.
+        """
+        if not self.fast_path:
+            return
+        # A bare "pretty good" answers the scale the agent just asked about
+        question = next(
+            (
+                item.text_content or ""
+                for item in reversed(turn_ctx.items)
+                if item.type == "message" and item.role == "assistant"
+            ),
+            "",
+        )
+        ratings = extract_ratings(
+            new_message.text_content or "", asked=asked_scale(question)
+        )
+        updates = {f: str(v) for f, v in ratings.items() if getattr(self.state, f) != v}
+        if not updates:
+            return
+        result = await self._update(updates)
+        recorded = ", ".join(f"{field}={value}" for field, value in updates.items())
+        turn_ctx.add_message(
+            role="system",
+            content=(
+                f"Already recorded from the user's last message: {recorded} "
+                f"({result}). Do not call a tool for these fields unless the "
+                "user meant something else."
+            ),
+        )
 
     @function_tool
     async def get_checkin(self, context: RunContext):
-        return self.state
+        return self.state.to_dict()
 
     @function_tool
     async def get_last_checkin(self, context: RunContext):
-        if self.history:
-            return self.history[-1]
-        return None
+        try:
+            # Store reads may wait on disk or on another process's write
+            last = await asyncio.to_thread(self.store.last, 1, user_id=self.user_id)
+        except Exception as e:
+            logger.warning(f"Failed to read wellness log: {e}")
+            return None
+        return last[0] if last else None
 
     def format_for_tts(self):
         """Convert numeric fields to descriptive words for TTS"""
-        scale_words = {
-            "mood": {1: "very low", 2: "low", 3: "medium", 4: "high", 5: "very high"},
-            "energy": {1: "very low", 2: "low", 3: "medium", 4: "high", 5: "very high"},
-            "stress": {1: "low", 2: "moderate", 3: "moderate", 4: "high", 5: "very high"},
-        }
+        return checkin_phrase(
+            self.state.mood or Rating.MEDIUM,
+            self.state.energy or Rating.MEDIUM,
+            self.state.stress or Rating.MEDIUM,
+        )
+
+    def get_welcome_tts(self):
+        """Friendly opening TTS prompt, no numeric scales"""
+        return WELCOME_TTS
 
-        mood_val = int(self.state.get("mood", 3))
-        energy_val = int(self.state.get("energy", 3))
-        stress_val = int(self.state.get("stress", 3))
 
-        mood_text = scale_words["mood"].get(mood_val, "medium")
-        energy_text = scale_words["energy"].get(energy_val, "medium")
-        stress_text = scale_words["stress"].get(stress_val, "moderate")
+def tts_tokenizer() -> tokenize.SentenceTokenizer:
+    """Sentence splitting for the TTS stream.
 
-        tts_text = (
-            f"So your mood seems {mood_text}. "
-            f"Your energy appears {energy_text} and stress level is {stress_text}. "
-            f"What are your goals for today?"
+    By default the first words of each reply are sent at the first clause
+    boundary to cut time to first audio; ``WELLNESS_TTS_EARLY_CHUNK=0``
+    waits for whole sentences instead.
+    """
+    if os.getenv("WELLNESS_TTS_EARLY_CHUNK", "1") == "1":
+        return EarlyChunkTokenizer(
+            max_words=int(os.getenv("WELLNESS_TTS_FIRST_CHUNK_WORDS", "8"))
         )
-        return tts_text
+    return tokenize.basic.SentenceTokenizer(min_sentence_len=2)
 
-    def get_welcome_tts(self):
-        """Friendly opening TTS prompt, no numeric scales"""
-        tts_text = (
-            "Hi! I'm here for your daily wellness check-in. "
-            "How are you feeling today? "
-            "Could you tell me about your mood, energy, and stress in your own words?"
+
+def build_llm():
+    from livekit.plugins import google
+
+    return google.LLM(model="gemini-2.5-flash")
+
+
+def build_turn_detector() -> "MultilingualModel":
+    """Turn detector of a job.
+
+    It runs its model in the job's inference executor, which only exists
+    once the job starts, so it cannot be built in prewarm. Building it only
+    reads the model's language list; the model itself is loaded by the
+    inference process before any job arrives.
+    """
+    from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+    return MultilingualModel()
+
+
+def build_speech_clients(http_session=None, *, llm=None) -> dict:
+    """Construct the STT, LLM and TTS clients used by a session.
+
+    Deepgram and Murf use ``http_session`` when given, otherwise LiveKit's
+    job session. ``llm`` is a client built in prewarm, used instead of a new
+    one.
+    """
+    from livekit.plugins import deepgram, murf
+
+    tts_engine = murf.TTS(
+        voice=TTS_VOICE,
+        style=TTS_STYLE,
+        tokenizer=tts_tokenizer(),
+        text_pacing=True,
+        http_session=http_session,
+    )
+    return {
+        "stt": deepgram.STT(model="nova-3", http_session=http_session),
+        "llm": llm or build_llm(),
+        "tts": tts_engine,
+    }
+
+
+# Writer and latency aggregator of this process. The thread executor runs
+# prewarm for every job in the same process, so they are opened only once
+_process_lock = threading.Lock()
+_process_shared: dict[str, Any] = {}
+
+
+def process_shared() -> dict[str, Any]:
+    """The process's check-in writer and latency aggregator, opened on first use"""
+    with _process_lock:
+        if not _process_shared:
+            # Per-stage latency, merged into a JSON snapshot shared by all
+            # processes
+            latency = LatencyAggregator()
+            latency.start_snapshots(
+                os.path.join(metrics_dir(), "latency.json"),
+                interval=float(os.getenv("WELLNESS_METRICS_INTERVAL", "30")),
+            )
+            _process_shared["writer"] = open_writer(open_store())
+            _process_shared["latency"] = latency
+        return _process_shared
+
+
+def load_vad(proc: JobProcess):
+    """Silero VAD, batched across the process's sessions when they share it.
+
+    Jobs of the thread executor run in one process, so by default their VAD
+    streams share one batched inference thread; ``WELLNESS_VAD_BATCH=1`` or
+    ``0`` forces batching on or off.
+    """
+    batch = os.getenv("WELLNESS_VAD_BATCH", "auto")
+    if batch == "1" or (
+        batch == "auto" and proc.executor_type == JobExecutorType.THREAD
+    ):
+        from wellness.vad_batch import load_batched_vad
+
+        return load_batched_vad(
+            tick=float(os.getenv("WELLNESS_VAD_BATCH_MS", "5")) / 1000,
+            max_batch=int(os.getenv("WELLNESS_VAD_MAX_BATCH", "64")),
         )
-        return tts_text
+    from livekit.plugins import silero
+
+    return silero.VAD.load()
 
 
 def prewarm(proc: JobProcess):
-    """Load Silero VAD for voice activity detection"""
-    proc.userdata["vad"] = silero.VAD.load()
+    """Load models, open stores and build the LLM client before a job arrives"""
+    timer = WarmupTimer()
+
+    with timer.measure("vad"):
+        proc.userdata["vad"] = load_vad(proc)
+
+    with timer.measure("store"):
+        shared = process_shared()
+    proc.userdata["writer"] = shared["writer"]
+    proc.userdata["latency"] = shared["latency"]
+
+    with timer.measure("tts_cache"):
+        tts_cache = open_tts_cache()
+        loaded = tts_cache.load_disk(scripted_phrases())
+        logger.info(f"Loaded {loaded} cached TTS phrases")
+        proc.userdata["tts_cache"] = tts_cache
+
+    # The Gemini client takes 120-200ms to build and holds no connection, so
+    # it is built here, for the one job of this executor, which closes it.
+    # Deepgram and Murf take the job's HTTP session and build in well under
+    # a millisecond, so each job builds its own. Set
+    # WELLNESS_PREWARM_CLIENTS=0 to build the LLM client in the job too, e.g.
+    # to compare time to first audio.
+    if os.getenv("WELLNESS_PREWARM_CLIENTS", "1") == "1":
+        with timer.measure("llm"):
+            proc.userdata["llm"] = build_llm()
+
+    proc.userdata["warmup"] = timer
+    logger.info(f"Prewarm: {timer.summary()}")
 
 
 async def entrypoint(ctx: JobContext):
     """Start wellness companion session"""
+    job_start = time.perf_counter()
     ctx.log_context_fields = {"room": ctx.room.name}
 
-    # TTS engine
-    tts_engine = murf.TTS(
-        voice="en-US-matthew",
-        style="Conversation",
-        tokenizer=tokenize.basic.SentenceTokenizer(min_sentence_len=2),
-        text_pacing=True,
-    )
+    # Speech clients over a session that counts its connections, with the
+    # LLM client from prewarm when there is one
+    connection_stats = ConnectionStats()
+    http_session = speech_session(connection_stats, proxy=ctx.proc.http_proxy)
+    clients = build_speech_clients(http_session, llm=ctx.proc.userdata.get("llm"))
+    tts_engine = clients["tts"]
+    # Open the TTS connection while the room connects and the user joins
+    tts_engine.prewarm()
+    clients["llm"].prewarm()
+    clients["stt"].prewarm()
 
     # Agent session
     session = AgentSession(
-        stt=deepgram.STT(model="nova-3"),
-        llm=google.LLM(model="gemini-2.5-flash"),
+        stt=clients["stt"],
+        llm=clients["llm"],
         tts=tts_engine,
-        turn_detection=MultilingualModel(),
+        turn_detection=build_turn_detector(),
         vad=ctx.proc.userdata["vad"],
         preemptive_generation=True,
     )
 
+    # Time from job start to the agent's first audio
+    first_audio = None
+
+    @session.on("agent_state_changed")
+    def _on_agent_state(ev):
+        nonlocal first_audio
+        if ev.new_state == "speaking" and first_audio is None:
+            first_audio = time.perf_counter() - job_start
+            logger.info(
+                f"Time to first audio: {first_audio * 1000:.0f}ms "
+                f"(prewarm: {ctx.proc.userdata['warmup'].summary()})"
+            )
+
     # Metrics collection
     usage_collector = metrics.UsageCollector()
+    latency = ctx.proc.userdata["latency"]
 
     @session.on("metrics_collected")
     def _on_metrics(ev):
         metrics.log_metrics(ev.metrics)
         usage_collector.collect(ev.metrics)
+        latency.collect(ev.metrics)
+
+    # Event-loop lag and per-tool timings. A stall or a tool step longer
+    # than WELLNESS_SLOW_CALLBACK_MS is logged, a stall with the loop's stack
+    slow_callback = float(os.getenv("WELLNESS_SLOW_CALLBACK_MS", "100")) / 1000 or None
+    loop_lag = LoopLagMonitor(slow_threshold=slow_callback)
+    loop_lag.start()
+    tool_profiler = ToolProfiler(slow_threshold=slow_callback)
+
+    tts_cache = ctx.proc.userdata["tts_cache"]
+    # WELLNESS_TTS_SPECULATE=1 renders the recap before the reply is known.
+    # Off by default: unprompted replies rarely say it word for word
+    speculative = None
+    if os.getenv("WELLNESS_TTS_SPECULATE", "0") == "1":
+        speculative = SpeculativeSpeech(tts_cache, tts_engine)
 
     async def log_usage():
         summary = usage_collector.get_summary()
         logger.info(f"Usage summary: {summary}")
+        logger.info(f"Function tools: {tool_profiler.summary()}")
+        logger.info(f"Event loop lag: {loop_lag.summary()}")
+        logger.info(
+            f"TTS cache: {tts_cache.stats} hit_rate={tts_cache.stats.hit_rate:.2f}"
+        )
+        if speculative is not None:
+            speculative.discard()
+            logger.info(
+                f"Speculative TTS: {speculative.stats} "
+                f"hit_rate={speculative.stats.hit_rate:.2f}"
+            )
+        logger.info(f"Latency: {latency.summary()}")
+        logger.info(
+            f"Speech connections: {connection_stats} "
+            f"reuse_rate={connection_stats.reuse_rate:.2f}"
+        )
+        batcher = getattr(ctx.proc.userdata["vad"], "batcher", None)
+        if batcher is not None:
+            logger.info(
+                f"VAD batches: {batcher.stats} mean_batch={batcher.stats.mean_batch:.1f}"
+            )
+        try:
+            await asyncio.to_thread(
+                latency.write_snapshot, os.path.join(metrics_dir(), "latency.json")
+            )
+        except OSError as e:
+            logger.warning(f"Failed to write latency snapshot: {e}")
 
     ctx.add_shutdown_callback(log_usage)
+    ctx.add_shutdown_callback(http_session.close)
+    ctx.add_shutdown_callback(clients["llm"].aclose)
+
+    writer = ctx.proc.userdata["writer"]
+    agent_instance = None
+
+    async def flush_checkins():
+        if agent_instance is not None:
+            # Usually saved already, when the session closed
+            await agent_instance.save()
+        try:
+            await writer.drain(timeout=5.0)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Check-in writer still has {writer.pending()} check-ins to write; "
+                "they are lost if the process exits first"
+            )
+        logger.info(f"Check-in writer: {writer.stats}")
+
+    ctx.add_shutdown_callback(flush_checkins)
+
+    # CPU, memory and event-loop lag of this session, read by the worker's
+    # admission control
+    load_reporter = LoadReporter(
+        os.path.join(metrics_dir(), "load"), ctx.job.id, loop_lag
+    )
+    load_reporter.start()
+    ctx.add_shutdown_callback(load_reporter.aclose)
+    ctx.add_shutdown_callback(loop_lag.aclose)
 
-    agent_instance = WellnessCompanion()
+    # Connect to room and wait for the user, whose identity keys their history
+    await ctx.connect()
+    participant = await ctx.wait_for_participant()
+
+    agent_instance = WellnessCompanion(
+        store=writer.store,
+        writer=writer,
+        user_id=participant.identity,
+        trend=await asyncio.to_thread(load_trend, writer.store, participant.identity),
+        speculative=speculative,
+        profiler=tool_profiler,
+    )
 
     # Start session
     await session.start(agent=agent_instance, room=ctx.room, room_input_options=None)
 
-    # Send friendly welcome TTS
-    await session.tts.speak(agent_instance.get_welcome_tts())
+    # Send friendly welcome TTS, replayed from the phrase cache when possible
+    tts_cache.say(session, agent_instance.get_welcome_tts())
 
-    # Connect to room
-    await ctx.connect()
+
+def warm_tts_cache() -> int:
+    """``warm-tts``: synthesize the scripted phrases into the disk cache.
+
+    Run once per deployment (voice or phrase change), so sessions never
+    spend TTS requests on phrases they might not speak.
+    """
+    import aiohttp
+    from livekit.plugins import murf
+
+    tts_cache = open_tts_cache()
+    if not tts_cache.disk_dir:
+        print("WELLNESS_TTS_CACHE_DIR is empty, nothing to warm")
+        return 1
+
+    async def warm() -> int:
+        async with aiohttp.ClientSession() as http_session:
+            engine = murf.TTS(
+                voice=TTS_VOICE, style=TTS_STYLE, http_session=http_session
+            )
+            try:
+                return await tts_cache.warm(engine, scripted_phrases())
+            finally:
+                await engine.aclose()
+
+    added = asyncio.run(warm())
+    print(f"Cached {added} new phrases in {tts_cache.disk_dir}")
+    return 0
+
+
+def profile_startup() -> int:
+    """``--profile-startup``: report import and prewarm time per component"""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    print("Imports of agent.py without plugins (fresh interpreter):")
+    for package, secs in import_breakdown("import agent", cwd=src_dir):
+        print(f"  {package:<32} {secs * 1000:7.0f}ms")
+
+    timer = WarmupTimer()
+    import_plugins(timer=timer)
+    print(f"Plugin imports: {timer.summary()}")
+
+    proc = JobProcess(
+        executor_type=JobExecutorType.PROCESS, user_arguments=None, http_proxy=None
+    )
+    prewarm(proc)
+    print(f"Prewarm: {proc.userdata['warmup'].summary()}")
+    proc.userdata["writer"].close()
+    return 0
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
+    if "--profile-startup" in sys.argv[1:]:
+        sys.exit(profile_startup())
+    if sys.argv[1:2] == ["warm-tts"]:
+        sys.exit(warm_tts_cache())
+
+    # Plugins register on import, in the main process before the worker starts
+    download_only = sys.argv[1:2] == ["download-files"]
+    import_plugins(DOWNLOAD_PLUGINS if download_only else PLUGINS)
+
+    # Prometheus /metrics on WELLNESS_METRICS_PORT (empty to disable), over
+    # the multiprocess directory set up before the imports
+    metrics_port = os.getenv("WELLNESS_METRICS_PORT", "9464")
+
+    # WELLNESS_JOB_EXECUTOR=thread runs jobs as threads of one process,
+    # which then share a batched VAD
+    worker_options = {}
+    executor = os.getenv("WELLNESS_JOB_EXECUTOR")
+    if executor:
+        worker_options["job_executor_type"] = JobExecutorType(executor)
+
+    # Admission control: the worker reports itself full once one more
+    # session would pass a CPU, memory, loop lag or session limit.
+    # WELLNESS_ADMISSION=0 keeps LiveKit's CPU-only load.
+    if os.getenv("WELLNESS_ADMISSION", "1") == "1" and not download_only:
+        shutil.rmtree(os.path.join(metrics_dir(), "load"), ignore_errors=True)
+        controller = admission_controller()
+        worker_options["load_fnc"] = controller.load
+        worker_options["load_threshold"] = controller.threshold
+
+    cli.run_app(
+        WorkerOptions(
+            entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            **worker_options,
+            prometheus_port=int(metrics_port) if metrics_port else NOT_GIVEN,
+            prometheus_multiproc_dir=os.environ["PROMETHEUS_MULTIPROC_DIR"],
+        )
+    )
@@ -0,0 +1,23 @@
+# Storage and runtime helpers for the wellness companion agent
+from .journal import CheckinJournal
+from .partitioned import PartitionedJournalStore
+from .records import CheckinColumns, CheckinRecord, Rating
+from .segmented import SegmentedJournalStore
+from .sqlite_store import SQLiteStore
+from .store import CheckinStore
+from .trends import TrendSummary
+from .writer import PersistenceWriter, WriterFullError
+
+__all__ = [
+    "CheckinColumns",
+    "CheckinJournal",
+    "CheckinRecord",
+    "CheckinStore",
+    "PartitionedJournalStore",
+    "PersistenceWriter",
+    "Rating",
+    "SQLiteStore",
+    "SegmentedJournalStore",
+    "TrendSummary",
+    "WriterFullError",
+]
@@ -0,0 +1,264 @@
+"""Admission control: report the worker full before a new session breaks latency"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import prometheus_client
+import psutil
+from livekit.agents import utils
+
+from .latency import LoopLagMonitor
+
+logger = logging.getLogger("agent")
+
+PRESSURE = prometheus_client.Gauge(
+    "wellness_admission_pressure",
+    "Projected use of each admission limit with one more session (1 = at limit)",
+    ["resource", "nodename"],
+    multiprocess_mode="livemax",
+)
+AVAILABLE = prometheus_client.Gauge(
+    "wellness_admission_available",
+    "Whether the worker accepts new sessions",
+    ["nodename"],
+    multiprocess_mode="livemax",
+)
+LIMIT = prometheus_client.Gauge(
+    "wellness_admission_limit",
+    "Configured admission limit by resource",
+    ["resource", "nodename"],
+    multiprocess_mode="livemax",
+)
+
+
+@dataclass
+class AdmissionLimits:
+    cpu: float = 0.75  # host CPU fraction
+    memory: float = 0.85  # host memory fraction
+    loop_lag: float = 0.1  # seconds, p95 of the worst session's event loop
+    sessions: int = 0  # sessions per worker, 0 for no cap
+    # Cost of a session until one has been measured
+    session_cpu: float = 0.05
+    session_memory: int = 150 * 1024 * 1024
+
+
+@dataclass
+class LoadSample:
+    host_cpu: float  # fraction of the host's CPUs in use
+    memory_used: float  # fraction of host memory in use
+    memory_total: int
+    reports: list[dict]
+
+
+def pressures(limits: AdmissionLimits, sample: LoadSample) -> dict[str, float]:
+    """Projected use of each limit once one more session is admitted.
+
+    A session's cost is the mean of the running sessions' reports, or the
+    limits' priors while none runs. Sessions of a thread executor share a
+    process, so each of its reports stands for its share of the process.
+    The worst loop lag is scaled as if it grew with the number of sessions.
+    """
+    sharing: dict[int, int] = {}
+    for report in sample.reports:
+        sharing[report["pid"]] = sharing.get(report["pid"], 0) + 1
+    n = len(sample.reports)
+    if n:
+        session_cpu = sum(r["cpu"] / sharing[r["pid"]] for r in sample.reports) / n
+        session_memory = sum(r["memory"] for r in sample.reports) / n
+        loop_lag = max(r["lag_p95"] for r in sample.reports) * (n + 1) / n
+    else:
+        session_cpu, session_memory = limits.session_cpu, limits.session_memory
+        loop_lag = 0.0
+
+    result = {
+        "cpu": (sample.host_cpu + session_cpu) / limits.cpu,
+        "memory": (sample.memory_used + session_memory / sample.memory_total)
+        / limits.memory,
+        "loop_lag": loop_lag / limits.loop_lag,
+    }
+    if limits.sessions:
+        result["sessions"] = (n + 1) / limits.sessions
+    return result
+
+
+class LoadReporter:
+    """Writes a job's CPU, memory growth and loop lag for the worker to read.
+
+    The report is ``<directory>/<job_id>.json``, replaced every ``interval``
+    seconds and removed when the job ends.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        job_id: str,
+        lag: LoopLagMonitor,
+        *,
+        interval: float = 2.0,
+    ):
+        self.path = os.path.join(directory, f"{job_id}.json")
+        self.interval = interval
+        self._lag = lag
+        self._process = psutil.Process()
+        self._cpus = utils.hw.get_cpu_monitor().cpu_count()
+        self._baseline = self._process.memory_info().rss
+        self._process.cpu_percent(None)  # starts the CPU measurement
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="wellness-load-report")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
+
+    def report(self) -> dict:
+        return {
+            "pid": self._process.pid,
+            "cpu": self._process.cpu_percent(None) / 100 / self._cpus,
+            "memory": max(0, self._process.memory_info().rss - self._baseline),
+            "lag_p95": self._lag.recent(0.95),
+            "time": time.time(),
+        }
+
+    def write(self) -> None:
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.report(), f)
+        os.replace(tmp, self.path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self.write)
+            except OSError as e:
+                logger.warning(f"Failed to write load report: {e}")
+
+
+def read_reports(directory: str, *, stale_after: float) -> list[dict]:
+    """Reports of the running jobs, skipping those not refreshed in time"""
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    now = time.time()
+    reports = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed as the job ended
+        if now - report["time"] <= stale_after:
+            reports.append(report)
+    return reports
+
+
+class AdmissionController:
+    """The worker's ``load_fnc``, from host load and its jobs' reports.
+
+    The load is ``threshold`` times the highest pressure, so the worker
+    turns full (load >= threshold) as soon as one more session would take
+    any resource past its limit.
+    """
+
+    def __init__(
+        self,
+        limits: AdmissionLimits,
+        directory: str,
+        *,
+        threshold: float = 0.7,
+        stale_after: float = 10.0,
+        cpu: Callable[[], float] | None = None,
+    ):
+        self.limits = limits
+        self.directory = directory
+        self.threshold = threshold
+        self.stale_after = stale_after
+        self.pressures: dict[str, float] = {}
+        self.available = True
+        self._nodename = utils.nodename()
+        self._cpu = cpu
+        if cpu is None:
+            self._cpu_avg = utils.MovingAverage(5)
+            self._cpu_lock = threading.Lock()
+            self._cpu_monitor = utils.hw.get_cpu_monitor()
+            threading.Thread(
+                target=self._sample_cpu, name="wellness-admission-cpu", daemon=True
+            ).start()
+        self._logged = False
+
+    def _sample_cpu(self) -> None:
+        while True:
+            used = self._cpu_monitor.cpu_percent(interval=0.5)
+            with self._cpu_lock:
+                self._cpu_avg.add_sample(used)
+
+    def host_cpu(self) -> float:
+        if self._cpu is not None:
+            return self._cpu()
+        with self._cpu_lock:
+            return self._cpu_avg.get_avg()
+
+    def sample(self) -> LoadSample:
+        memory = psutil.virtual_memory()
+        return LoadSample(
+            host_cpu=self.host_cpu(),
+            memory_used=1 - memory.available / memory.total,
+            memory_total=memory.total,
+            reports=read_reports(self.directory, stale_after=self.stale_after),
+        )
+
+    def log_limits(self) -> None:
+        limits = self.limits
+        for resource, value in (
+            ("cpu", limits.cpu),
+            ("memory", limits.memory),
+            ("loop_lag", limits.loop_lag),
+            ("sessions", limits.sessions),
+        ):
+            LIMIT.labels(resource=resource, nodename=self._nodename).set(value)
+        logger.info(
+            f"Admission limits: cpu={limits.cpu:.0%} memory={limits.memory:.0%} "
+            f"loop_lag_p95={limits.loop_lag * 1000:.0f}ms "
+            f"sessions={limits.sessions or 'unlimited'} threshold={self.threshold}"
+        )
+
+    def load(self) -> float:
+        # The first call comes from the running worker, once logging is set up
+        if not self._logged:
+            self._logged = True
+            self.log_limits()
+        self.pressures = pressures(self.limits, self.sample())
+        for resource, value in self.pressures.items():
+            PRESSURE.labels(resource=resource, nodename=self._nodename).set(value)
+
+        resource, highest = max(self.pressures.items(), key=lambda item: item[1])
+        available = highest < 1.0
+        AVAILABLE.labels(nodename=self._nodename).set(int(available))
+        if available != self.available:
+            self.available = available
+            detail = " ".join(f"{k}={v:.2f}" for k, v in self.pressures.items())
+            if available:
+                logger.info(f"Accepting sessions again ({detail})")
+            else:
+                logger.warning(f"Worker full: {resource} at limit ({detail})")
+        return min(1.0, self.threshold * highest)
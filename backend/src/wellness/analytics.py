@@ -0,0 +1,208 @@
+"""Weekly trends, cohort averages and anomaly flags over the check-in history.
+
+Every report is computed with vectorized NumPy operations on the columns of
+a :class:`~wellness.records.CheckinColumns`, so the cost per check-in is a
+few array passes rather than a Python loop. Weeks start on Monday, UTC.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+from collections.abc import Sequence
+from typing import IO, Any
+
+import numpy as np
+
+from .records import CheckinColumns
+from .trends import SCALES
+
+DAY = 86400
+WEEK = 7 * DAY
+_EPOCH_TO_MONDAY = 3 * DAY  # 1970-01-01 was a Thursday
+
+# Direction of a worrying change per scale
+_WORSE = {"mood": -1, "energy": -1, "stress": 1}
+
+
+def _week_start(week: int) -> str:
+    ts = int(week) * WEEK - _EPOCH_TO_MONDAY
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).date().isoformat()
+
+
+def _mean(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _week_starts(weeks: np.ndarray) -> list[str]:
+    starts = {week: _week_start(week) for week in np.unique(weeks).tolist()}
+    return [starts[week] for week in weeks.tolist()]
+
+
+def _rounded(values: np.ndarray) -> list[Any]:
+    """Rounded values as Python floats, ``None`` for NaN"""
+    rounded = np.round(values, 2)
+    return [None if v != v else v for v in rounded.tolist()]
+
+
+def _rows(**columns: Any) -> list[dict[str, Any]]:
+    """Report rows from equal-length columns; NumPy float columns are rounded"""
+    names = list(columns)
+    values = [_rounded(c) if isinstance(c, np.ndarray) else c for c in columns.values()]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+class History:
+    """NumPy views of check-in columns, with the timestamp-less rows dropped"""
+
+    def __init__(self, columns: CheckinColumns):
+        arrays = columns.to_numpy()
+        keep = arrays["timestamps"] > 0
+        self.strings = columns.strings
+        self.timestamps = arrays["timestamps"][keep]
+        self.users = arrays["user_ids"][keep].astype(np.int64)
+        self.scales = {scale: arrays[scale][keep] for scale in SCALES}
+        self.weeks = (self.timestamps + _EPOCH_TO_MONDAY) // WEEK
+        self.weeks = self.weeks.astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def _group(
+        outer: np.ndarray, inner: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Distinct ``(outer, inner)`` pairs, sorted, and each check-in's pair.
+
+        Both keys are packed into one int64 so that grouping is a single
+        1-D sort.
+        """
+        low = int(inner.min())
+        span = int(inner.max()) - low + 1
+        packed = outer.astype(np.int64) * span + (inner - low)
+        keys, inverse = np.unique(packed, return_inverse=True)
+        return keys // span, keys % span + low, inverse.reshape(-1)
+
+    def _scale_means(self, inverse: np.ndarray, n: int) -> dict[str, np.ndarray]:
+        means = {}
+        for scale, values in self.scales.items():
+            rated = values > 0
+            sums = np.bincount(inverse, weights=values, minlength=n)
+            counts = np.bincount(inverse, weights=rated, minlength=n)
+            means[scale] = _mean(sums, counts)
+        return means
+
+    def weekly_trends(self) -> list[dict[str, Any]]:
+        """Check-ins and average ratings per user and week"""
+        if not len(self):
+            return []
+        users, weeks, inverse = self._group(self.users, self.weeks)
+        checkins = np.bincount(inverse, minlength=len(users))
+        means = self._scale_means(inverse, len(users))
+        return _rows(
+            user_id=[self.strings[user] for user in users.tolist()],
+            week=_week_starts(weeks),
+            checkins=checkins.tolist(),
+            **means,
+        )
+
+    def cohort_averages(self) -> list[dict[str, Any]]:
+        """Average ratings by first check-in week and weeks since then.
+
+        Users are grouped into cohorts by the week of their first check-in,
+        so each row shows how a cohort is doing ``weeks_since`` weeks later.
+        """
+        if not len(self):
+            return []
+        first = np.full(len(self.strings), np.iinfo(np.int64).max)
+        np.minimum.at(first, self.users, self.weeks)
+        cohorts = first[self.users]
+        since = self.weeks - cohorts
+
+        cohort, weeks, inverse = self._group(cohorts, since)
+        checkins = np.bincount(inverse, minlength=len(cohort))
+        means = self._scale_means(inverse, len(cohort))
+        # Distinct users per group
+        user_groups = self._group(inverse, self.users)[0]
+        users = np.bincount(user_groups, minlength=len(cohort))
+        return _rows(
+            cohort=_week_starts(cohort),
+            weeks_since=weeks.tolist(),
+            users=users.tolist(),
+            checkins=checkins.tolist(),
+            **means,
+        )
+
+    def anomalies(
+        self, *, window: int = 5, threshold: float = 1.5, min_history: int = 3
+    ) -> list[dict[str, Any]]:
+        """Check-ins where a rating moved sharply the worrying way.
+
+        A rating is flagged when it is at least ``threshold`` points worse
+        (lower mood or energy, higher stress) than the mean of the same
+        user's previous ``window`` ratings, given at least ``min_history``
+        of them.
+        """
+        order = np.lexsort((self.timestamps, self.users))
+        found = []
+        for s, (scale, values) in enumerate(self.scales.items()):
+            idx = order[values[order] > 0]
+            if not len(idx):
+                continue
+            users = self.users[idx]
+            v = values[idx].astype(np.float64)
+
+            # Position of each rating within its user's run of ratings
+            starts = np.r_[0, np.flatnonzero(np.diff(users)) + 1]
+            run_start = np.repeat(starts, np.diff(np.r_[starts, len(users)]))
+            position = np.arange(len(users)) - run_start
+
+            # Mean of the previous `window` ratings, from a running sum
+            history = np.minimum(position, window)
+            cumsum = np.r_[0.0, np.cumsum(v)]
+            at = np.arange(len(v))
+            baseline = _mean(cumsum[at] - cumsum[at - history], history)
+
+            change = v - baseline
+            flagged = (history >= min_history) & (_WORSE[scale] * change >= threshold)
+            found.append(
+                (
+                    idx[flagged],
+                    np.full(np.count_nonzero(flagged), s),
+                    v[flagged],
+                    baseline[flagged],
+                    change[flagged],
+                )
+            )
+        if not found:
+            return []
+
+        checkin, scale, value, baseline, change = map(np.concatenate, zip(*found))
+        by_time = np.lexsort((scale, self.users[checkin], self.timestamps[checkin]))
+        checkin, scale = checkin[by_time], scale[by_time]
+        scales = list(self.scales)
+        return _rows(
+            user_id=[self.strings[u] for u in self.users[checkin].tolist()],
+            timestamp=[
+                datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat()
+                for ts in self.timestamps[checkin].tolist()
+            ],
+            scale=[scales[s] for s in scale.tolist()],
+            value=value[by_time].astype(np.int64).tolist(),
+            baseline=baseline[by_time],
+            change=change[by_time],
+        )
+
+
+def write_report(rows: Sequence[dict[str, Any]], f: IO[str], fmt: str = "csv") -> None:
+    """Write report rows as CSV (with a header row) or a JSON array"""
+    if fmt == "json":
+        json.dump(list(rows), f, indent=1)
+        f.write("\n")
+        return
+    if rows:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,168 @@
+"""Commands that do not run the agent, and the store they share with it.
+
+This module only depends on the standard library and the ``wellness``
+storage modules, so ``agent.py`` runs these commands, and sets up the
+metrics directory, before it imports LiveKit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import time
+from typing import Callable
+
+from .partitioned import PartitionedJournalStore
+from .segmented import SegmentedJournalStore
+from .sqlite_store import SQLiteStore
+from .store import CheckinStore
+
+_STORE_FILES = {
+    "sqlite": "wellness.db",
+    "journal": "wellness_log",
+    "segmented": "wellness_segments",
+}
+
+
+def _data_path(name: str) -> str:
+    return os.path.join(os.getcwd(), "backend", name)
+
+
+def store_path() -> str:
+    """Where the store picked by ``WELLNESS_STORE`` keeps its check-ins"""
+    backend = os.getenv("WELLNESS_STORE", "sqlite")
+    if backend not in _STORE_FILES:
+        raise ValueError(
+            f"Unknown WELLNESS_STORE '{backend}'. Allowed: {', '.join(sorted(_STORE_FILES))}"
+        )
+    return _data_path(_STORE_FILES[backend])
+
+
+def open_store() -> CheckinStore:
+    """Open the configured check-in store, importing older logs on first use.
+
+    ``WELLNESS_STORE=sqlite`` (the default) suits many job processes
+    writing at once; ``journal`` keeps one JSON Lines log per user and
+    ``segmented`` one log split into daily, compressed segments, both
+    shared between processes through file locks.
+    """
+    path = store_path()
+    journal_file = _data_path("wellness_log.jsonl")
+    legacy_file = _data_path("wellness_log.json")
+    fsync = os.getenv("WELLNESS_FSYNC", "interval") == "always"
+
+    backend = os.getenv("WELLNESS_STORE", "sqlite")
+    if backend == "sqlite":
+        store = SQLiteStore(path, fsync=fsync)
+        store.import_log(journal_file if os.path.exists(journal_file) else legacy_file)
+        return store
+    if backend == "journal":
+        compact_every = int(os.getenv("WELLNESS_COMPACT_EVERY", "0")) or None
+        return PartitionedJournalStore(
+            path,
+            legacy_paths=(journal_file, legacy_file),
+            fsync=fsync,
+            compact_every=compact_every,
+        )
+    segment_mb = float(os.getenv("WELLNESS_SEGMENT_MB", "0"))
+    return SegmentedJournalStore(
+        path,
+        daily=os.getenv("WELLNESS_SEGMENT_DAILY", "1") == "1",
+        max_bytes=int(segment_mb * 2**20) or None,
+        compression=os.getenv("WELLNESS_SEGMENT_COMPRESSION", "gzip") or None,
+        legacy_paths=(journal_file, legacy_file),
+        fsync=fsync,
+    )
+
+
+def metrics_dir() -> str:
+    """Directory for latency snapshots and Prometheus multiprocess files"""
+    return os.getenv(
+        "WELLNESS_METRICS_DIR", os.path.join(os.getcwd(), "backend", "metrics")
+    )
+
+
+def use_prometheus_dir() -> None:
+    """Collect the Prometheus samples of every process of the worker in one place.
+
+    Job processes inherit ``PROMETHEUS_MULTIPROC_DIR`` and write their
+    samples there, so the worker's endpoint reports every session on this
+    host. ``prometheus_client`` reads it when first imported, so this runs
+    before anything imports it.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        prometheus_dir = os.path.join(metrics_dir(), "prometheus")
+        shutil.rmtree(prometheus_dir, ignore_errors=True)  # files of old processes
+        os.makedirs(prometheus_dir, exist_ok=True)
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = prometheus_dir
+
+
+def run_analytics(argv: list[str]) -> int:
+    """``python src/agent.py analytics``: write history reports from the store"""
+    from .analytics import History, write_report
+
+    parser = argparse.ArgumentParser(
+        prog="agent.py analytics",
+        description="Weekly trends, cohort averages and anomaly flags",
+    )
+    parser.add_argument(
+        "--report",
+        nargs="+",
+        choices=["weekly", "cohorts", "anomalies"],
+        default=["weekly", "cohorts", "anomalies"],
+    )
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument(
+        "--out", default=os.path.join(os.getcwd(), "backend", "reports")
+    )
+    parser.add_argument("--user", help="only this user's check-ins")
+    parser.add_argument(
+        "--window", type=int, default=5, help="ratings in an anomaly baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=1.5, help="change flagged as an anomaly"
+    )
+    args = parser.parse_args(argv)
+
+    # Reports only read: a missing store is not created just to be empty
+    sources = [
+        store_path(),
+        _data_path("wellness_log.jsonl"),
+        _data_path("wellness_log.json"),
+    ]
+    if not any(os.path.exists(path) for path in sources):
+        print(f"No check-ins to report on: {store_path()} does not exist")
+        return 1
+
+    started = time.perf_counter()
+    store = open_store()
+    try:
+        history = History(store.columns(args.user))
+    finally:
+        store.close()
+    print(f"Loaded {len(history)} check-ins in {time.perf_counter() - started:.2f}s")
+
+    reports = {
+        "weekly": history.weekly_trends,
+        "cohorts": history.cohort_averages,
+        "anomalies": lambda: history.anomalies(
+            window=args.window, threshold=args.threshold
+        ),
+    }
+    os.makedirs(args.out, exist_ok=True)
+    for name in args.report:
+        t0 = time.perf_counter()
+        rows = reports[name]()
+        elapsed = time.perf_counter() - t0
+        path = os.path.join(args.out, f"{name}.{args.format}")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            write_report(rows, f, args.format)
+        print(f"{name}: {len(rows)} rows in {elapsed:.2f}s -> {path}")
+    return 0
+
+
+# ``python src/agent.py <name> ...`` runs ``COMMANDS[name](argv)`` and exits
+COMMANDS: dict[str, Callable[[list[str]], int]] = {
+    "analytics": run_analytics,
+}
@@ -0,0 +1,68 @@
+"""Connection counts of a job's HTTP session to the speech providers"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+import aiohttp
+import prometheus_client
+from livekit.agents import utils
+
+CONNECTIONS = prometheus_client.Counter(
+    "wellness_speech_connections",
+    "Connections to the speech providers by event (opened, reused)",
+    ["event", "nodename"],
+)
+
+
+@dataclass
+class ConnectionStats:
+    opened: int = 0  # TCP/TLS connections opened, websocket upgrades included
+    reused: int = 0  # requests sent on a kept-alive connection
+    connect_time: float = 0.0  # seconds spent opening connections
+
+    @property
+    def reuse_rate(self) -> float:
+        total = self.opened + self.reused
+        return self.reused / total if total else 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Counts the connections of the session it is given to in these stats"""
+        nodename = utils.nodename()
+
+        def count(event: str) -> None:
+            setattr(self, event, getattr(self, event) + 1)
+            CONNECTIONS.labels(event=event, nodename=nodename).inc()
+
+        async def on_create_start(session, ctx, params) -> None:
+            ctx.connect_start = asyncio.get_running_loop().time()
+
+        async def on_create_end(session, ctx, params) -> None:
+            self.connect_time += asyncio.get_running_loop().time() - ctx.connect_start
+            count("opened")
+
+        async def on_reuse(session, ctx, params) -> None:
+            count("reused")
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_start.append(on_create_start)
+        trace.on_connection_create_end.append(on_create_end)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+
+def speech_session(
+    stats: ConnectionStats, proxy: str | None = None
+) -> aiohttp.ClientSession:
+    """HTTP session of one job's speech clients, counting its connections.
+
+    It is configured like the job session LiveKit gives plugins
+    (``utils.http_context``): idle connections stay open for 120 seconds,
+    at most 50 per host. LiveKit's session takes no trace hooks, so the job
+    opens this one to count connections, and closes it when it ends.
+    """
+    connector = aiohttp.TCPConnector(limit_per_host=50, keepalive_timeout=120)
+    return aiohttp.ClientSession(
+        connector=connector, proxy=proxy, trace_configs=[stats.trace_config()]
+    )
@@ -0,0 +1,121 @@
+"""Reading mood, energy and stress ratings straight from a transcript"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from .trends import SCALES, scale_value
+
+# Words people use instead of a number, per scale
+_LEVELS = {
+    "very low": 1, "very bad": 1, "terrible": 1, "awful": 1, "exhausted": 1,
+    "drained": 1, "very high": 5, "great": 5, "excellent": 5, "amazing": 5,
+    "fantastic": 5, "bad": 2, "low": 2, "down": 2, "tired": 2,
+    "meh": 3, "okay": 3, "ok": 3, "fine": 3, "alright": 3, "medium": 3,
+    "moderate": 3, "average": 3, "so-so": 3, "good": 4, "high": 4, "pretty good": 4,
+}  # fmt: skip
+_STRESS_LEVELS = {
+    "not stressed": 1, "no stress": 1, "relaxed": 1, "calm": 1,
+    "a bit stressed": 2, "a little stressed": 2, "slightly stressed": 2,
+    "stressed": 3, "quite stressed": 4, "very stressed": 4, "really stressed": 4,
+    "overwhelmed": 5, "super stressed": 5,
+}  # fmt: skip
+
+_CUES = {
+    "mood": re.compile(r"\bmood\b"),
+    "energy": re.compile(
+        r"\benergy\b|\benergetic\b|\btired\b|\bexhausted\b|\bdrained\b"
+    ),
+    "stress": re.compile(r"\bstress(ed|ful)?\b|\boverwhelmed\b|\brelaxed\b"),
+}
+_FEELING = re.compile(r"\b(i'?m|i am|feeling|i feel)\b")
+# Words around a bare answer: "I'm feeling pretty good", "I'd say a four today"
+_LEAD = re.compile(
+    r"^(?:(?:i'?m|i am|i feel|feeling|it'?s|i'?d say|i guess|probably|maybe"
+    r"|about|around|like|um|uh|so|pretty|quite|a|an)\s+)*"
+)
+_TRAIL = re.compile(
+    r"(?:\s+(?:out of (?:5|five)|today|right now|now|i guess|i think))*$"
+)
+_CLAUSES = re.compile(r"[,.;!?]|\bbut\b|\band\b")
+_NUMBER = re.compile(r"\b([1-5]|one|two|three|four|five)\b")
+_NEGATION = re.compile(r"\b(not|no|never|isn't|wasn't|don't)\b")
+
+
+def _level(text: str, levels: dict[str, int]) -> int | None:
+    # Longest phrase first, so "very low" wins over "low"
+    for phrase in sorted(levels, key=len, reverse=True):
+        if re.search(rf"\b{re.escape(phrase)}\b", text):
+            return levels[phrase]
+    return None
+
+
+def _answer(clause: str, scale: str, *, numbers: bool) -> int | None:
+    """Rating when ``clause`` is nothing but a level, like "pretty good" """
+    text = _TRAIL.sub("", _LEAD.sub("", clause.strip()))
+    if numbers and _NUMBER.fullmatch(text):
+        return scale_value(text)
+    if scale == "stress" and text in _STRESS_LEVELS:
+        return _STRESS_LEVELS[text]
+    return _LEVELS.get(text)
+
+
+def asked_scale(question: str) -> str | None:
+    """The one scale ``question`` asks about, e.g. "How's your energy?" """
+    scales = [scale for scale in SCALES if _CUES[scale].search(question.lower())]
+    return scales[0] if len(scales) == 1 else None
+
+
+def parse_rating(scale: str, value: Any) -> int | None:
+    """1-5 rating from a number (``"4"``, ``"four"``) or a level word (``"good"``)"""
+    text = str(value).strip().lower()
+    if isinstance(value, (int, float)) or re.search(r"\d", text):
+        number = scale_value(value)
+        if number is not None:
+            return number
+    # Level phrases before number words: "one of my good days" is good
+    if scale == "stress":
+        rating = _level(text, _STRESS_LEVELS)
+        if rating is not None:
+            return rating
+    rating = _level(text, _LEVELS)
+    if rating is not None:
+        return rating
+    return scale_value(text)
+
+
+def extract_ratings(transcript: str, asked: str | None = None) -> dict[str, int]:
+    """Ratings stated explicitly in ``transcript``, e.g. "mood's good, energy's low".
+
+    Each clause must name a scale and give one unambiguous level, and negated
+    clauses other than "not stressed" are skipped, so anything uncertain is
+    left to the LLM. A clause naming no scale counts only when it is nothing
+    but a level: for the scale just ``asked`` about ("pretty good", "a
+    four"), or for mood when it says how the user feels ("I'm fine").
+    """
+    ratings: dict[str, int] = {}
+    for clause in _CLAUSES.split(transcript.lower().replace("\u2019", "'")):
+        scales = [scale for scale in SCALES if _CUES[scale].search(clause)]
+        if not scales:
+            scale = asked or ("mood" if _FEELING.search(clause) else None)
+            rating = scale and _answer(clause, scale, numbers=asked is not None)
+            if rating is not None:
+                ratings[scale] = rating
+            continue
+        if len(scales) != 1:
+            continue
+        (scale,) = scales
+
+        if scale == "stress":
+            rating = _level(clause, _STRESS_LEVELS)
+            if rating is not None:
+                ratings[scale] = rating
+                continue
+        if _NEGATION.search(clause):
+            continue
+        number = _NUMBER.search(clause)
+        rating = scale_value(number.group()) if number else _level(clause, _LEVELS)
+        if rating is not None:
+            ratings[scale] = rating
+    return ratings
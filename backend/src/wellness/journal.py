@@ -0,0 +1,635 @@
+"""Append-only JSON Lines journal for completed check-ins"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from collections.abc import Iterator
+from typing import Any, Callable
+
+from .store import CheckinStore, TimeLike, record_time, to_epoch
+from .trends import TrendSummary
+
+try:
+    import fcntl
+except ImportError:  # Windows: a journal is assumed to have a single writer
+    fcntl = None
+
+logger = logging.getLogger("agent")
+
+# How far back from the end of the file recovery looks for a torn record
+_TAIL_SCAN_BYTES = 64 * 1024
+
+# One index entry per record: byte offset in the journal and epoch timestamp
+_INDEX_ENTRY = struct.Struct("<Qd")
+
+# Positions of each user's newest check-ins kept with the trend summaries
+_RECENT_PER_USER = 16
+
+
+def _is_record(line: bytes) -> bool:
+    try:
+        return isinstance(json.loads(line), dict)
+    except ValueError:
+        return False
+
+
+def _encode(record: dict[str, Any]) -> bytes:
+    return (
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
+        return  # not supported on every platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _create_directory(directory: str, fill: Callable[[str], None]) -> None:
+    """Create ``directory`` with what ``fill`` writes into it, all at once.
+
+    ``fill`` writes to a staging directory that is renamed into place, so a
+    process opening the same store meanwhile finds either no directory or a
+    complete one. When several processes race, the first rename wins.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=os.path.basename(directory) + ".", dir=parent)
+    try:
+        fill(staging)
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            if not os.path.isdir(directory):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def _read_at(fd: int, size: int, offset: int) -> bytes:
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _iter_lines(path: str, end: int | None = None) -> Iterator[dict[str, Any]]:
+    pos = 0
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, start=1):
+            if end is not None and pos >= end:
+                break
+            pos += len(line)
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping corrupt record at {path}:{lineno}")
+
+
+def read_log(path: str) -> list[dict[str, Any]]:
+    """Check-ins of a JSON Lines journal or of the old JSON array log.
+
+    The file is only read: unlike opening it as a :class:`CheckinJournal`,
+    a torn last line is skipped rather than trimmed and no index is written.
+    """
+    if path.endswith(".jsonl"):
+        return [r for r in _iter_lines(path) if isinstance(r, dict)]
+    with open(path, encoding="utf-8") as f:
+        return [r for r in json.load(f) if isinstance(r, dict)]
+
+
+class _FileLock:
+    """Re-entrant exclusive ``flock`` on a lock file, shared with other processes.
+
+    Callers hold a thread lock around it; without ``fcntl`` it does nothing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+        self._depth = 0
+
+    def __enter__(self) -> _FileLock:
+        if fcntl is not None:
+            if not self._depth:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if fcntl is not None:
+            self._depth -= 1
+            if not self._depth:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        if self._fd is not None and not self._depth:
+            os.close(self._fd)
+            self._fd = None
+
+
+class CheckinJournal(CheckinStore):
+    """Check-in log stored as one JSON object per line.
+
+    Saving a check-in appends a single line, so the cost of a save does not
+    depend on how many check-ins are already stored. A crash in the middle of
+    a write can only leave a partial last line, which is trimmed the next time
+    the journal is opened.
+
+    A sidecar ``.idx`` file holds the byte offset and timestamp of every
+    record. Opening the journal only reconciles the end of that index, and
+    records are parsed when they are accessed, so ``journal[-1]``,
+    :meth:`last` and :meth:`between` cost the same for 10 or 10 million
+    check-ins. Records are expected to be appended in time order.
+
+    Every access takes an ``flock`` on a ``.lock`` file next to the journal
+    and first catches up with what other processes appended, compacted or
+    left torn, so several job processes can share a journal. Each one still
+    re-reads the other's appends, so :class:`SQLiteStore` scales better when
+    many processes write to the same log.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        legacy_path: str | None = None,
+        fsync: bool = False,
+        compact_every: int | None = None,
+    ):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self._appends_since_compact = 0
+        self._fd: int | None = None
+        self._index_fd: int | None = None
+        self._reader: int | None = None
+        self._index_reader: int | None = None
+        self.trends_path = path + ".trends.json"
+        self._trends: dict[str, TrendSummary] | None = None
+        self._trends_seen = 0
+        self._recent: dict[str, list[int]] = {}
+        # Appends may come from a background writer thread while the agent reads
+        self._lock = threading.RLock()
+        self.lock_path = path + ".lock"
+        self._file_lock = _FileLock(self.lock_path)
+        # Inode and size of the journal as this process last saw it; the inode
+        # stays pinned by the open read handle, so it cannot be reused
+        self._stamp: tuple[int, int] | None = None
+        self._size = 0
+        self._count = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock, self._file_lock:
+            if legacy_path and not os.path.exists(path) and os.path.exists(legacy_path):
+                self._import_legacy(legacy_path)
+            self._catch_up()
+
+    def append_many(
+        self, records: list[dict[str, Any]], *, fsync: bool | None = None
+    ) -> None:
+        """Append a batch of check-ins with a single flush (and fsync).
+
+        ``fsync`` overrides the journal's default policy for this batch.
+        """
+        if not records:
+            return
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if self._fd is None:
+                flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+                self._fd = os.open(self.path, flags, 0o666)
+                self._index_fd = os.open(self.index_path, flags, 0o666)
+            lines = []
+            entries = []
+            size = self._size
+            for record in records:
+                data = _encode(record)
+                lines.append(data)
+                entries.append(_INDEX_ENTRY.pack(size, record_time(record)))
+                size += len(data)
+            _write_all(self._fd, b"".join(lines))
+            _write_all(self._index_fd, b"".join(entries))
+            if self.fsync if fsync is None else fsync:
+                os.fsync(self._fd)
+                os.fsync(self._index_fd)
+            self._size = size
+            self._count += len(records)
+            self._stamp = (os.fstat(self._fd).st_ino, size)
+
+            self._appends_since_compact += len(records)
+            if self.compact_every and self._appends_since_compact >= self.compact_every:
+                self._compact(None)
+
+    def sync(self) -> None:
+        """Force appended records to stable storage"""
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.fsync(self._index_fd)
+
+    def __len__(self) -> int:
+        with self._lock, self._file_lock:
+            self._catch_up()
+            return self._count
+
+    def __getitem__(self, i: int) -> dict[str, Any]:
+        with self._lock, self._file_lock:
+            self._catch_up()
+            return self._get(i)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        with self._lock, self._file_lock:
+            self._catch_up()
+            end = self._size
+        if end:
+            yield from _iter_lines(self.path, end)
+
+    def last(self, n: int = 1, *, user_id: str | None = None) -> list[dict[str, Any]]:
+        """The newest ``n`` check-ins, oldest first.
+
+        The positions of each user's newest check-ins are kept with the trend
+        summaries, so filtering by ``user_id`` reads only the matching
+        records. Older ones are found by walking backwards from there.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if user_id is None:
+                start = max(0, self._count - n)
+                return [self._get(i) for i in range(start, self._count)]
+
+            self._fold()
+            recent = self._recent.get(user_id, [])
+            found = [self._get(i) for i in recent[-n:]] if n > 0 else []
+            if len(found) < n and len(recent) == _RECENT_PER_USER:
+                older = []
+                for i in range(recent[0] - 1, -1, -1):
+                    if len(found) + len(older) >= n:
+                        break
+                    record = self._get(i)
+                    if record.get("user_id") == user_id:
+                        older.append(record)
+                found = older[::-1] + found
+        return found
+
+    def between(
+        self, start: TimeLike, end: TimeLike, *, user_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Check-ins with ``start <= timestamp < end``, found by bisecting the index.
+
+        Only the byte range of the matching records is located under the
+        locks; the records are then read one line at a time from a handle
+        opened on the current file, which a later compaction replaces
+        rather than rewrites.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            lo, hi = self._bisect(to_epoch(start)), self._bisect(to_epoch(end))
+            if lo >= hi:
+                return
+            first = self._index_entry(lo)[0]
+            last = self._index_entry(hi)[0] if hi < self._count else self._size
+            f = open(self.path, "rb")  # noqa: SIM115 - read after the locks are released
+        with f:
+            f.seek(first)
+            pos = first
+            for line in f:
+                if pos >= last:
+                    break
+                pos += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # corrupt line, left out of the index too
+                if user_id is None or record.get("user_id") == user_id:
+                    yield record
+
+    def time_range(self) -> tuple[float, float]:
+        """Timestamps of the first and last check-ins that have one (0.0, 0.0 if none).
+
+        Records are in time order, so only the ends of the index are read.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            first, last = 0, self._count - 1
+            while first <= last and not self._index_entry(first)[1]:
+                first += 1
+            while last > first and not self._index_entry(last)[1]:
+                last -= 1
+            if first > last:
+                return 0.0, 0.0
+            return self._index_entry(first)[1], self._index_entry(last)[1]
+
+    def trend(self, user_id: str | None = None) -> TrendSummary:
+        """Running summary of ``user_id``'s check-ins, or everyone's for ``None``.
+
+        Summaries of every user are kept in a sidecar ``.trends.json`` along
+        with how many records they cover; only records appended since then
+        are folded in.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            self._fold()
+            trend = self._trends.get(user_id or "")
+            return TrendSummary.from_dict(trend.to_dict()) if trend else TrendSummary()
+
+    def recover(self) -> int:
+        """Trim a torn or corrupt record from the end of the journal.
+
+        Only the tail of the file is inspected, so opening a large journal
+        stays cheap. Returns the number of bytes removed.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            return self._recover()
+
+    def _recover(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(0, size - _TAIL_SCAN_BYTES)
+            f.seek(start)
+            tail = f.read()
+
+            end = len(tail)
+            while end > 0:
+                prev_nl = tail.rfind(b"\n", 0, end - 1)
+                if tail[end - 1 : end] == b"\n" and _is_record(tail[prev_nl + 1 : end]):
+                    break
+                if prev_nl < 0 and start > 0:
+                    break  # record is longer than the scan window, leave it alone
+                end = prev_nl + 1
+
+            valid = start + end
+            if valid < size:
+                f.truncate(valid)
+                logger.warning(
+                    f"Recovered wellness journal {self.path}: dropped {size - valid} torn bytes"
+                )
+            return size - valid
+
+    def compact(self, max_records: int | None = None) -> int:
+        """Rewrite the journal without duplicate records.
+
+        When ``max_records`` is given only the newest records are kept. The new
+        file is written next to the old one and swapped in atomically, so a
+        crash during compaction leaves the previous journal intact. Returns the
+        number of records kept.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            return self._compact(max_records)
+
+    def _compact(self, max_records: int | None) -> int:
+        self._close_handles()
+
+        seen = set()
+        records = []
+        for record in self:
+            key = json.dumps(record, sort_keys=True)
+            if key in seen:
+                continue
+            seen.add(key)
+            records.append(record)
+        if max_records is not None:
+            records = records[-max_records:] if max_records > 0 else []
+
+        self._write_atomic(records)
+        self._appends_since_compact = 0
+        return len(records)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handles()
+            self._file_lock.close()
+            self._stamp = None
+
+    def _close_handles(self) -> None:
+        for name in ("_fd", "_index_fd", "_reader", "_index_reader"):
+            fd = getattr(self, name)
+            if fd is not None:
+                os.close(fd)
+                setattr(self, name, None)
+
+    def _catch_up(self) -> None:
+        """Bring this process's view in line with the files (file lock held).
+
+        A new inode means another process compacted the journal, so offsets,
+        handles and trends are stale; a new size means it appended, or
+        crashed in the middle of an append and left a torn record.
+        """
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_ino, st.st_size)
+        except FileNotFoundError:
+            stamp = (0, 0)
+        if stamp == self._stamp:
+            return
+        if self._stamp is None or stamp[0] != self._stamp[0]:
+            self._close_handles()
+            self._trends = None
+            if stamp[0]:
+                self._reader = os.open(self.path, os.O_RDONLY)
+        self._size = stamp[1] - self._recover()
+        self._count = self._sync_index()
+        self._stamp = (stamp[0], self._size)
+
+    def _get(self, i: int) -> dict[str, Any]:
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("check-in index out of range")
+        return self._read_record(i)
+
+    def _read_record(self, i: int) -> dict[str, Any]:
+        if self._index_reader is None:
+            self._index_reader = os.open(self.index_path, os.O_RDONLY)
+        if self._reader is None:
+            self._reader = os.open(self.path, os.O_RDONLY)
+        # The next record's offset is where this one ends, unless corrupt
+        # lines the index skipped lie in between: only the first line is read
+        entries = _read_at(
+            self._index_reader, 2 * _INDEX_ENTRY.size, i * _INDEX_ENTRY.size
+        )
+        offset = _INDEX_ENTRY.unpack_from(entries)[0]
+        if i + 1 < self._count:
+            end = _INDEX_ENTRY.unpack_from(entries, _INDEX_ENTRY.size)[0]
+        else:
+            end = self._size
+        data = _read_at(self._reader, end - offset, offset)
+        return json.loads(data[: data.find(b"\n") + 1 or None])
+
+    def _index_entry(self, i: int) -> tuple[int, float]:
+        if self._index_reader is None:
+            self._index_reader = os.open(self.index_path, os.O_RDONLY)
+        return _INDEX_ENTRY.unpack(
+            _read_at(self._index_reader, _INDEX_ENTRY.size, i * _INDEX_ENTRY.size)
+        )
+
+    def _bisect(self, ts: float) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._index_entry(mid)[1] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _sync_index(self) -> int:
+        """Bring the offset index in line with the journal, returning the record count.
+
+        Entries pointing past the end of the journal (trimmed by recovery) are
+        dropped, and records appended after the last indexed one (a crash
+        between the two writes) are indexed by scanning only that tail.
+        """
+        if not os.path.exists(self.path):
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            return 0
+
+        mode = "rb+" if os.path.exists(self.index_path) else "wb+"
+        with open(self.index_path, mode) as idx, open(self.path, "rb") as journal:
+            count = idx.seek(0, os.SEEK_END) // _INDEX_ENTRY.size
+
+            def entry(i: int) -> tuple[int, float]:
+                idx.seek(i * _INDEX_ENTRY.size)
+                return _INDEX_ENTRY.unpack(idx.read(_INDEX_ENTRY.size))
+
+            while count and entry(count - 1)[0] >= self._size:
+                count -= 1
+
+            pos = 0
+            if count:
+                offset = entry(count - 1)[0]
+                journal.seek(max(0, offset - 1))
+                if offset and journal.read(1) != b"\n":
+                    logger.warning(
+                        f"Wellness index {self.index_path} is stale, rebuilding"
+                    )
+                    count, offset = 0, 0
+                journal.seek(offset)
+                if count:
+                    journal.readline()
+                pos = journal.tell()
+
+            idx.truncate(count * _INDEX_ENTRY.size)
+            idx.seek(0, os.SEEK_END)
+            journal.seek(pos)
+            for line in iter(journal.readline, b""):
+                if line.strip():
+                    try:
+                        ts = record_time(json.loads(line))
+                    except ValueError:
+                        logger.warning(
+                            f"Skipping corrupt record at {self.path} offset {pos}"
+                        )
+                    else:
+                        idx.write(_INDEX_ENTRY.pack(pos, ts))
+                        count += 1
+                pos += len(line)
+        return count
+
+    def _fold(self) -> None:
+        """Fold records appended since the sidecar into the trends and recent positions"""
+        if self._trends is None:
+            self._load_trends()
+        if self._trends_seen < self._count:
+            for i in range(self._trends_seen, self._count):
+                record = self._get(i)
+                user_id = record.get("user_id") or ""
+                for key in {"", user_id}:
+                    self._trends.setdefault(key, TrendSummary()).update(record)
+                recent = self._recent.setdefault(user_id, [])
+                recent.append(i)
+                del recent[:-_RECENT_PER_USER]
+            self._trends_seen = self._count
+            self._save_trends()
+
+    def _load_trends(self) -> None:
+        self._trends, self._trends_seen, self._recent = {}, 0, {}
+        try:
+            with open(self.trends_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            logger.warning(f"Rebuilding unreadable trend summaries {self.trends_path}")
+            return
+        # Refolded when the journal was trimmed by recovery, or for a sidecar
+        # written before recent positions were kept
+        if data["seen"] <= self._count and "recent" in data:
+            self._trends_seen = data["seen"]
+            self._trends = {
+                key: TrendSummary.from_dict(trend)
+                for key, trend in data["trends"].items()
+            }
+            self._recent = data["recent"]
+
+    def _save_trends(self) -> None:
+        data = {
+            "seen": self._trends_seen,
+            "trends": {key: trend.to_dict() for key, trend in self._trends.items()},
+            "recent": self._recent,
+        }
+        tmp_path = self.trends_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.trends_path)
+
+    def _import_legacy(self, legacy_path: str) -> None:
+        """One-time import of the old single JSON array log"""
+        try:
+            with open(legacy_path, encoding="utf-8") as f:
+                records = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to import legacy wellness log: {e}")
+            return
+        if isinstance(records, list):
+            self._write_atomic([r for r in records if isinstance(r, dict)])
+            logger.info(f"Imported {len(records)} check-ins from {legacy_path}")
+
+    def _write_atomic(self, records: list[dict[str, Any]]) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for record in records:
+                f.write(_encode(record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_dir(self.path)
+
+        # Offsets changed, so rebuild the index and trends from the new file
+        for path in (self.index_path, self.trends_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._trends = None
+        self._close_handles()
+        self._reader = os.open(self.path, os.O_RDONLY)
+        self._size = os.fstat(self._reader).st_size
+        self._count = self._sync_index()
+        self._stamp = (os.fstat(self._reader).st_ino, self._size)
@@ -0,0 +1,359 @@
+"""Per-stage latency histograms for the voice pipeline"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from typing import Any
+
+import prometheus_client
+from livekit.agents import metrics, utils
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshot writes are not locked
+    fcntl = None
+
+logger = logging.getLogger("agent")
+
+STAGES = ("eou_delay", "transcription_delay", "llm_ttft", "tts_ttfb", "e2e_latency")
+
+# Exposed on the worker's /metrics endpoint (WorkerOptions.prometheus_port);
+# child job processes are aggregated when prometheus_multiproc_dir is set
+STAGE_LATENCY = prometheus_client.Histogram(
+    "wellness_stage_latency_seconds",
+    "Voice pipeline latency per stage",
+    ["stage", "nodename"],
+    buckets=[
+        0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.75,
+        1.0, 1.5, 2.0, 3.0, 5.0, 10.0,
+    ],
+)  # fmt: skip
+
+LOOP_LAG = prometheus_client.Histogram(
+    "wellness_event_loop_lag_seconds",
+    "How late the session's event loop runs a task that is due",
+    ["nodename"],
+    buckets=[
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    ],
+)  # fmt: skip
+
+
+class LogHistogram:
+    """Streaming histogram with logarithmic buckets (DDSketch style).
+
+    Every quantile is within ``relative_error`` of the true value, memory
+    grows with the spread of the values rather than their count, and
+    histograms from different processes can be merged by adding buckets.
+    """
+
+    def __init__(self, relative_error: float = 0.01, min_value: float = 1e-6):
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        index = math.ceil(math.log(max(value, self.min_value)) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket (gamma^(i-1), gamma^i]
+                return min(2 * self._gamma**index / (self._gamma + 1), self.max)
+        return self.max
+
+    def copy(self) -> LogHistogram:
+        hist = LogHistogram(self.relative_error, self.min_value)
+        hist.merge(self)
+        return hist
+
+    def minus(self, other: LogHistogram) -> LogHistogram:
+        """Samples recorded here but not in ``other``, an earlier copy"""
+        hist = LogHistogram(self.relative_error, self.min_value)
+        for index, n in self.buckets.items():
+            if n > other.buckets.get(index, 0):
+                hist.buckets[index] = n - other.buckets.get(index, 0)
+        hist.count = self.count - other.count
+        hist.sum = self.sum - other.sum
+        hist.max = self.max
+        return hist
+
+    def merge(self, other: LogHistogram) -> None:
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "relative_error": self.relative_error,
+            "buckets": {str(i): n for i, n in sorted(self.buckets.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LogHistogram:
+        hist = cls(relative_error=data["relative_error"])
+        hist.buckets = {int(i): n for i, n in data["buckets"].items()}
+        hist.count = data["count"]
+        hist.sum = data["sum"]
+        hist.max = data["max"]
+        return hist
+
+
+class LatencyAggregator:
+    """Collects pipeline metrics into per-stage histograms for one process.
+
+    End-to-end latency is end-of-utterance delay + LLM time to first token +
+    TTS time to first byte of the same reply, joined on ``speech_id``.
+    """
+
+    def __init__(self, *, max_pending: int = 256):
+        self.histograms = {stage: LogHistogram() for stage in STAGES}
+        self.max_pending = max_pending
+        self._pending: OrderedDict[str, dict[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flushed = {stage: LogHistogram() for stage in STAGES}
+        self._nodename = utils.nodename()
+        self._snapshot_thread: threading.Thread | None = None
+
+    def collect(self, ev: metrics.AgentMetrics) -> None:
+        if isinstance(ev, metrics.EOUMetrics):
+            self.record("eou_delay", ev.end_of_utterance_delay)
+            self.record("transcription_delay", ev.transcription_delay)
+            self._join(ev.speech_id, "eou", ev.end_of_utterance_delay)
+        elif isinstance(ev, metrics.LLMMetrics):
+            self.record("llm_ttft", ev.ttft)
+            self._join(ev.speech_id, "llm", ev.ttft)
+        elif isinstance(ev, metrics.TTSMetrics):
+            self.record("tts_ttfb", ev.ttfb)
+            self._join(ev.speech_id, "tts", ev.ttfb)
+
+    def record(self, stage: str, seconds: float) -> None:
+        if seconds < 0:  # not measured, e.g. a cancelled request
+            return
+        with self._lock:
+            self.histograms[stage].record(seconds)
+        STAGE_LATENCY.labels(stage=stage, nodename=self._nodename).observe(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            stages = {stage: h.to_dict() for stage, h in self.histograms.items()}
+        return {"nodename": self._nodename, "timestamp": time.time(), "stages": stages}
+
+    def write_snapshot(self, path: str) -> None:
+        """Merge what this process recorded since the last write into ``path``.
+
+        Every job process on the host adds to the same JSON file, which holds
+        one set of stage histograms per worker node. The file is locked while
+        it is updated.
+        """
+        with self._lock:
+            delta = {}
+            for stage, h in self.histograms.items():
+                flushed = self._flushed[stage]
+                delta[stage] = h.minus(flushed)
+                self._flushed[stage] = h.copy()
+        if not any(h.count for h in delta.values()):
+            return
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".lock", "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {"workers": {}}
+
+            worker = data["workers"].setdefault(self._nodename, {})
+            for stage, h in delta.items():
+                if stage in worker:
+                    h.merge(LogHistogram.from_dict(worker[stage]))
+                worker[stage] = h.to_dict()
+            data["timestamp"] = time.time()
+
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+
+    def start_snapshots(self, path: str, interval: float = 30.0) -> None:
+        """Write the snapshot every ``interval`` seconds in the background"""
+
+        def _run() -> None:
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot(path)
+                except OSError as e:
+                    logger.warning(f"Failed to write latency snapshot: {e}")
+
+        if self._snapshot_thread is None:
+            self._snapshot_thread = threading.Thread(
+                target=_run, name="wellness-latency-snapshot", daemon=True
+            )
+            self._snapshot_thread.start()
+
+    def summary(self) -> str:
+        parts = []
+        with self._lock:
+            for stage, h in self.histograms.items():
+                if h.count:
+                    parts.append(
+                        f"{stage} p50={h.quantile(0.5) * 1000:.0f}ms "
+                        f"p95={h.quantile(0.95) * 1000:.0f}ms "
+                        f"p99={h.quantile(0.99) * 1000:.0f}ms (n={h.count})"
+                    )
+        return "; ".join(parts) or "no samples"
+
+    def _join(self, speech_id: str | None, part: str, seconds: float) -> None:
+        if not speech_id or seconds < 0:
+            return
+        with self._lock:
+            parts = self._pending.setdefault(speech_id, {})
+            parts[part] = seconds
+            if len(parts) < 3:
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                return
+            del self._pending[speech_id]
+        self.record("e2e_latency", sum(parts.values()))
+
+
+class LoopLagMonitor:
+    """Samples how late the event loop wakes a task sleeping ``interval``.
+
+    All samples go to :attr:`histogram`; the last ``window`` of them give
+    the recent lag that :meth:`recent` reports. With ``slow_threshold`` set,
+    a watchdog thread also logs the loop thread's stack whenever the loop
+    has not run the sampling task for that long past its due time, which
+    shows the call blocking it while it still blocks.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        window: int = 200,
+        *,
+        slow_threshold: float | None = None,
+    ):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.histogram = LogHistogram()
+        self.stalls = 0  # times the watchdog found the loop blocked
+        self._recent: deque[float] = deque(maxlen=window)
+        self._task: asyncio.Task | None = None
+        self._nodename = utils.nodename()
+        self._due = 0.0  # monotonic time the sampling task is due to run
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._due = time.monotonic() + self.interval
+            self._task = asyncio.create_task(self._run(), name="wellness-loop-lag")
+        if self.slow_threshold is not None and self._watchdog is None:
+            self._stop.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(threading.get_ident(),),
+                name="wellness-loop-watchdog",
+                daemon=True,
+            )
+            self._watchdog.start()
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._stop.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    def recent(self, q: float = 0.95) -> float:
+        """Quantile ``q`` of the recent lag samples, in seconds"""
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def record(self, lag: float) -> None:
+        self.histogram.record(lag)
+        self._recent.append(lag)
+        LOOP_LAG.labels(nodename=self._nodename).observe(lag)
+
+    def summary(self) -> str:
+        h = self.histogram
+        if not h.count:
+            return "no samples"
+        return (
+            f"p50={h.quantile(0.5) * 1000:.1f}ms p95={h.quantile(0.95) * 1000:.1f}ms "
+            f"p99={h.quantile(0.99) * 1000:.1f}ms max={h.max * 1000:.0f}ms "
+            f"stalls={self.stalls} (n={h.count})"
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self._due = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - started - self.interval))
+
+    def _watch(self, loop_thread: int) -> None:
+        reported = None
+        while not self._stop.wait(self.slow_threshold / 2):
+            due = self._due
+            blocked = time.monotonic() - due
+            if blocked <= self.slow_threshold or due == reported:
+                continue
+            reported = due  # one report per stall
+            self.stalls += 1
+            frame = sys._current_frames().get(loop_thread)
+            stack = "".join(traceback.format_stack(frame, limit=12)) if frame else ""
+            logger.warning(
+                f"Event loop blocked for {blocked * 1000:.0f}ms so far, in:\n{stack.rstrip()}"
+            )
+
+
+def load_snapshot(path: str) -> dict[str, dict[str, LogHistogram]]:
+    """Read a snapshot file as ``{nodename: {stage: histogram}}``"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        node: {stage: LogHistogram.from_dict(h) for stage, h in stages.items()}
+        for node, stages in data["workers"].items()
+    }
@@ -0,0 +1,153 @@
+"""Check-in journals partitioned by participant identity"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterator
+from typing import Any
+from urllib.parse import quote, unquote
+
+from .journal import CheckinJournal, _create_directory, read_log
+from .store import CheckinStore, TimeLike, record_time
+from .trends import TrendSummary
+
+logger = logging.getLogger("agent")
+
+# Partition used for check-ins saved before participants were tracked
+ANONYMOUS = "_anonymous"
+
+
+def _partition_name(user_id: str | None) -> str:
+    return quote(user_id, safe="") if user_id else ANONYMOUS
+
+
+class PartitionedJournalStore(CheckinStore):
+    """One :class:`CheckinJournal` per user inside ``directory``.
+
+    A session only opens its own participant's journal, so the cost of
+    loading history depends on that user's check-ins, not on everyone's.
+    At most ``max_open`` journals are kept open; the least recently used are
+    closed first. Each journal locks its own files, so several job processes
+    can share the directory; a legacy log is imported into a new directory
+    before it appears, so no process sees a partial import.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        legacy_paths: tuple[str, ...] = (),
+        fsync: bool = False,
+        compact_every: int | None = None,
+        max_open: int = 64,
+    ):
+        self.path = directory
+        self.fsync = fsync
+        self.compact_every = compact_every
+        self.max_open = max_open
+        self._open: OrderedDict[str, CheckinJournal] = OrderedDict()
+        self._lock = threading.RLock()
+
+        if not os.path.isdir(directory):
+            legacy_path = next((p for p in legacy_paths if os.path.exists(p)), None)
+            if legacy_path is None:
+                os.makedirs(directory, exist_ok=True)
+            else:
+
+                def fill(staging: str) -> None:
+                    store = PartitionedJournalStore(staging, fsync=fsync)
+                    store._import_legacy(legacy_path)
+                    store.close()
+
+                _create_directory(directory, fill)
+
+    def partition(self, user_id: str | None) -> CheckinJournal:
+        """The journal holding ``user_id``'s check-ins, opened on demand"""
+        name = _partition_name(user_id)
+        with self._lock:
+            journal = self._open.get(name)
+            if journal is None:
+                journal = CheckinJournal(
+                    os.path.join(self.path, name + ".jsonl"),
+                    fsync=self.fsync,
+                    compact_every=self.compact_every,
+                )
+                self._open[name] = journal
+                while len(self._open) > self.max_open:
+                    _, evicted = self._open.popitem(last=False)
+                    evicted.close()
+            else:
+                self._open.move_to_end(name)
+            return journal
+
+    def users(self) -> list[str | None]:
+        """Every user with a partition; ``None`` is the anonymous partition"""
+        users = []
+        for filename in sorted(os.listdir(self.path)):
+            if filename.endswith(".jsonl"):
+                name = filename[: -len(".jsonl")]
+                users.append(None if name == ANONYMOUS else unquote(name))
+        return users
+
+    def append_many(
+        self, records: list[dict[str, Any]], *, fsync: bool | None = None
+    ) -> None:
+        by_user: dict[str | None, list[dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            by_user[record.get("user_id") or None].append(record)
+        with self._lock:
+            for user_id, batch in by_user.items():
+                self.partition(user_id).append_many(batch, fsync=fsync)
+
+    def last(self, n: int = 1, *, user_id: str | None = None) -> list[dict[str, Any]]:
+        if user_id is not None:
+            return self.partition(user_id).last(n)
+        newest = [r for u in self.users() for r in self.partition(u).last(n)]
+        return sorted(newest, key=record_time)[-n:] if n > 0 else []
+
+    def between(
+        self, start: TimeLike, end: TimeLike, *, user_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        if user_id is not None:
+            return self.partition(user_id).between(start, end)
+        return heapq.merge(
+            *(self.partition(u).between(start, end) for u in self.users()),
+            key=record_time,
+        )
+
+    def trend(self, user_id: str | None = None) -> TrendSummary:
+        if user_id is not None:
+            return self.partition(user_id).trend()
+        return super().trend()
+
+    def __len__(self) -> int:
+        return sum(len(self.partition(u)) for u in self.users())
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for user_id in self.users():
+            yield from self.partition(user_id)
+
+    def sync(self) -> None:
+        with self._lock:
+            for journal in self._open.values():
+                journal.sync()
+
+    def close(self) -> None:
+        with self._lock:
+            for journal in self._open.values():
+                journal.close()
+            self._open.clear()
+
+    def _import_legacy(self, legacy_path: str) -> None:
+        """Split an existing single-file log into per-user partitions"""
+        try:
+            records = read_log(legacy_path)
+        except Exception as e:
+            logger.warning(f"Failed to import legacy wellness log: {e}")
+            return
+        self.append_many(records)
+        logger.info(f"Imported {len(records)} check-ins from {legacy_path}")
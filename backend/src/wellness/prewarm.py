@@ -0,0 +1,32 @@
+"""Timing of per-process warm-up work"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class WarmupTimer:
+    """Records how long each component took to warm up, in seconds"""
+
+    def __init__(self):
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (
+                self.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+    def summary(self) -> str:
+        parts = [f"{name}={secs * 1000:.0f}ms" for name, secs in self.timings.items()]
+        return f"{', '.join(parts)} (total {self.total * 1000:.0f}ms)"
@@ -0,0 +1,174 @@
+"""Timing of the agent's function tools, and how long they hold the event loop"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections.abc import Coroutine
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import prometheus_client
+from livekit.agents import llm, utils
+
+from .latency import LogHistogram
+
+logger = logging.getLogger("agent")
+
+TOOL_DURATION = prometheus_client.Histogram(
+    "wellness_tool_duration_seconds",
+    "Function tool calls: wall time, and time spent running on the event loop",
+    ["tool", "kind", "nodename"],
+    buckets=[
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0,
+    ],
+)  # fmt: skip
+
+
+@dataclass
+class ToolStats:
+    calls: int = 0
+    errors: int = 0
+    wall: LogHistogram = field(default_factory=LogHistogram)
+    blocking: float = 0.0  # seconds spent running on the event loop
+    longest_block: float = 0.0  # longest run between two awaits
+
+    def describe(self) -> str:
+        return (
+            f"n={self.calls} p50={self.wall.quantile(0.5) * 1000:.1f}ms "
+            f"p95={self.wall.quantile(0.95) * 1000:.1f}ms "
+            f"blocking={self.blocking * 1000:.1f}ms "
+            f"longest_block={self.longest_block * 1000:.1f}ms errors={self.errors}"
+        )
+
+
+class _Steps:
+    """Awaits a coroutine, timing each step it runs on the event loop.
+
+    A coroutine runs synchronously from one ``await`` that suspends to the
+    next, so the time of each ``send`` is time no other task could run.
+    """
+
+    def __init__(self, coro: Coroutine):
+        self._coro = coro
+        self.blocking = 0.0
+        self.longest = 0.0
+
+    def _step(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.blocking += elapsed
+        self.longest = max(self.longest, elapsed)
+
+    def __await__(self):
+        coro = self._coro
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            started = time.perf_counter()
+            try:
+                yielded = coro.throw(error) if error is not None else coro.send(value)
+            except StopIteration as e:
+                self._step(started)
+                return e.value
+            except BaseException:
+                self._step(started)
+                raise
+            self._step(started)
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:  # cancellation, thrown into the tool
+                error = e
+
+
+class ToolProfiler:
+    """Per-tool call timings of one session.
+
+    :meth:`wrap` returns a tool that LiveKit describes and calls like the
+    original. Each call records its wall time and the time it ran on the
+    event loop; a single run longer than ``slow_threshold`` between two
+    awaits is logged, since it delays every other task of the session.
+    """
+
+    def __init__(self, *, slow_threshold: float | None = 0.05):
+        self.slow_threshold = slow_threshold
+        self.tools: dict[str, ToolStats] = {}
+        self._nodename = utils.nodename()
+        self._lock = threading.Lock()
+
+    def wrap(self, tool: Callable) -> Callable:
+        if llm.is_raw_function_tool(tool):
+            name = llm.tool_context.get_raw_function_info(tool).name
+        else:
+            name = llm.tool_context.get_function_info(tool).name
+
+        if not inspect.iscoroutinefunction(tool):
+            # A synchronous tool runs on the loop from start to end
+            @functools.wraps(tool)
+            def timed_sync(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                failed = False
+                try:
+                    return tool(*args, **kwargs)
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - started
+                    self.record(name, elapsed, elapsed, elapsed, failed)
+
+            return timed_sync
+
+        @functools.wraps(tool)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            return await self.measure(name, tool(*args, **kwargs))
+
+        return timed
+
+    async def measure(self, name: str, coro: Coroutine) -> Any:
+        steps = _Steps(coro)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await steps
+        except Exception:
+            failed = True
+            raise
+        finally:
+            wall = time.perf_counter() - started
+            self.record(name, wall, steps.blocking, steps.longest, failed)
+
+    def record(
+        self, name: str, wall: float, blocking: float, longest: float, failed: bool
+    ) -> None:
+        with self._lock:
+            stats = self.tools.setdefault(name, ToolStats())
+            stats.calls += 1
+            stats.errors += failed
+            stats.wall.record(wall)
+            stats.blocking += blocking
+            stats.longest_block = max(stats.longest_block, longest)
+        TOOL_DURATION.labels(tool=name, kind="wall", nodename=self._nodename).observe(
+            wall
+        )
+        TOOL_DURATION.labels(
+            tool=name, kind="blocking", nodename=self._nodename
+        ).observe(blocking)
+        if self.slow_threshold is not None and longest > self.slow_threshold:
+            logger.warning(
+                f"Tool {name} blocked the event loop for {longest * 1000:.0f}ms "
+                f"without awaiting ({blocking * 1000:.0f}ms of {wall * 1000:.0f}ms "
+                "on the loop)"
+            )
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [f"{name} {s.describe()}" for name, s in sorted(self.tools.items())]
+        return "; ".join(parts) or "no calls"
@@ -0,0 +1,271 @@
+"""Compact typed check-in records, one at a time or column by column"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from enum import IntEnum
+from typing import Any
+
+from .store import record_time
+from .trends import SCALES, scale_value
+
+FIELDS = ("user_id", "mood", "energy", "stress", "goals", "summary", "timestamp")
+
+
+class Rating(IntEnum):
+    """A 1-5 mood, energy or stress rating"""
+
+    VERY_LOW = 1
+    LOW = 2
+    MEDIUM = 3
+    HIGH = 4
+    VERY_HIGH = 5
+
+    @classmethod
+    def parse(cls, value: Any) -> Rating | None:
+        rating = _STORED_RATINGS.get(value) if isinstance(value, str) else None
+        if rating is not None or value is None or value == "":
+            return rating
+        number = scale_value(value)
+        return None if number is None else cls(number)
+
+
+# Stored ratings are digit strings, looked up without parsing
+_STORED_RATINGS = {str(int(rating)): rating for rating in Rating}
+
+
+def _intern(value: Any) -> str | None:
+    return None if value is None else sys.intern(str(value))
+
+
+class CheckinRecord:
+    """One check-in with typed fields.
+
+    Ratings are :class:`Rating` values, the timestamp is epoch seconds and
+    user ids and goals are interned, since they repeat across check-ins.
+    :meth:`to_dict` gives the stored JSON form (string ratings, ISO
+    timestamp), so stores and logs are unchanged.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        *,
+        user_id: str | None = None,
+        mood: Rating | None = None,
+        energy: Rating | None = None,
+        stress: Rating | None = None,
+        goals: str | None = None,
+        summary: str | None = None,
+        timestamp: float | None = None,
+    ):
+        self.user_id = _intern(user_id)
+        self.mood = mood
+        self.energy = energy
+        self.stress = stress
+        self.goals = _intern(goals)
+        self.summary = summary
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CheckinRecord:
+        return cls(
+            user_id=data.get("user_id"),
+            mood=Rating.parse(data.get("mood")),
+            energy=Rating.parse(data.get("energy")),
+            stress=Rating.parse(data.get("stress")),
+            goals=data.get("goals"),
+            summary=data.get("summary"),
+            timestamp=record_time(data) or None,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """The stored form, without the fields that are not set"""
+        data: dict[str, Any] = {}
+        for field in FIELDS:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            if field in SCALES:
+                value = str(int(value))
+            elif field == "timestamp":
+                value = datetime.datetime.fromtimestamp(value).isoformat()
+            data[field] = value
+        return data
+
+    def set(self, field: str, value: Any) -> None:
+        """Set a field from a stored or user-given value"""
+        if field in SCALES:
+            value = Rating.parse(value)
+        elif field in ("user_id", "goals"):
+            value = _intern(value)
+        setattr(self, field, value)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CheckinRecord):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"CheckinRecord({fields})"
+
+
+class CheckinColumns:
+    """Many check-ins as typed columns, for bulk history.
+
+    Ratings are bytes (0 when not given), timestamps doubles (0.0 when not
+    given) and strings indices into a shared string table (0 for none), all
+    in :mod:`array` buffers in native byte order. :meth:`to_numpy` views them as NumPy arrays
+    without copying.
+    """
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.mood = array("B")
+        self.energy = array("B")
+        self.stress = array("B")
+        self.user_ids = array("I")
+        self.goals = array("I")
+        self.summaries = array("I")
+        self.strings: list[str] = [""]
+        self._string_ids: dict[str, int] = {"": 0}
+
+    @classmethod
+    def from_records(cls, records: Iterable[CheckinRecord]) -> CheckinColumns:
+        columns = cls()
+        for record in records:
+            columns.append(record)
+        return columns
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict[str, Any]]) -> CheckinColumns:
+        """Columns of stored check-ins, e.g. from ``store.between(...)``"""
+        columns = cls()
+        for record in records:
+            columns.append_dict(record)
+        return columns
+
+    def _string(self, value: str | None) -> int:
+        if not value:
+            return 0
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def append(self, record: CheckinRecord) -> None:
+        self.timestamps.append(record.timestamp or 0.0)
+        self.mood.append(record.mood or 0)
+        self.energy.append(record.energy or 0)
+        self.stress.append(record.stress or 0)
+        self.user_ids.append(self._string(record.user_id))
+        self.goals.append(self._string(record.goals))
+        self.summaries.append(self._string(record.summary))
+
+    def append_dict(self, data: dict[str, Any]) -> None:
+        """Append a stored check-in without building a record for it"""
+        self.append_stored(
+            data.get("user_id"),
+            record_time(data),
+            data.get("mood"),
+            data.get("energy"),
+            data.get("stress"),
+            data.get("goals"),
+            data.get("summary"),
+        )
+
+    def append_stored(
+        self,
+        user_id: str | None,
+        timestamp: float,
+        mood: Any,
+        energy: Any,
+        stress: Any,
+        goals: str | None,
+        summary: str | None,
+    ) -> None:
+        """Append one check-in from its stored field values"""
+        self.timestamps.append(timestamp)
+        self.mood.append(Rating.parse(mood) or 0)
+        self.energy.append(Rating.parse(energy) or 0)
+        self.stress.append(Rating.parse(stress) or 0)
+        self.user_ids.append(self._string(user_id))
+        self.goals.append(self._string(goals))
+        self.summaries.append(self._string(summary))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, i: int) -> CheckinRecord:
+        def _rating(column: array) -> Rating | None:
+            return Rating(column[i]) if column[i] else None
+
+        return CheckinRecord(
+            user_id=self.strings[self.user_ids[i]] or None,
+            mood=_rating(self.mood),
+            energy=_rating(self.energy),
+            stress=_rating(self.stress),
+            goals=self.strings[self.goals[i]] or None,
+            summary=self.strings[self.summaries[i]] or None,
+            timestamp=self.timestamps[i] or None,
+        )
+
+    def __iter__(self) -> Iterator[CheckinRecord]:
+        return (self[i] for i in range(len(self)))
+
+    def user_index(self, user_id: str) -> int:
+        """String table index of ``user_id``, 0 if it has no check-ins"""
+        return self._string_ids.get(user_id, 0)
+
+    def to_numpy(self) -> dict[str, Any]:
+        """Zero-copy NumPy views of the columns (needs numpy).
+
+        The columns cannot grow while the views are alive.
+        """
+        import numpy as np
+
+        return {
+            name: np.frombuffer(getattr(self, name), dtype=getattr(self, name).typecode)
+            for name in _COLUMNS
+        }
+
+    def to_bytes(self) -> bytes:
+        """Binary form: a header, the raw columns, then the string table as JSON"""
+        strings = json.dumps(self.strings[1:]).encode()
+        parts = [struct.pack("<II", len(self), len(strings))]
+        parts += [getattr(self, name).tobytes() for name in _COLUMNS]
+        parts.append(strings)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CheckinColumns:
+        columns = cls()
+        n, strings_len = struct.unpack_from("<II", data)
+        offset = struct.calcsize("<II")
+        for name in _COLUMNS:
+            column = getattr(columns, name)
+            size = n * column.itemsize
+            column.frombytes(data[offset : offset + size])
+            offset += size
+        columns.strings += json.loads(data[offset : offset + strings_len])
+        columns._string_ids = {s: i for i, s in enumerate(columns.strings)}
+        return columns
+
+
+_COLUMNS = (
+    "timestamps",
+    "mood",
+    "energy",
+    "stress",
+    "user_ids",
+    "goals",
+    "summaries",
+)
@@ -0,0 +1,511 @@
+"""Check-in log split into time-ordered segments, compressed once sealed"""
+
+from __future__ import annotations
+
+import datetime
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from collections.abc import Iterator
+from typing import IO, Any
+
+from .journal import (
+    CheckinJournal,
+    _create_directory,
+    _FileLock,
+    _fsync_dir,
+    read_log,
+)
+from .store import CheckinStore, TimeLike, record_time, to_epoch
+from .trends import TrendSummary
+
+logger = logging.getLogger("agent")
+
+# File suffix of sealed segments per compression
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst", None: ""}
+
+MANIFEST = "manifest.json"
+
+# Segments are named by sequence number and the day of their first check-in
+_SEGMENT = re.compile(r"^(\d{6})_(\d{4}-\d{2}-\d{2})\.jsonl(\.gz|\.zst)?$")
+
+
+def _pin(path: str) -> int | None:
+    """A descriptor holding on to the current version of ``path``, if any"""
+    try:
+        return os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+
+
+def _is_current(pinned: int | None, path: str) -> bool:
+    """Whether ``path`` is still the version ``pinned`` holds.
+
+    The pinned inode cannot be reused while it is open, so comparing inode
+    numbers tells a replaced file apart even after many replacements.
+    """
+    try:
+        ino = os.stat(path).st_ino
+    except FileNotFoundError:
+        return pinned is None
+    return pinned is not None and os.fstat(pinned).st_ino == ino
+
+
+def _unpin(pinned: int | None) -> None:
+    if pinned is not None:
+        os.close(pinned)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd segments need the 'zstandard' package") from e
+    return zstandard
+
+
+def _day(ts: float) -> str:
+    date = datetime.date.fromtimestamp(ts) if ts else datetime.date.today()
+    return date.isoformat()
+
+
+def _compressor(f: IO[bytes], suffix: str) -> IO[bytes]:
+    if suffix == ".gz":
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0)
+    return _zstandard().ZstdCompressor(level=10).stream_writer(f, closefd=False)
+
+
+def _decompressor(f: IO[bytes], suffix: str) -> IO[bytes]:
+    if suffix == ".gz":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if suffix == ".zst":
+        return io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(f))
+    return f
+
+
+class SegmentedJournalStore(CheckinStore):
+    """Check-in log split into segments by day and size.
+
+    New check-ins go to the active segment, a :class:`CheckinJournal`. It is
+    sealed when a check-in falls on a later day (``daily``) or once it has
+    grown past ``max_bytes``: the segment is compressed (``"gzip"``,
+    ``"zstd"`` with the ``zstandard`` package, or ``None`` to keep it as
+    JSON Lines) and listed in ``manifest.json`` with its time range, count
+    and size. Sealed segments are never rewritten, so they can be archived
+    as they are.
+
+    Reads use the manifest to skip segments: :meth:`between` only opens
+    segments overlapping the range, and :meth:`last` starts from the active
+    segment and only goes back as far as needed; for a user, never past
+    segments newer than that user's last check-in. Check-ins are expected
+    in time order.
+
+    Several job processes can share the directory: every access takes an
+    ``flock`` on its ``.lock`` file and first reloads the manifest, the
+    trend summaries and the active segment if another process changed them.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        daily: bool = True,
+        max_bytes: int | None = None,
+        compression: str | None = "gzip",
+        legacy_paths: tuple[str, ...] = (),
+        fsync: bool = False,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unknown compression '{compression}'. Allowed: gzip, zstd, None"
+            )
+        if compression == "zstd":
+            _zstandard()
+        self.path = directory
+        self.daily = daily
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.fsync = fsync
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.trends_path = os.path.join(directory, "trends.json")
+        self._segments: list[dict[str, Any]] = []
+        self._active: CheckinJournal | None = None
+        self._active_day = ""
+        self._next_seq = 1
+        self._trends: dict[str, TrendSummary] | None = None
+        self._trends_seen = 0
+        # The manifest and trends versions last loaded; both are replaced as a
+        # whole on every save
+        self._manifest_pin: int | None = None
+        self._trends_pin: int | None = None
+        self._lock = threading.RLock()
+        self._file_lock = _FileLock(os.path.join(directory, ".lock"))
+
+        if not os.path.isdir(directory):
+            legacy_path = next((p for p in legacy_paths if os.path.exists(p)), None)
+            if legacy_path is None:
+                os.makedirs(directory, exist_ok=True)
+            else:
+
+                def fill(staging: str) -> None:
+                    store = SegmentedJournalStore(
+                        staging,
+                        daily=daily,
+                        max_bytes=max_bytes,
+                        compression=compression,
+                        fsync=fsync,
+                    )
+                    store._import_legacy(legacy_path)
+                    store.close()
+
+                _create_directory(directory, fill)
+        with self._lock, self._file_lock:
+            self._catch_up()
+
+    @property
+    def segments(self) -> list[dict[str, Any]]:
+        """Manifest entries of the sealed segments, oldest first"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            return [dict(segment) for segment in self._segments]
+
+    def append_many(
+        self, records: list[dict[str, Any]], *, fsync: bool | None = None
+    ) -> None:
+        with self._lock, self._file_lock:
+            self._catch_up()
+            batch: list[dict[str, Any]] = []
+            for record in records:
+                ts = record_time(record)
+                day = _day(ts) if ts or self._active is None else self._active_day
+                if self._active is not None and self.daily and day > self._active_day:
+                    self._active.append_many(batch, fsync=fsync)
+                    batch = []
+                    self.rotate()
+                if self._active is None:
+                    self._activate(day)
+                batch.append(record)
+            if self._active is not None:
+                self._active.append_many(batch, fsync=fsync)
+                if self.max_bytes and self._active_size() >= self.max_bytes:
+                    self.rotate()
+
+    def rotate(self) -> None:
+        """Seal the active segment; the next check-in starts a new one"""
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if self._active is not None:
+                self._seal(self._active)
+                self._active = None
+
+    def __len__(self) -> int:
+        with self._lock, self._file_lock:
+            self._catch_up()
+            count = sum(segment["count"] for segment in self._segments)
+            return count + (len(self._active) if self._active is not None else 0)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        # Sealed segments never change; the active one may be sealed by
+        # another process, so it is read while the store is locked
+        with self._lock, self._file_lock:
+            self._catch_up()
+            segments = list(self._segments)
+            active = list(self._active) if self._active is not None else []
+        for segment in segments:
+            yield from self._read(segment)
+        yield from active
+
+    def last(self, n: int = 1, *, user_id: str | None = None) -> list[dict[str, Any]]:
+        if n <= 0:
+            return []
+        latest = None
+        with self._lock, self._file_lock:
+            if user_id is not None:
+                trend = self.trend(user_id)
+                if not trend.count:
+                    return []
+                latest = trend.last_time or None
+            self._catch_up()
+            segments, active = list(self._segments), self._active
+            found = active.last(n, user_id=user_id) if active is not None else []
+
+        for segment in reversed(segments):
+            if len(found) >= n:
+                break
+            if latest is not None and segment["start"] > latest:
+                continue  # starts after the user's last check-in
+            records = [
+                r
+                for r in self._read(segment)
+                if user_id is None or r.get("user_id") == user_id
+            ]
+            if records:
+                found = records[-(n - len(found)) :] + found
+        return found
+
+    def between(
+        self, start: TimeLike, end: TimeLike, *, user_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Check-ins with ``start <= timestamp < end``, from overlapping segments only"""
+        lo, hi = to_epoch(start), to_epoch(end)
+        with self._lock, self._file_lock:
+            self._catch_up()
+            segments, active = list(self._segments), self._active
+            recent = (
+                list(active.between(start, end, user_id=user_id))
+                if active is not None
+                else []
+            )
+        for segment in segments:
+            if segment["end"] < lo or segment["start"] >= hi:
+                continue
+            for record in self._read(segment):
+                if lo <= record_time(record) < hi and (
+                    user_id is None or record.get("user_id") == user_id
+                ):
+                    yield record
+        yield from recent
+
+    def trend(self, user_id: str | None = None) -> TrendSummary:
+        """Running summary of ``user_id``'s check-ins, or everyone's for ``None``.
+
+        Summaries of every user are kept in ``trends.json`` with how many
+        check-ins they cover, so only newer check-ins (normally all in the
+        active segment) are folded in.
+        """
+        with self._lock, self._file_lock:
+            self._catch_up()
+            if self._trends is None:
+                self._load_trends()
+            count = len(self)
+            if self._trends_seen < count:
+                for record in self._records_from(self._trends_seen):
+                    for key in {"", record.get("user_id") or ""}:
+                        self._trends.setdefault(key, TrendSummary()).update(record)
+                self._trends_seen = count
+                self._save_trends()
+            trend = self._trends.get(user_id or "")
+            return TrendSummary.from_dict(trend.to_dict()) if trend else TrendSummary()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                self._active.close()
+                self._active = None
+            self._file_lock.close()
+            _unpin(self._manifest_pin)
+            _unpin(self._trends_pin)
+            self._manifest_pin = self._trends_pin = None
+            self._trends = None
+
+    def _catch_up(self) -> None:
+        """Reload what other processes changed (file lock held)"""
+        sealed = self._manifest_pin is None or not _is_current(
+            self._manifest_pin, self.manifest_path
+        )
+        if sealed:
+            self._load_manifest()
+        if self._trends is not None and not _is_current(
+            self._trends_pin, self.trends_path
+        ):
+            self._trends = None
+        # A segment is only activated by the process holding the lock, and
+        # only after the previous one was sealed or removed
+        if sealed or self._active is None or not os.path.exists(self._active.path):
+            self._open_active()
+
+    def _activate(self, day: str) -> None:
+        name = f"{self._next_seq:06d}_{day}.jsonl"
+        self._next_seq += 1
+        self._active = CheckinJournal(os.path.join(self.path, name), fsync=self.fsync)
+        self._active_day = day
+
+    def _active_size(self) -> int:
+        try:
+            return os.path.getsize(self._active.path)
+        except FileNotFoundError:
+            return 0
+
+    def _seal(self, journal: CheckinJournal) -> None:
+        """Compress ``journal`` into a sealed segment and add it to the manifest.
+
+        The compressed file is complete before the manifest lists it, and the
+        journal is only removed after that, so a crash at any point leaves
+        each check-in in exactly one listed or active segment.
+        """
+        count = len(journal)
+        start, end = journal.time_range()
+        journal.close()
+        if not count:
+            self._remove_journal(journal.path)
+            return
+        raw_bytes = os.path.getsize(journal.path)
+        suffix = COMPRESSIONS[self.compression]
+        target = journal.path + suffix
+        if suffix:
+            tmp_path = target + ".tmp"
+            with open(journal.path, "rb") as src, open(tmp_path, "wb") as f:
+                with _compressor(f, suffix) as out:
+                    shutil.copyfileobj(src, out, 1 << 20)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, target)
+
+        self._segments.append(
+            {
+                "name": os.path.basename(target),
+                "start": start,
+                "end": end,
+                "count": count,
+                "bytes": os.path.getsize(target),
+                "raw_bytes": raw_bytes,
+            }
+        )
+        self._save_manifest()
+        if suffix:
+            self._remove_journal(journal.path)
+        else:
+            for leftover in (journal.index_path, journal.lock_path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    def _remove_journal(self, path: str) -> None:
+        for leftover in (path, path + ".idx", path + ".trends.json", path + ".lock"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+    def _read(self, segment: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        path = os.path.join(self.path, segment["name"])
+        suffix = os.path.splitext(path)[1]
+        with open(path, "rb") as f:
+            lines = _decompressor(f, suffix if suffix != ".jsonl" else "")
+            for lineno, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping corrupt record at {path}:{lineno}")
+
+    def _records_from(self, i: int) -> Iterator[dict[str, Any]]:
+        """Check-ins from the ``i``-th on, in log order"""
+        for segment in self._segments:
+            if i >= segment["count"]:
+                i -= segment["count"]
+                continue
+            for j, record in enumerate(self._read(segment)):
+                if j >= i:
+                    yield record
+            i = 0
+        if self._active is not None:
+            for j in range(i, len(self._active)):
+                yield self._active[j]
+
+    def _load_manifest(self) -> None:
+        _unpin(self._manifest_pin)
+        self._manifest_pin = _pin(self.manifest_path)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._segments = json.load(f)["segments"]
+        except FileNotFoundError:
+            self._segments = []
+
+    def _save_manifest(self) -> None:
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segments}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+        _fsync_dir(self.manifest_path)
+        _unpin(self._manifest_pin)
+        self._manifest_pin = _pin(self.manifest_path)
+
+    def _open_active(self) -> None:
+        """Open the newest unsealed segment, finishing any interrupted seal"""
+        sealed = {segment["name"] for segment in self._segments}
+        unsealed = []
+        for name in sorted(os.listdir(self.path)):
+            if name in sealed:
+                continue
+            match = _SEGMENT.match(name)
+            path = os.path.join(self.path, name)
+            if name.endswith(".tmp"):
+                os.remove(path)  # a seal or manifest write cut short
+            elif not match:
+                continue
+            elif match.group(3):
+                os.remove(path)  # compressed, but never listed
+            elif any(s.startswith(name) for s in sealed):
+                self._remove_journal(path)  # listed, but not yet removed
+            else:
+                unsealed.append((name, match))
+
+        names = [s["name"] for s in self._segments[-1:]] + [n for n, _ in unsealed]
+        self._next_seq = 1 + max((int(name[:6]) for name in names), default=0)
+        active = self._active
+        if active is not None and (
+            not unsealed or active.path != os.path.join(self.path, unsealed[-1][0])
+        ):
+            active.close()  # sealed by another process
+            self._active = active = None
+        for i, (name, match) in enumerate(unsealed):
+            if i == len(unsealed) - 1 and active is not None:
+                break  # still the active segment
+            journal = CheckinJournal(os.path.join(self.path, name), fsync=self.fsync)
+            if i < len(unsealed) - 1:
+                self._seal(journal)
+            else:
+                self._active, self._active_day = journal, match.group(2)
+
+    def _load_trends(self) -> None:
+        self._trends, self._trends_seen = {}, 0
+        _unpin(self._trends_pin)
+        self._trends_pin = _pin(self.trends_path)
+        try:
+            with open(self.trends_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            logger.warning(f"Rebuilding unreadable trend summaries {self.trends_path}")
+            return
+        if data["seen"] <= len(self):  # else the active segment lost a torn tail
+            self._trends_seen = data["seen"]
+            self._trends = {
+                key: TrendSummary.from_dict(trend)
+                for key, trend in data["trends"].items()
+            }
+
+    def _save_trends(self) -> None:
+        data = {
+            "seen": self._trends_seen,
+            "trends": {key: trend.to_dict() for key, trend in self._trends.items()},
+        }
+        tmp_path = self.trends_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.trends_path)
+        _unpin(self._trends_pin)
+        self._trends_pin = _pin(self.trends_path)
+
+    def _import_legacy(self, legacy_path: str) -> None:
+        """Split an existing single-file log into segments"""
+        try:
+            records = read_log(legacy_path)
+        except Exception as e:
+            logger.warning(f"Failed to import legacy wellness log: {e}")
+            return
+        # Check-ins without a timestamp go last, into the newest segment
+        self.append_many(sorted(records, key=lambda r: record_time(r) or float("inf")))
+        logger.info(f"Imported {len(records)} check-ins from {legacy_path}")
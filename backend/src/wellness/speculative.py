@@ -0,0 +1,265 @@
+"""Speculative synthesis of the agent's predictable next utterance"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+from dataclasses import dataclass
+
+import prometheus_client
+from livekit import rtc
+from livekit.agents import tokenize, tts, utils
+
+from .tts_cache import PhraseCache
+
+logger = logging.getLogger("agent")
+
+SPECULATIONS = prometheus_client.Counter(
+    "wellness_speculative_tts",
+    "Speculatively synthesized utterances by outcome (hit, miss, unused)",
+    ["result", "nodename"],
+)
+SPECULATION_SAVED = prometheus_client.Histogram(
+    "wellness_speculative_tts_saved_seconds",
+    "Time to first audio saved by speculative synthesis",
+    ["nodename"],
+    buckets=[0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0],
+)
+
+_WORD = re.compile(r"\w+")
+_LEADING_PUNCTUATION = re.compile(r"^[^\w\"'(]+")
+_sentences = tokenize.basic.SentenceTokenizer(min_sentence_len=2)
+
+
+def _words(text: str) -> list[str]:
+    return [word.lower() for word in _WORD.findall(text)]
+
+
+def utterance_sentences(text: str) -> list[str]:
+    """Sentences of ``text``, each rendered and matched on its own"""
+    return _sentences.tokenize(text)
+
+
+@dataclass
+class SpeculationStats:
+    prepared: int = 0
+    hits: int = 0
+    misses: int = 0
+    unused: int = 0
+    sentences: int = 0  # prepared sentences that were played
+    saved: float = 0.0  # seconds of time to first audio saved, over all replies
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _Render:
+    """Frames of one sentence, readable while they are still synthesized"""
+
+    def __init__(self, text: str, cached: bool):
+        self.text = text
+        self.words = _words(text)
+        self.cached = cached
+        self.frames: list[rtc.AudioFrame] = []
+        self.done = False
+        self.started = time.perf_counter()
+        self.ttfb: float | None = None
+        self.task: asyncio.Task | None = None
+        self._changed = asyncio.Event()
+
+    async def run(self, cache: PhraseCache, engine: tts.TTS) -> None:
+        try:
+            async for frame in cache.audio(engine, self.text):
+                if self.ttfb is None:
+                    self.ttfb = time.perf_counter() - self.started
+                self.frames.append(frame)
+                self._changed.set()
+        finally:
+            self.done = True
+            self._changed.set()
+
+    async def play(self) -> AsyncIterator[rtc.AudioFrame]:
+        i = 0
+        while True:
+            if i < len(self.frames):
+                yield self.frames[i]
+                i += 1
+            elif self.done:
+                return
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+
+    def cancel(self) -> None:
+        if self.task is not None and not self.done:
+            self.task.cancel()
+
+
+class SpeculativeSpeech:
+    """Renders the utterance the agent is expected to say next, ahead of time.
+
+    :meth:`prepare` starts synthesizing each sentence of ``text`` in the
+    background, through the phrase cache. The next reply goes through
+    :meth:`tts_node`, which plays a prepared sentence as soon as the reply
+    has said it, without waiting for the rest of the reply. From the first
+    word that differs, the remaining prepared audio is discarded and the
+    rest of the reply goes to the regular TTS node. Only the latest
+    utterance is kept.
+
+    Time saved per reply is the TTS time to first byte (averaged over the
+    prepared sentences that were not cached) minus how long the first
+    sentence took to start playing once the reply had said it.
+    """
+
+    def __init__(self, cache: PhraseCache, engine: tts.TTS):
+        self.cache = cache
+        self.engine = engine
+        self.stats = SpeculationStats()
+        self.tts_ttfb: float | None = None
+        self._text: str | None = None
+        self._renders: list[_Render] = []
+        self._nodename = utils.nodename()
+
+    @property
+    def pending(self) -> bool:
+        return self._text is not None
+
+    def prepare(self, text: str) -> None:
+        if self._text == text:
+            return
+        self.discard("unused")
+        for sentence in utterance_sentences(text):
+            render = _Render(sentence, cached=sentence in self.cache)
+            render.task = asyncio.create_task(render.run(self.cache, self.engine))
+            render.task.add_done_callback(self._rendered(render))
+            self._renders.append(render)
+        self._text = text
+        self.stats.prepared += 1
+
+    def discard(self, result: str = "unused") -> None:
+        """Drop the prepared utterance, cancelling its synthesis"""
+        if self._text is None:
+            return
+        for render in self._renders:
+            render.cancel()
+        self._text, self._renders = None, []
+        self._count(result)
+
+    async def tts_node(
+        self,
+        text: AsyncIterable[str],
+        fallback: Callable[[AsyncIterable[str]], AsyncIterable[rtc.AudioFrame]],
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        """Audio for ``text``, prepared while it matches and from ``fallback`` after"""
+        if self._text is None:
+            async for frame in fallback(text):
+                yield frame
+            return
+
+        renders = self._renders
+        text_iter = text.__aiter__()
+        said, ended = "", False
+        played_to = 0  # end of the text covered by played sentences
+        played = 0
+        for render in renders:
+            # Read the reply until it has said this sentence, or something else
+            while True:
+                words = _words(said[played_to:])
+                if words and not ended and said[-1:].isalnum():
+                    words.pop()  # the last word may still be arriving
+                n = min(len(words), len(render.words))
+                if ended or words[:n] != render.words[:n] or n == len(render.words):
+                    break
+                try:
+                    said += await text_iter.__anext__()
+                except StopAsyncIteration:
+                    ended = True
+            if words[: len(render.words)] != render.words:
+                break
+
+            if not played and self._renders is renders:
+                # From here on the utterance belongs to this reply
+                self._text, self._renders = None, []
+            matched_at = time.perf_counter()
+            frames = 0
+            async for frame in render.play():
+                if not played and not frames:
+                    self._record_saved(matched_at, render)
+                frames += 1
+                yield frame
+            if not frames:
+                break  # synthesis failed, say the sentence the regular way
+
+            played += 1
+            played_to = _end_of_words(said, played_to, len(render.words))
+
+        if not played:
+            if ended and not said.strip():
+                return  # no text, e.g. a reply that only calls tools: keep it
+            if self._renders is renders:
+                self._text, self._renders = None, []
+        for render in renders[played:]:
+            render.cancel()
+        self.stats.sentences += played
+        self._count("hit" if played == len(renders) else "miss")
+
+        rest = said[played_to:]
+        while not ended and not _WORD.search(rest):
+            try:
+                rest += await text_iter.__anext__()
+            except StopAsyncIteration:
+                ended = True
+        rest = _LEADING_PUNCTUATION.sub("", rest)
+        if _WORD.search(rest):
+            async for frame in fallback(_replay(rest, text_iter)):
+                yield frame
+
+    def _record_saved(self, matched_at: float, render: _Render) -> None:
+        expected = self.tts_ttfb if self.tts_ttfb is not None else render.ttfb or 0.0
+        saved = max(matched_at + expected - time.perf_counter(), 0.0)
+        self.stats.saved += saved
+        SPECULATION_SAVED.labels(nodename=self._nodename).observe(saved)
+
+    def _rendered(self, render: _Render) -> Callable[[asyncio.Task], None]:
+        def _done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                logger.warning(f"Speculative TTS failed: {task.exception()}")
+            elif not render.cached and render.ttfb is not None:
+                # Moving average of the TTS's own time to first byte
+                if self.tts_ttfb is None:
+                    self.tts_ttfb = render.ttfb
+                else:
+                    self.tts_ttfb += 0.2 * (render.ttfb - self.tts_ttfb)
+
+        return _done
+
+    def _count(self, result: str) -> None:
+        if result == "hit":
+            self.stats.hits += 1
+        elif result == "miss":
+            self.stats.misses += 1
+        else:
+            self.stats.unused += 1
+        SPECULATIONS.labels(result=result, nodename=self._nodename).inc()
+
+
+def _end_of_words(text: str, start: int, n: int) -> int:
+    """Position in ``text`` right after the ``n``-th word from ``start``"""
+    end = start
+    for _, match in zip(range(n), _WORD.finditer(text, start)):
+        end = match.end()
+    return end
+
+
+async def _replay(first: str, rest: AsyncIterator[str]) -> AsyncIterator[str]:
+    if first:
+        yield first
+    async for chunk in rest:
+        yield chunk
@@ -0,0 +1,274 @@
+"""SQLite (WAL mode) check-in store shared by all job processes"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+from .journal import read_log
+from .records import CheckinColumns
+from .store import CheckinStore, TimeLike, record_time, to_epoch
+from .trends import TrendSummary
+
+logger = logging.getLogger("agent")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL DEFAULT '',
+    ts REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS checkins_user_ts ON checkins (user_id, ts);
+CREATE INDEX IF NOT EXISTS checkins_ts ON checkins (ts);
+CREATE TABLE IF NOT EXISTS trends (
+    user_id TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    records INTEGER NOT NULL
+);
+"""
+
+
+def _row(record: dict[str, Any]) -> tuple[str, float, str]:
+    return (
+        str(record.get("user_id") or ""),
+        record_time(record),
+        json.dumps(record, ensure_ascii=False, separators=(",", ":")),
+    )
+
+
+class SQLiteStore(CheckinStore):
+    """Check-in store backed by a local SQLite database in WAL mode.
+
+    Every job process opens its own connection. WAL lets readers run while
+    another process writes, and ``busy_timeout`` makes concurrent writers
+    queue up instead of failing, so no check-in is lost when several sessions
+    save at once. Rows are indexed by ``(user_id, ts)`` and ``ts``.
+
+    Reads go through a second, read-only connection, so they never wait
+    behind a write queued up on the busy timeout.
+    """
+
+    def __init__(self, path: str, *, fsync: bool = False, busy_timeout: float = 10.0):
+        self.path = path
+        self.fsync = fsync
+        self.busy_timeout = busy_timeout
+        self._busy_timeout_ms = int(busy_timeout * 1000)
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly in append_many
+        self._conn = sqlite3.connect(
+            path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._conn.executescript(_SCHEMA)
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(
+            f"file:{path}?mode=ro",
+            uri=True,
+            timeout=busy_timeout,
+            check_same_thread=False,
+        )
+
+    def append_many(
+        self, records: list[dict[str, Any]], *, fsync: bool | None = None
+    ) -> None:
+        if not records:
+            return
+        rows = [_row(record) for record in records]
+        with self._lock:
+            sync = self.fsync if fsync is None else fsync
+            if sync != self.fsync:
+                self._conn.execute(f"PRAGMA synchronous={'FULL' if sync else 'NORMAL'}")
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany(
+                    "INSERT INTO checkins (user_id, ts, data) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                if sync != self.fsync:
+                    self._conn.execute(
+                        f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}"
+                    )
+
+    def last(self, n: int = 1, *, user_id: str | None = None) -> list[dict[str, Any]]:
+        if user_id is None:
+            query = "SELECT data FROM checkins ORDER BY ts DESC, id DESC LIMIT ?"
+            params: tuple = (n,)
+        else:
+            query = (
+                "SELECT data FROM checkins WHERE user_id = ? "
+                "ORDER BY ts DESC, id DESC LIMIT ?"
+            )
+            params = (user_id, n)
+        with self._read_lock:
+            rows = self._reader.execute(query, params).fetchall()
+        return [json.loads(data) for (data,) in reversed(rows)]
+
+    def between(
+        self, start: TimeLike, end: TimeLike, *, user_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        if user_id is None:
+            query = "SELECT data FROM checkins WHERE ts >= ? AND ts < ? ORDER BY ts, id"
+            params: tuple = (to_epoch(start), to_epoch(end))
+        else:
+            query = (
+                "SELECT data FROM checkins WHERE user_id = ? AND ts >= ? AND ts < ? "
+                "ORDER BY ts, id"
+            )
+            params = (user_id, to_epoch(start), to_epoch(end))
+        with self._read_lock:
+            rows = self._reader.execute(query, params).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def columns(self, user_id: str | None = None) -> CheckinColumns:
+        """``user_id``'s check-ins, or everyone's, as typed columns.
+
+        Fields are extracted by SQLite and rows streamed in batches, so the
+        JSON documents are never parsed in Python.
+        """
+        query = (
+            "SELECT user_id, ts, json_extract(data, '$.mood'), "
+            "json_extract(data, '$.energy'), json_extract(data, '$.stress'), "
+            "json_extract(data, '$.goals'), json_extract(data, '$.summary') "
+            "FROM checkins"
+        )
+        params: tuple = ()
+        if user_id is not None:
+            query += " WHERE user_id = ?"
+            params = (user_id,)
+        columns = CheckinColumns()
+        with self._read_lock:
+            cursor = self._reader.execute(query + " ORDER BY ts, id", params)
+            while rows := cursor.fetchmany(10000):
+                for row in rows:
+                    columns.append_stored(*row)
+        return columns
+
+    def trend(self, user_id: str | None = None) -> TrendSummary:
+        """Running summary of ``user_id``'s check-ins, or everyone's for ``None``.
+
+        Per-user summaries are stored in the ``trends`` table with the id of
+        the last check-in they include, so only newer rows are folded in.
+        """
+        if user_id is None:
+            return super().trend()
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT last_id, data FROM trends WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            last_id, trend = (
+                (row[0], TrendSummary.from_dict(json.loads(row[1])))
+                if row
+                else (0, TrendSummary())
+            )
+            rows = self._reader.execute(
+                "SELECT id, data FROM checkins WHERE user_id = ? AND id > ? ORDER BY id",
+                (user_id, last_id),
+            ).fetchall()
+        if not rows:
+            return trend
+        for _, data in rows:
+            trend.update(json.loads(data))
+        last_id = rows[-1][0]
+        # The stored summary only saves work for later calls, so it is skipped
+        # rather than waited for while a write holds the database
+        if not self._lock.acquire(blocking=False):
+            return trend
+        try:
+            self._conn.execute("PRAGMA busy_timeout=0")
+            # Another process may have stored a newer summary meanwhile
+            self._conn.execute(
+                "INSERT INTO trends (user_id, last_id, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET "
+                "last_id = excluded.last_id, data = excluded.data "
+                "WHERE excluded.last_id > trends.last_id",
+                (user_id, last_id, json.dumps(trend.to_dict())),
+            )
+        except sqlite3.OperationalError:
+            pass  # locked by another process's write
+        finally:
+            self._conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._lock.release()
+        return trend
+
+    def __len__(self) -> int:
+        with self._read_lock:
+            return self._reader.execute("SELECT COUNT(*) FROM checkins").fetchone()[0]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        # Separate cursor so a long scan does not hold the lock
+        conn = sqlite3.connect(
+            f"file:{self.path}?mode=ro", uri=True, timeout=self.busy_timeout
+        )
+        try:
+            for (data,) in conn.execute("SELECT data FROM checkins ORDER BY id"):
+                yield json.loads(data)
+        finally:
+            conn.close()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self) -> None:
+        with self._lock, self._read_lock:
+            self._reader.close()
+            self._conn.close()
+
+    def import_log(self, path: str) -> int:
+        """Import check-ins from a JSON Lines journal or the old JSON array log.
+
+        Each source file is imported at most once, even when several job
+        processes start at the same time. Returns the number of records added.
+        """
+        if not os.path.exists(path):
+            return 0
+        source = os.path.abspath(path)
+        with self._read_lock:
+            if self._reader.execute(
+                "SELECT 1 FROM imports WHERE source = ?", (source,)
+            ).fetchone():
+                return 0
+
+        rows = [_row(record) for record in read_log(path)]
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                # Re-check inside the write lock: another process may have won
+                if self._conn.execute(
+                    "SELECT 1 FROM imports WHERE source = ?", (source,)
+                ).fetchone():
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                self._conn.executemany(
+                    "INSERT INTO checkins (user_id, ts, data) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "INSERT INTO imports (source, records) VALUES (?, ?)",
+                    (source, len(rows)),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Imported {len(rows)} check-ins from {path} into {self.path}")
+        return len(rows)
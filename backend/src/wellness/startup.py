@@ -0,0 +1,85 @@
+"""Deferred LiveKit plugin imports and startup profiling"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from collections.abc import Iterable
+from types import ModuleType
+
+from .prewarm import WarmupTimer
+
+# Plugins used by the agent, imported only by commands that run it
+PLUGINS = {
+    "silero": "livekit.plugins.silero",
+    "turn_detector": "livekit.plugins.turn_detector.multilingual",
+    "deepgram": "livekit.plugins.deepgram",
+    "google": "livekit.plugins.google",
+    "murf": "livekit.plugins.murf",
+}
+
+# Plugins with model files for ``download-files`` to fetch
+DOWNLOAD_PLUGINS = ("silero", "turn_detector")
+
+
+def import_plugins(
+    names: Iterable[str] = PLUGINS, timer: WarmupTimer | None = None
+) -> dict[str, ModuleType]:
+    """Import the named plugins of :data:`PLUGINS`, timing each with ``timer``.
+
+    Plugins register themselves when imported, which LiveKit only allows on
+    the main thread. The worker then preloads the registered plugins into
+    its job processes and ``download-files`` fetches their models, so this
+    runs in the main process before ``cli.run_app``.
+    """
+    timer = timer if timer is not None else WarmupTimer()
+    modules = {}
+    for name in names:
+        with timer.measure(name):
+            modules[name] = importlib.import_module(PLUGINS[name])
+    return modules
+
+
+def _package(module: str) -> str:
+    parts = module.split(".")
+    if parts[0] == "livekit" and len(parts) > 2 and parts[1] == "plugins":
+        return ".".join(parts[:3])
+    return ".".join(parts[:2]) if parts[0] == "livekit" else parts[0]
+
+
+def import_breakdown(
+    code: str, *, cwd: str | None = None, top: int = 10
+) -> list[tuple[str, float]]:
+    """Import time of ``code`` in a fresh interpreter, by package, slowest first.
+
+    Runs ``code`` under ``python -X importtime`` and adds up each module's
+    own import time (excluding its imports) per package, so every
+    millisecond is counted once. Packages past the ``top`` slowest are added
+    up as ``other``, and the last entry is the ``total``.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, _, module = line[len("import time:") :].split("|")
+        seconds[_package(module.strip())] += int(own) / 1e6
+
+    ranked = sorted(seconds.items(), key=lambda item: -item[1])
+    breakdown = ranked[:top]
+    other = sum(secs for _, secs in ranked[top:])
+    if other:
+        breakdown.append(("other", other))
+    breakdown.append(("total", sum(seconds.values())))
+    return breakdown
@@ -0,0 +1,91 @@
+"""Interface shared by the check-in storage backends"""
+
+from __future__ import annotations
+
+import datetime
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Union
+
+if TYPE_CHECKING:
+    from .records import CheckinColumns
+    from .trends import TrendSummary
+
+TimeLike = Union[datetime.datetime, float]
+
+
+def record_time(record: dict[str, Any]) -> float:
+    """Epoch seconds of a record's ISO ``timestamp``, or 0.0 when missing"""
+    try:
+        return datetime.datetime.fromisoformat(record["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def to_epoch(value: TimeLike) -> float:
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class CheckinStore(ABC):
+    """Persistent log of completed check-ins.
+
+    Records are plain JSON-serializable dicts with an ISO ``timestamp`` and,
+    when the participant is known, a ``user_id``.
+    """
+
+    path: str
+
+    def append(self, record: dict[str, Any]) -> None:
+        """Save one check-in"""
+        self.append_many([record])
+
+    @abstractmethod
+    def append_many(
+        self, records: list[dict[str, Any]], *, fsync: bool | None = None
+    ) -> None:
+        """Save a batch of check-ins in one commit"""
+
+    @abstractmethod
+    def last(self, n: int = 1, *, user_id: str | None = None) -> list[dict[str, Any]]:
+        """The newest ``n`` check-ins, oldest first"""
+
+    @abstractmethod
+    def between(
+        self, start: TimeLike, end: TimeLike, *, user_id: str | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Check-ins with ``start <= timestamp < end``, oldest first"""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[dict[str, Any]]: ...
+
+    def trend(self, user_id: str | None = None) -> TrendSummary:
+        """Running summary of ``user_id``'s check-ins, or everyone's for ``None``.
+
+        This default folds the whole history; backends override it to only
+        fold the check-ins saved since the summary was last stored.
+        """
+        from .trends import TrendSummary
+
+        trend = TrendSummary()
+        for record in self.between(float("-inf"), float("inf"), user_id=user_id):
+            trend.update(record)
+        return trend
+
+    def columns(self, user_id: str | None = None) -> CheckinColumns:
+        """``user_id``'s check-ins, or everyone's, as typed columns"""
+        from .records import CheckinColumns
+
+        return CheckinColumns.from_dicts(
+            self.between(float("-inf"), float("inf"), user_id=user_id)
+        )
+
+    def sync(self) -> None:  # noqa: B027 - nothing to sync unless overridden
+        """Force committed check-ins to stable storage"""
+
+    def close(self) -> None:  # noqa: B027 - nothing to release unless overridden
+        """Release files and connections"""
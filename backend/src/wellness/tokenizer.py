@@ -0,0 +1,135 @@
+"""Sentence tokenizer that sends the start of each reply to the TTS early"""
+
+from __future__ import annotations
+
+import re
+
+from livekit.agents import tokenize, utils
+from livekit.agents.tokenize import TokenData
+from livekit.agents.utils import aio
+
+# Punctuation followed by whitespace, where speech pauses naturally
+_CLAUSE_END = re.compile(r"[,;:.!?—](?=\s)")
+_WORD_END = re.compile(r"\S(?=\s)")
+
+
+def first_chunk_end(text: str, min_words: int, max_words: int) -> int | None:
+    """Where the first chunk of ``text`` can end, or None to keep waiting.
+
+    That is the first clause boundary after at least ``min_words`` words, or
+    the end of word ``max_words`` when no boundary comes sooner.
+    """
+    boundaries = {m.end() for m in _CLAUSE_END.finditer(text)}
+    for words, match in enumerate(_WORD_END.finditer(text), start=1):
+        end = match.end()
+        if (end in boundaries and words >= min_words) or words >= max_words:
+            return end
+    return None
+
+
+class EarlyChunkTokenizer(tokenize.SentenceTokenizer):
+    """Whole sentences, except for an early first chunk per reply.
+
+    A basic sentence stream holds a sentence back until the next one starts,
+    so the TTS waits for the LLM's whole first sentence and a bit more. Here
+    the first chunk of every segment is released at a clause boundary or
+    after ``max_words`` words, and the rest is split into full sentences
+    for natural prosody.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_words: int = 2,
+        max_words: int = 8,
+        min_sentence_len: int = 2,
+        stream_context_len: int = 10,
+    ):
+        self.min_words = min_words
+        self.max_words = max_words
+        self.min_sentence_len = min_sentence_len
+        self.stream_context_len = stream_context_len
+        self._sentences = tokenize.basic.SentenceTokenizer(
+            min_sentence_len=min_sentence_len, stream_context_len=stream_context_len
+        )
+
+    def tokenize(self, text: str, *, language: str | None = None) -> list[str]:
+        return self._sentences.tokenize(text, language=language)
+
+    def stream(self, *, language: str | None = None) -> tokenize.SentenceStream:
+        return _EarlyChunkStream(self, language)
+
+
+class _EarlyChunkStream(tokenize.SentenceStream):
+    """The first chunk of each segment early, then whole sentences.
+
+    Sentences come from the tokenizer's ``tokenize``; like a basic sentence
+    stream, the last one is held back until the next starts or the segment
+    is flushed, since it may still be growing.
+    """
+
+    def __init__(self, tokenizer: EarlyChunkTokenizer, language: str | None):
+        super().__init__()
+        self._tokenizer = tokenizer
+        self._language = language
+        self._tokens = aio.Chan[TokenData]()
+        self._segment_id = utils.shortuuid()
+        self._first_pending = True
+        self._in_buf = ""  # text not split into sentences yet
+        self._out_buf = ""  # sentences shorter than min_sentence_len, joined
+
+    @property
+    def closed(self) -> bool:
+        return self._tokens.closed
+
+    def push_text(self, text: str) -> None:
+        self._check_open()
+        self._in_buf += text
+        if self._first_pending:
+            end = first_chunk_end(
+                self._in_buf, self._tokenizer.min_words, self._tokenizer.max_words
+            )
+            if end is None:
+                return
+            self._send(self._in_buf[:end].strip())
+            self._in_buf = self._in_buf[end:].lstrip()
+            self._first_pending = False
+
+        if len(self._in_buf) < self._tokenizer.stream_context_len:
+            return
+        sentences = self._tokenizer.tokenize(self._in_buf, language=self._language)
+        for sentence in sentences[:-1]:
+            self._out_buf = f"{self._out_buf} {sentence}".lstrip()
+            if len(self._out_buf) >= self._tokenizer.min_sentence_len:
+                self._send(self._out_buf)
+                self._out_buf = ""
+            start = max(self._in_buf.find(sentence), 0)
+            self._in_buf = self._in_buf[start + len(sentence) :].lstrip()
+
+    def flush(self) -> None:
+        self._check_open()
+        if self._in_buf:
+            rest = self._tokenizer.tokenize(self._in_buf, language=self._language)
+            self._out_buf = " ".join([self._out_buf, *rest]).strip()
+        if self._out_buf:
+            self._send(self._out_buf)
+        self._in_buf = self._out_buf = ""
+        self._segment_id = utils.shortuuid()
+        self._first_pending = True
+
+    def end_input(self) -> None:
+        self.flush()
+        self._tokens.close()
+
+    async def aclose(self) -> None:
+        self._tokens.close()
+
+    async def __anext__(self) -> TokenData:
+        return await self._tokens.__anext__()
+
+    def _send(self, token: str) -> None:
+        self._tokens.send_nowait(TokenData(token=token, segment_id=self._segment_id))
+
+    def _check_open(self) -> None:
+        if self._tokens.closed:
+            raise RuntimeError(f"{type(self).__name__} is closed")
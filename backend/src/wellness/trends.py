@@ -0,0 +1,161 @@
+"""Running summary of a user's check-in history"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import time
+from typing import Any
+
+from .store import record_time
+
+SCALES = ("mood", "energy", "stress")
+
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+_NUMBER_WORD = re.compile(r"\b(one|two|three|four|five)\b")
+_GOAL_SEPARATORS = re.compile(r"[,;\n]|\band\b|\bthen\b")
+
+
+def scale_value(value: Any) -> int | None:
+    """1-5 rating from a stored value such as ``4``, ``"4/5"`` or ``"four"``"""
+    if isinstance(value, (int, float)):
+        number = int(value)
+    else:
+        text = str(value).strip().lower()
+        match = re.search(r"\d+", text)
+        if match:
+            number = int(match.group())
+        else:
+            # Whole words only: "someone" and "network" are not ratings
+            match = _NUMBER_WORD.search(text)
+            number = _NUMBER_WORDS[match.group()] if match else 0
+    return number if 1 <= number <= 5 else None
+
+
+def split_goals(value: Any) -> list[str]:
+    """Normalized goal names from a free-text ``goals`` field"""
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(v) for v in value)
+    goals = []
+    for part in _GOAL_SEPARATORS.split(str(value or "").lower()):
+        goal = " ".join(re.sub(r"[^\w\s'-]", " ", part).split())
+        goal = re.sub(r"^(to|i want to|i will|i'll)\s+", "", goal)
+        if goal:
+            goals.append(goal[:40])
+    return goals
+
+
+class TrendSummary:
+    """Aggregate of one user's check-ins, updated in O(1) per check-in.
+
+    Tracks exponentially weighted averages of the 1-5 scales, the latest
+    ratings, the daily streak, the most frequent goals (bounded to
+    ``max_goals`` entries) and when the last check-in happened. The summary
+    never grows with the history, so neither does :meth:`describe`.
+    """
+
+    def __init__(self, *, alpha: float = 0.3, max_goals: int = 20):
+        self.alpha = alpha
+        self.max_goals = max_goals
+        self.count = 0
+        self.first_time = 0.0
+        self.last_time = 0.0
+        self.averages: dict[str, float] = {}
+        self.latest: dict[str, int] = {}
+        self.streak = 0
+        self.best_streak = 0
+        self.last_day = 0  # proleptic ordinal of the last check-in's date
+        self.goals: dict[str, int] = {}
+
+    def update(self, record: dict[str, Any]) -> None:
+        self.count += 1
+        ts = record_time(record)
+        if ts:
+            self._update_streak(ts)
+            self.first_time = min(self.first_time, ts) if self.first_time else ts
+            self.last_time = max(self.last_time, ts)
+
+        for scale in SCALES:
+            value = scale_value(record.get(scale))
+            if value is None:
+                continue
+            avg = self.averages.get(scale)
+            self.averages[scale] = (
+                value if avg is None else avg + self.alpha * (value - avg)
+            )
+            self.latest[scale] = value
+
+        for goal in split_goals(record.get("goals")):
+            self._count_goal(goal)
+
+    def _update_streak(self, ts: float) -> None:
+        day = datetime.date.fromtimestamp(ts).toordinal()
+        if day <= self.last_day:
+            return  # same day, or an out-of-order record
+        self.streak = self.streak + 1 if day == self.last_day + 1 else 1
+        self.best_streak = max(self.best_streak, self.streak)
+        self.last_day = day
+
+    def _count_goal(self, goal: str) -> None:
+        # Space-saving counter: when full, a new goal takes over the rarest slot
+        if goal in self.goals or len(self.goals) < self.max_goals:
+            self.goals[goal] = self.goals.get(goal, 0) + 1
+            return
+        rarest = min(self.goals, key=self.goals.__getitem__)
+        self.goals[goal] = self.goals.pop(rarest) + 1
+
+    def recurring_goals(self, n: int = 3) -> list[tuple[str, int]]:
+        ranked = sorted(self.goals.items(), key=lambda item: (-item[1], item[0]))
+        return [(goal, count) for goal, count in ranked[:n] if count > 1]
+
+    def describe(self, now: float | None = None, max_chars: int = 400) -> str:
+        """Compact summary for the LLM's instructions, at most ``max_chars``"""
+        if not self.count:
+            return "No previous check-ins."
+
+        now = now or time.time()
+        parts = [f"{self.count} previous check-in{'s' if self.count != 1 else ''}"]
+        if self.last_time:
+            days = int((now - self.last_time) // 86400)
+            ago = {0: "today", 1: "yesterday"}.get(days, f"{days} days ago")
+            parts[0] += f", the last one {ago}"
+        scales = [
+            f"{scale} avg {self.averages[scale]:.1f} (last {self.latest[scale]})"
+            for scale in SCALES
+            if scale in self.averages
+        ]
+        if scales:
+            parts.append("1-5 scales: " + ", ".join(scales))
+        if self.best_streak > 1:
+            # The streak is broken once a whole day passes without a check-in
+            today = datetime.date.fromtimestamp(now).toordinal()
+            streak = self.streak if today - self.last_day <= 1 else 0
+            parts.append(f"Daily streak {streak} (best {self.best_streak})")
+        goals = self.recurring_goals()
+        if goals:
+            parts.append(
+                "Recurring goals: " + ", ".join(f"{g} ({n}x)" for g, n in goals)
+            )
+
+        text = ". ".join(parts) + "."
+        return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "averages": self.averages,
+            "latest": self.latest,
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+            "last_day": self.last_day,
+            "goals": self.goals,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TrendSummary:
+        trend = cls()
+        for key, value in data.items():
+            setattr(trend, key, dict(value) if isinstance(value, dict) else value)
+        return trend
@@ -0,0 +1,206 @@
+"""Cache of synthesized audio for the agent's fixed and templated phrases"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import wave
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+
+from livekit import rtc
+from livekit.agents import AgentSession, tts
+
+logger = logging.getLogger("agent")
+
+# Cached audio is replayed in 20 ms frames, like a live TTS stream
+_FRAME_MS = 20
+
+
+@dataclass
+class _Clip:
+    pcm: bytes  # 16-bit signed little-endian samples
+    sample_rate: int
+    num_channels: int
+
+    def frames(self) -> Iterable[rtc.AudioFrame]:
+        samples = self.sample_rate * _FRAME_MS // 1000
+        step = samples * self.num_channels * 2
+        for start in range(0, len(self.pcm), step):
+            chunk = self.pcm[start : start + step]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (2 * self.num_channels),
+            )
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    bytes: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+
+class PhraseCache:
+    """Two-tier audio cache keyed by ``(voice, style, text)``.
+
+    The memory tier is an LRU bounded by ``max_bytes``. The optional disk tier
+    stores one WAV file per phrase under ``disk_dir`` and survives restarts,
+    so it can be loaded into memory at prewarm time. On a miss the phrase is
+    synthesized once and its frames are played while they are recorded.
+    """
+
+    def __init__(
+        self,
+        *,
+        voice: str,
+        style: str | None = None,
+        max_bytes: int = 32 * 1024 * 1024,
+        disk_dir: str | None = None,
+    ):
+        self.voice = voice
+        self.style = style
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.stats = CacheStats()
+        self._clips: OrderedDict[str, _Clip] = OrderedDict()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key(self, text: str) -> str:
+        raw = f"{self.voice}\0{self.style or ''}\0{text}".encode()
+        return hashlib.sha1(raw).hexdigest()
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._clips
+
+    def say(self, session: AgentSession, text: str, **kwargs):
+        """``session.say`` that plays cached audio instead of calling the TTS"""
+        return session.say(text, audio=self.audio(session.tts, text), **kwargs)
+
+    async def audio(self, engine: tts.TTS, text: str) -> AsyncIterator[rtc.AudioFrame]:
+        """Frames for ``text``, from memory, disk or a fresh synthesis"""
+        key = self.key(text)
+        clip = self._clips.get(key)
+        if clip is not None:
+            self._clips.move_to_end(key)
+            self.stats.hits += 1
+        elif self.disk_dir and (clip := await asyncio.to_thread(self._read_disk, key)):
+            self.stats.disk_hits += 1
+            self._remember(key, clip)
+
+        if clip is not None:
+            for frame in clip.frames():
+                yield frame
+            return
+
+        self.stats.misses += 1
+        pcm = bytearray()
+        sample_rate, num_channels = engine.sample_rate, engine.num_channels
+        async with engine.synthesize(text) as stream:
+            async for ev in stream:
+                sample_rate, num_channels = ev.frame.sample_rate, ev.frame.num_channels
+                pcm += ev.frame.data.tobytes()
+                yield ev.frame
+
+        if not pcm:
+            # Nothing to replay; caching it would silence every later request
+            logger.warning(f"TTS returned no audio for {text!r}, not caching it")
+            return
+        clip = _Clip(bytes(pcm), sample_rate, num_channels)
+        self._remember(key, clip)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, clip)
+
+    async def warm(self, engine: tts.TTS, texts: Iterable[str]) -> int:
+        """Synthesize every phrase not cached yet; returns how many were added"""
+        added = 0
+        for text in texts:
+            key = self.key(text)
+            if key in self._clips:
+                continue
+            if self.disk_dir and await asyncio.to_thread(self._read_disk, key):
+                continue
+            try:
+                async for _ in self.audio(engine, text):
+                    pass
+            except Exception as e:
+                logger.warning(f"Failed to warm TTS cache for {text!r}: {e}")
+                continue
+            added += key in self._clips
+        return added
+
+    def load_disk(self, texts: Iterable[str]) -> int:
+        """Load phrases already on disk into memory (blocking, for prewarm)"""
+        if not self.disk_dir:
+            return 0
+        loaded = 0
+        for text in texts:
+            key = self.key(text)
+            if key not in self._clips and (clip := self._read_disk(key)):
+                self._remember(key, clip)
+                loaded += 1
+        return loaded
+
+    def _remember(self, key: str, clip: _Clip) -> None:
+        if len(clip.pcm) > self.max_bytes:
+            return
+        old = self._clips.pop(key, None)
+        if old is not None:
+            self.stats.bytes -= len(old.pcm)
+        self._clips[key] = clip
+        self.stats.bytes += len(clip.pcm)
+        while self.stats.bytes > self.max_bytes:
+            _, evicted = self._clips.popitem(last=False)
+            self.stats.bytes -= len(evicted.pcm)
+            self.stats.evictions += 1
+        self.stats.entries = len(self._clips)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".wav")
+
+    def _read_disk(self, key: str) -> _Clip | None:
+        try:
+            with wave.open(self._disk_path(key), "rb") as f:
+                clip = _Clip(
+                    f.readframes(f.getnframes()), f.getframerate(), f.getnchannels()
+                )
+        except FileNotFoundError:
+            return None
+        except (wave.Error, EOFError) as e:
+            logger.warning(f"Ignoring unreadable TTS cache entry {key}: {e}")
+            return None
+        return clip if clip.pcm else None  # empty entries count as missing
+
+    def _write_disk(self, key: str, clip: _Clip) -> None:
+        if not clip.pcm:
+            raise ValueError(f"Refusing to cache an empty clip for {key}")
+        # A temporary file of its own, so concurrent writers of one phrase
+        # (several workers warming together) never interleave their frames
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, wave.open(raw, "wb") as f:
+                f.setnchannels(clip.num_channels)
+                f.setsampwidth(2)
+                f.setframerate(clip.sample_rate)
+                f.writeframes(clip.pcm)
+            os.replace(tmp_path, self._disk_path(key))
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmp_path)
+            raise
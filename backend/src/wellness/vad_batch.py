@@ -0,0 +1,471 @@
+"""Silero VAD inference batched across the sessions of a process"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import dataclasses
+import logging
+import threading
+import time
+import weakref
+from typing import Any
+
+import numpy as np
+from livekit import agents, rtc
+from livekit.agents import utils
+from livekit.plugins.silero import onnx_model
+
+logger = logging.getLogger("agent")
+
+
+@dataclasses.dataclass
+class BatchStats:
+    batches: int = 0
+    windows: int = 0
+    largest: int = 0
+    inference_time: float = 0.0  # seconds spent in the model
+
+    @property
+    def mean_batch(self) -> float:
+        return self.windows / self.batches if self.batches else 0.0
+
+
+@dataclasses.dataclass
+class VADOptions:
+    """Speech detection settings, with the defaults of ``silero.VAD.load``"""
+
+    min_speech_duration: float = 0.05
+    min_silence_duration: float = 0.55
+    prefix_padding_duration: float = 0.5
+    max_buffered_speech: float = 60.0
+    activation_threshold: float = 0.5
+    sample_rate: int = 16000
+
+
+class _Window:
+    __slots__ = ("future", "loop", "model", "samples")
+
+    def __init__(self, model, samples, loop, future):
+        self.model = model
+        self.samples = samples
+        self.loop = loop
+        self.future = future
+
+
+def _resolve(future: asyncio.Future, result: Any, error: BaseException | None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver(window: _Window, result: Any, error: BaseException | None = None):
+    with contextlib.suppress(RuntimeError):  # the stream's event loop has closed
+        window.loop.call_soon_threadsafe(_resolve, window.future, result, error)
+
+
+class VADBatcher:
+    """Runs Silero for every VAD stream of a process, one batch per tick.
+
+    Streams submit each window of audio with :meth:`infer`. A dedicated
+    thread waits ``tick`` seconds after the first pending window, or until
+    ``max_batch`` windows are pending, then runs the model once over all of
+    them with each stream's context, and resolves each stream's future on
+    its own event loop. Streams may belong to different event loops, as the
+    jobs of a thread executor do.
+
+    Every window starts from a zero recurrent state, as it does in the
+    plugin's own streams, so batched and per-stream VAD make the same
+    decisions.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        *,
+        sample_rate: int = 16000,
+        tick: float = 0.005,
+        max_batch: int = 64,
+    ):
+        # Window and context sizes for the sample rate, as the plugin's model has them
+        sizes = onnx_model.OnnxModel(onnx_session=session, sample_rate=sample_rate)
+        self.session = session
+        self.sample_rate = sample_rate
+        self.window_size_samples = sizes.window_size_samples
+        self.context_size = sizes.context_size
+        self.tick = tick
+        self.max_batch = max_batch
+        self.stats = BatchStats()
+        self._sr = np.array(sample_rate, dtype=np.int64)
+        self._input = np.zeros(
+            (max_batch, self.context_size + self.window_size_samples), dtype=np.float32
+        )
+        self._state = np.zeros((2, max_batch, 128), dtype=np.float32)
+        self._pending: list[_Window] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="vad-batch", daemon=True)
+        self._thread.start()
+
+    def infer(self, model: BatchedModel, samples: np.ndarray) -> asyncio.Future:
+        """Speech probability of one window of ``model``'s stream"""
+        loop = asyncio.get_running_loop()
+        window = _Window(model, samples.copy(), loop, loop.create_future())
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("VAD batcher is closed")
+            self._pending.append(window)
+            if len(self._pending) in (1, self.max_batch):
+                self._cond.notify()
+        return window.future
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Let the other streams' windows of this tick join the batch
+                deadline = time.monotonic() + self.tick
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list[_Window]) -> None:
+        n = len(batch)
+        inputs = self._input[:n]
+        for i, window in enumerate(batch):
+            inputs[i, : self.context_size] = window.model.context
+            inputs[i, self.context_size :] = window.samples
+
+        started = time.perf_counter()
+        try:
+            out, _ = self.session.run(
+                None, {"input": inputs, "state": self._state[:, :n], "sr": self._sr}
+            )
+        except Exception as e:
+            for window in batch:
+                _deliver(window, None, e)
+            return
+        self.stats.inference_time += time.perf_counter() - started
+        self.stats.batches += 1
+        self.stats.windows += n
+        self.stats.largest = max(self.stats.largest, n)
+
+        for i, window in enumerate(batch):
+            window.model.context = inputs[i, -self.context_size :].copy()
+            _deliver(window, float(out[i, 0]))
+
+
+class BatchedModel:
+    """One stream's Silero context, inferred by a batcher"""
+
+    def __init__(self, batcher: VADBatcher):
+        self.batcher = batcher
+        self.sample_rate = batcher.sample_rate
+        self.window_size_samples = batcher.window_size_samples
+        self.context = np.zeros(batcher.context_size, dtype=np.float32)
+
+    def infer(self, samples: np.ndarray) -> asyncio.Future:
+        return self.batcher.infer(self, samples)
+
+
+def _rest(frame: rtc.AudioFrame, used: int) -> list[rtc.AudioFrame]:
+    """The samples of ``frame`` after the first ``used``, as a list of frames"""
+    data = frame.data[used:].tobytes()
+    if not data:
+        return []
+    return [
+        rtc.AudioFrame(
+            data=data,
+            sample_rate=frame.sample_rate,
+            num_channels=1,
+            samples_per_channel=len(data) // 2,
+        )
+    ]
+
+
+class BatchedVADStream(agents.vad.VADStream):
+    """Silero's speech detection over a :class:`BatchedModel`.
+
+    Decides like the plugin's stream: probabilities are smoothed with the
+    same filter, speech starts after ``min_speech_duration`` above the
+    activation threshold and ends after ``min_silence_duration`` below it.
+    The audio of the current speech, with ``prefix_padding_duration``
+    before it, is buffered for the start and end events.
+    """
+
+    def __init__(self, vad: BatchedVAD, opts: VADOptions, model: BatchedModel):
+        super().__init__(vad)
+        self._opts = opts
+        self._model = model
+        self._filter = utils.ExpFilter(alpha=0.35)
+        self._input_rate = 0
+        self._padding = 0  # prefix padding, in input samples
+        self._speech: np.ndarray | None = None
+        self._speech_end = 0
+        self._speech_full = False
+
+    def update_options(self, **options: float) -> None:
+        """Change :class:`VADOptions` fields of this stream"""
+        grown = options.get("max_buffered_speech", 0) > self._opts.max_buffered_speech
+        self._opts = dataclasses.replace(self._opts, **options)
+        if self._speech is not None:
+            speech = self._alloc()
+            kept = min(self._speech_end, speech.size)
+            speech[:kept] = self._speech[:kept]
+            self._speech, self._speech_end = speech, kept
+            if grown:
+                self._speech_full = False
+
+    def _alloc(self) -> np.ndarray:
+        self._padding = int(self._opts.prefix_padding_duration * self._input_rate)
+        size = int(self._opts.max_buffered_speech * self._input_rate) + self._padding
+        return np.empty(size, dtype=np.int16)
+
+    def _buffer_speech(self, data: Any) -> None:
+        assert self._speech is not None
+        count = min(len(data), self._speech.size - self._speech_end)
+        if count > 0:
+            self._speech[self._speech_end : self._speech_end + count] = data[:count]
+            self._speech_end += count
+        elif not self._speech_full:
+            self._speech_full = True
+            logger.warning("VAD speech buffer full, ignoring the rest of this speech")
+
+    def _keep_padding(self) -> None:
+        """Drop buffered audio, keeping the prefix padding before the next speech"""
+        assert self._speech is not None
+        if self._speech_end <= self._padding:
+            return
+        self._speech[: self._padding] = self._speech[
+            self._speech_end - self._padding : self._speech_end
+        ]
+        self._speech_end = self._padding
+        self._speech_full = False
+
+    def _speech_frame(self) -> rtc.AudioFrame:
+        assert self._speech is not None
+        return rtc.AudioFrame(
+            data=self._speech[: self._speech_end].tobytes(),
+            sample_rate=self._input_rate,
+            num_channels=1,
+            samples_per_channel=self._speech_end,
+        )
+
+    async def _main_task(self) -> None:
+        window = self._model.window_size_samples
+        window_duration = window / self._opts.sample_rate
+        samples = np.empty(window, dtype=np.float32)
+        input_frames: list[rtc.AudioFrame] = []
+        inference_frames: list[rtc.AudioFrame] = []
+        resampler: rtc.AudioResampler | None = None
+        copy_fraction = 0.0  # keeps non-integer resampling ratios from drifting
+
+        # Published with the events, and the raw runs above and below threshold
+        speaking = False
+        speech_duration = silence_duration = 0.0
+        speech_run = silence_run = 0.0
+        sample_index = 0
+        timestamp = 0.0
+
+        async for frame in self._input_ch:
+            if not isinstance(frame, rtc.AudioFrame):
+                continue  # flush
+            if not self._input_rate:
+                self._input_rate = frame.sample_rate
+                self._speech = self._alloc()
+                if self._input_rate != self._opts.sample_rate:
+                    resampler = rtc.AudioResampler(
+                        input_rate=self._input_rate,
+                        output_rate=self._opts.sample_rate,
+                        quality=rtc.AudioResamplerQuality.QUICK,
+                    )
+            elif frame.sample_rate != self._input_rate:
+                logger.error("VAD frame sample rate differs from the stream's")
+                continue
+
+            input_frames.append(frame)
+            if resampler is not None:
+                inference_frames.extend(resampler.push(frame))
+            else:
+                inference_frames.append(frame)
+
+            while sum(f.samples_per_channel for f in inference_frames) >= window:
+                started = time.perf_counter()
+                input_frame = utils.combine_frames(input_frames)
+                inference_frame = utils.combine_frames(inference_frames)
+                np.divide(
+                    inference_frame.data[:window],
+                    np.iinfo(np.int16).max,
+                    out=samples,
+                    dtype=np.float32,
+                )
+                p = await self._model.infer(samples)
+                p = self._filter.apply(exp=1.0, sample=p)
+                sample_index += window
+                timestamp += window_duration
+
+                ratio = self._input_rate / self._model.sample_rate
+                to_copy = window * ratio + copy_fraction
+                copied = int(to_copy)
+                copy_fraction = to_copy - copied
+                self._buffer_speech(input_frame.data[:copied])
+                inference_duration = time.perf_counter() - started
+
+                if speaking:
+                    speech_duration += window_duration
+                else:
+                    silence_duration += window_duration
+                self._event_ch.send_nowait(
+                    agents.vad.VADEvent(
+                        type=agents.vad.VADEventType.INFERENCE_DONE,
+                        samples_index=sample_index,
+                        timestamp=timestamp,
+                        silence_duration=silence_duration,
+                        speech_duration=speech_duration,
+                        probability=p,
+                        inference_duration=inference_duration,
+                        frames=[
+                            rtc.AudioFrame(
+                                data=input_frame.data[:copied].tobytes(),
+                                sample_rate=self._input_rate,
+                                num_channels=1,
+                                samples_per_channel=copied,
+                            )
+                        ],
+                        speaking=speaking,
+                        raw_accumulated_silence=silence_run,
+                        raw_accumulated_speech=speech_run,
+                    )
+                )
+
+                if p >= self._opts.activation_threshold:
+                    speech_run += window_duration
+                    silence_run = 0.0
+                    if not speaking and speech_run >= self._opts.min_speech_duration:
+                        speaking = True
+                        silence_duration = 0.0
+                        speech_duration = speech_run
+                        self._event_ch.send_nowait(
+                            agents.vad.VADEvent(
+                                type=agents.vad.VADEventType.START_OF_SPEECH,
+                                samples_index=sample_index,
+                                timestamp=timestamp,
+                                silence_duration=silence_duration,
+                                speech_duration=speech_duration,
+                                frames=[self._speech_frame()],
+                                speaking=True,
+                            )
+                        )
+                else:
+                    silence_run += window_duration
+                    speech_run = 0.0
+                    if not speaking:
+                        self._keep_padding()
+                    elif silence_run >= self._opts.min_silence_duration:
+                        speaking = False
+                        speech_duration = 0.0
+                        silence_duration = silence_run
+                        self._event_ch.send_nowait(
+                            agents.vad.VADEvent(
+                                type=agents.vad.VADEventType.END_OF_SPEECH,
+                                samples_index=sample_index,
+                                timestamp=timestamp,
+                                silence_duration=silence_duration,
+                                speech_duration=speech_duration,
+                                frames=[self._speech_frame()],
+                                speaking=False,
+                            )
+                        )
+                        self._keep_padding()
+
+                input_frames = _rest(input_frame, copied)
+                inference_frames = _rest(inference_frame, window)
+
+
+class BatchedVAD(agents.vad.VAD):
+    """Silero VAD whose streams share a :class:`VADBatcher`.
+
+    Each stream runs the same speech detection as the plugin's and only
+    hands its model calls to the batcher, so the sessions of a process pay
+    one inference per tick instead of one per window each.
+    """
+
+    def __init__(self, *, batcher: VADBatcher, opts: VADOptions):
+        super().__init__(
+            capabilities=agents.vad.VADCapabilities(
+                update_interval=batcher.window_size_samples / batcher.sample_rate
+            )
+        )
+        self.batcher = batcher
+        self.opts = opts
+        self._streams: weakref.WeakSet[BatchedVADStream] = weakref.WeakSet()
+
+    @property
+    def model(self) -> str:
+        return "silero"
+
+    @property
+    def provider(self) -> str:
+        return "ONNX"
+
+    def stream(self) -> BatchedVADStream:
+        stream = BatchedVADStream(self, self.opts, BatchedModel(self.batcher))
+        self._streams.add(stream)
+        return stream
+
+    def update_options(self, **options: float) -> None:
+        """Change :class:`VADOptions` fields of this VAD and its open streams"""
+        self.opts = dataclasses.replace(self.opts, **options)
+        for stream in self._streams:
+            stream.update_options(**options)
+
+
+_shared: dict[tuple, VADBatcher] = {}
+_shared_lock = threading.Lock()
+
+
+def load_batched_vad(
+    *,
+    tick: float = 0.005,
+    max_batch: int = 64,
+    sample_rate: int = 16000,
+    force_cpu: bool = True,
+    **options: float,
+) -> BatchedVAD:
+    """A :class:`BatchedVAD` over the process's batcher for these settings.
+
+    ``options`` are :class:`VADOptions` fields. Every call with the same
+    batching settings shares one batcher and ONNX session, so the jobs of a
+    thread executor, each loading its own VAD in prewarm, are batched
+    together.
+    """
+    key = (tick, max_batch, sample_rate, force_cpu)
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = VADBatcher(
+                onnx_model.new_inference_session(force_cpu),
+                sample_rate=sample_rate,
+                tick=tick,
+                max_batch=max_batch,
+            )
+        batcher = _shared[key]
+    return BatchedVAD(
+        batcher=batcher, opts=VADOptions(sample_rate=sample_rate, **options)
+    )
@@ -0,0 +1,221 @@
+"""Background persistence of check-ins, off the asyncio event loop"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .store import CheckinStore
+
+logger = logging.getLogger("agent")
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+_STOP = object()
+
+
+class WriterFullError(queue.Full):
+    """The writer's queue stayed full for ``put_timeout`` seconds"""
+
+
+class _Drained:
+    """Queue marker the writer thread resolves once everything before it is written"""
+
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.future: asyncio.Future = self._loop.create_future()
+
+    def set(self) -> None:
+        def resolve() -> None:
+            if not self.future.done():  # the drain may have timed out
+                self.future.set_result(None)
+
+        # The loop that asked may have closed meanwhile
+        with contextlib.suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(resolve)
+
+
+@dataclass
+class WriterStats:
+    enqueued: int = 0
+    written: int = 0
+    batches: int = 0
+    fsyncs: int = 0
+    failed: int = 0
+    backpressure_waits: int = 0
+
+
+class PersistenceWriter:
+    """Per-process writer thread that group-commits check-ins to a store.
+
+    ``submit`` hands a record to a bounded queue and returns as soon as it is
+    accepted. The writer thread takes everything that is queued (up to
+    ``batch_size``) and writes it with one flush. ``fsync_policy`` controls
+    durability: ``"always"`` syncs every batch, ``"interval"`` at most once per
+    ``fsync_interval`` seconds, and ``"never"`` leaves it to the OS.
+
+    When the queue is full ``submit`` waits (without blocking the event loop)
+    for up to ``put_timeout`` seconds before raising :class:`WriterFullError`
+    (a ``queue.Full``); the check-in is then not written.
+    """
+
+    def __init__(
+        self,
+        store: CheckinStore,
+        *,
+        max_queue: int = 256,
+        batch_size: int = 64,
+        fsync_policy: str = "interval",
+        fsync_interval: float = 1.0,
+        put_timeout: float = 5.0,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(
+                f"Unknown fsync policy '{fsync_policy}'. Allowed: {', '.join(FSYNC_POLICIES)}"
+            )
+        self.store = store
+        self.batch_size = batch_size
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.put_timeout = put_timeout
+        self.stats = WriterStats()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="wellness-writer", daemon=True
+            )
+            self._thread.start()
+
+    async def submit(self, record: dict[str, Any]) -> None:
+        """Enqueue a check-in for writing, waiting if the queue is full.
+
+        Raises :class:`WriterFullError` when no room frees up within
+        ``put_timeout`` seconds.
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats.backpressure_waits += 1
+            try:
+                await asyncio.to_thread(self._queue.put, record, True, self.put_timeout)
+            except queue.Full:
+                raise WriterFullError(
+                    f"Check-in queue still full ({self._queue.maxsize} waiting) "
+                    f"after {self.put_timeout}s; the store is not keeping up"
+                ) from None
+        self.stats.enqueued += 1
+
+    async def drain(self, timeout: float | None = None) -> None:
+        """Wait until every submitted check-in has been written and synced.
+
+        Raises ``asyncio.TimeoutError`` after ``timeout`` seconds; the writer
+        keeps going, and :meth:`pending` tells how much it has left.
+        """
+        if self._thread is None:
+            return
+        marker = _Drained()
+
+        async def wait() -> None:
+            while True:
+                try:
+                    self._queue.put_nowait(marker)
+                    break
+                except queue.Full:
+                    await asyncio.sleep(0.05)
+            await marker.future
+
+        await asyncio.wait_for(wait(), timeout)
+
+    def pending(self) -> int:
+        """Check-ins submitted but not written (or failed) yet"""
+        return self.stats.enqueued - self.stats.written - self.stats.failed
+
+    def close(self, timeout: float | None = None) -> None:
+        """Write what is queued, then stop the thread (blocking)"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        if self.fsync_policy != "never":
+            self.store.sync()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                # With unsynced writes pending, wake up to sync them on time
+                timeout = self.fsync_interval if self._dirty else None
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                self._sync()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            drained = []
+            for item in batch:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Drained):
+                    drained.append(item)
+                else:
+                    records.append(item)
+            try:
+                self._commit(records)
+            except Exception:
+                self.stats.failed += len(records)
+                logger.exception(f"Failed to write {len(records)} check-ins")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if drained:
+                if self.fsync_policy != "never":
+                    self._sync()
+                for marker in drained:
+                    marker.set()
+
+    def _commit(self, records: list[dict[str, Any]]) -> None:
+        if not records:
+            return
+        now = time.monotonic()
+        fsync = self.fsync_policy == "always" or (
+            self.fsync_policy == "interval"
+            and now - self._last_fsync >= self.fsync_interval
+        )
+        self.store.append_many(records, fsync=fsync)
+        if fsync:
+            self._dirty = False
+            self._last_fsync = now
+            self.stats.fsyncs += 1
+        else:
+            self._dirty = self.fsync_policy == "interval"
+        self.stats.written += len(records)
+        self.stats.batches += 1
+
+    def _sync(self) -> None:
+        try:
+            self.store.sync()
+        except OSError:
+            logger.exception("Failed to sync wellness store")
+            return
+        self._dirty = False
+        self._last_fsync = time.monotonic()
+        self.stats.fsyncs += 1
@@ -0,0 +1,74 @@
+import asyncio
+import multiprocessing
+
+import pytest
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, tts, utils
+
+SAMPLE_RATE = 16000
+
+
+class SilenceTTS(tts.TTS):
+    """Produces 20 ms of silence per character and counts synthesis calls.
+
+    ``delay`` is the time to first byte; ``ms_per_char=0`` gives empty clips.
+    """
+
+    def __init__(self, *, delay=0.0, ms_per_char=20):
+        super().__init__(
+            capabilities=tts.TTSCapabilities(streaming=False),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+        )
+        self.delay = delay
+        self.ms_per_char = ms_per_char
+        self.calls = 0
+
+    def synthesize(self, text, *, conn_options=None):
+        self.calls += 1
+        return _SilenceStream(
+            tts=self,
+            input_text=text,
+            conn_options=conn_options or DEFAULT_API_CONNECT_OPTIONS,
+        )
+
+
+class _SilenceStream(tts.ChunkedStream):
+    async def _run(self, output_emitter):
+        engine = self._tts
+        if engine.delay:
+            await asyncio.sleep(engine.delay)
+        output_emitter.initialize(
+            request_id=utils.shortuuid(),
+            sample_rate=SAMPLE_RATE,
+            num_channels=1,
+            mime_type="audio/pcm",
+        )
+        samples = SAMPLE_RATE * engine.ms_per_char // 1000 * len(self.input_text)
+        output_emitter.push(b"\x00\x00" * samples)
+        output_emitter.flush()
+
+
+@pytest.fixture
+def silence_tts():
+    """Builds fake TTS engines that synthesize silence"""
+    return SilenceTTS
+
+
+@pytest.fixture
+def run_processes():
+    """Runs ``target`` in one spawned process per argument tuple, waiting for all.
+
+    Each process starts from a fresh interpreter, like a job process, so
+    ``target`` must be a module-level function of the test module.
+    """
+
+    def run(target, args_list, timeout=60):
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=target, args=args) for args in args_list]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(timeout=timeout)
+        assert [p.exitcode for p in procs] == [0] * len(procs)
+
+    return run
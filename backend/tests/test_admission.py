@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from wellness.admission import (
+    AdmissionController,
+    AdmissionLimits,
+    LoadReporter,
+    LoadSample,
+    pressures,
+)
+from wellness.latency import LoopLagMonitor
+
+GB = 1024**3
+
+
+def _report(pid, cpu=0.1, memory=0, lag_p95=0.0):
+    return {"pid": pid, "cpu": cpu, "memory": memory, "lag_p95": lag_p95, "time": 0}
+
+
+def test_pressures_project_one_more_session():
+    limits = AdmissionLimits(cpu=0.8, memory=0.5, loop_lag=0.1, sessions=4)
+    sample = LoadSample(
+        host_cpu=0.4,
+        memory_used=0.25,
+        memory_total=4 * GB,
+        reports=[
+            _report(1, cpu=0.2, memory=GB, lag_p95=0.02),
+            # Two sessions of a thread executor, measuring the same process
+            _report(2, cpu=0.2, memory=GB // 2, lag_p95=0.05),
+            _report(2, cpu=0.2, memory=GB // 2, lag_p95=0.03),
+        ],
+    )
+    result = pressures(limits, sample)
+
+    assert result["cpu"] == pytest.approx((0.4 + 0.4 / 3) / 0.8)
+    assert result["memory"] == pytest.approx((0.25 + 2 / 3 / 4) / 0.5)
+    assert result["loop_lag"] == pytest.approx(0.5 * 4 / 3)
+    assert result["sessions"] == pytest.approx(1.0)
+
+
+def test_pressures_use_priors_while_idle():
+    limits = AdmissionLimits(cpu=0.5, session_cpu=0.1)
+    sample = LoadSample(host_cpu=0.2, memory_used=0.1, memory_total=GB, reports=[])
+    result = pressures(limits, sample)
+
+    assert result["cpu"] == pytest.approx(0.6)
+    assert result["loop_lag"] == 0.0
+    assert "sessions" not in result
+
+
+async def test_controller_reads_reports_and_logs_transitions(
+    tmp_path, caplog, monkeypatch
+):
+    host_cpu = 0.1
+    controller = AdmissionController(
+        AdmissionLimits(cpu=0.5, memory=1.0, loop_lag=0.05),
+        str(tmp_path),
+        threshold=0.7,
+        cpu=lambda: host_cpu,
+    )
+    lag = LoopLagMonitor()
+    reporter = LoadReporter(str(tmp_path), "job-1", lag)
+    monkeypatch.setattr(reporter._process, "cpu_percent", lambda interval: 10.0)
+    reporter.write()
+    assert controller.load() < 0.7
+    assert controller.available
+
+    caplog.set_level(logging.INFO, logger="agent")
+    lag.record(0.2)
+    reporter.write()
+    assert controller.load() == 1.0
+    assert controller.pressures["loop_lag"] == pytest.approx(8.0)
+    assert not controller.available
+    assert "Worker full: loop_lag at limit" in caplog.text
+
+    await reporter.aclose()
+    assert controller.load() < 0.7
+    assert controller.available
+    assert "Accepting sessions again" in caplog.text
+
+
+async def test_stale_reports_are_ignored(tmp_path):
+    controller = AdmissionController(
+        AdmissionLimits(loop_lag=0.05), str(tmp_path), stale_after=10.0, cpu=lambda: 0.0
+    )
+    lag = LoopLagMonitor()
+    lag.record(1.0)
+    reporter = LoadReporter(str(tmp_path), "job-1", lag)
+    reporter.write()
+    assert controller.load() == 1.0
+
+    controller.stale_after = -1.0
+    assert controller.load() < 0.7
+
+
+async def test_loop_lag_monitor_sees_blocking_calls():
+    lag = LoopLagMonitor(interval=0.01)
+    lag.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.1)  # blocks the event loop
+    await asyncio.sleep(0.05)
+    await lag.aclose()
+
+    assert lag.recent(1.0) >= 0.08
+    assert lag.histogram.count >= 3
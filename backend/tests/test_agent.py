@@ -110,30 +110,33 @@
 #         result.expect.no_more_events()
 
 
-
-import os
 import json
+import os
+
 import pytest
-from livekit.agents import AgentSession, inference, llm
+from livekit.agents import llm
+
 from src.agent import WellnessCompanion
+from wellness import CheckinJournal
 
-# Temporary JSON file for tests
-TEST_FILE = os.path.join(os.getcwd(), "backend", "test_wellness_log.json")
+# Temporary journal file for tests
+TEST_FILE = os.path.join(os.getcwd(), "backend", "test_wellness_log.jsonl")
 
 
 @pytest.fixture(scope="module")
 def cleanup_file():
-    if os.path.exists(TEST_FILE):
-        os.remove(TEST_FILE)
+    for path in (TEST_FILE, TEST_FILE + ".idx", TEST_FILE + ".trends.json"):
+        if os.path.exists(path):
+            os.remove(path)
     yield
-    if os.path.exists(TEST_FILE):
-        os.remove(TEST_FILE)
+    for path in (TEST_FILE, TEST_FILE + ".idx", TEST_FILE + ".trends.json"):
+        if os.path.exists(path):
+            os.remove(path)
 
 
 @pytest.mark.asyncio
 async def test_checkin_update_and_save(cleanup_file):
-    agent = WellnessCompanion()
-    agent.data_file = TEST_FILE  # redirect to test file
+    agent = WellnessCompanion(store=CheckinJournal(TEST_FILE))
 
     result_mood = await agent.update_checkin(None, "mood", "5")
     assert "Missing" in result_mood
@@ -143,10 +146,11 @@ async def test_checkin_update_and_save(cleanup_file):
 
     result_goals = await agent.update_checkin(None, "goals", "Exercise, Read")
     assert "Check-in complete" in result_goals
+    assert await agent.save()
 
     assert os.path.exists(TEST_FILE)
-    with open(TEST_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with open(TEST_FILE, encoding="utf-8") as f:
+        data = [json.loads(line) for line in f]
         assert len(data) == 1
         assert data[0]["mood"] == "5"
         assert data[0]["energy"] == "4"
@@ -155,11 +159,7 @@ async def test_checkin_update_and_save(cleanup_file):
 
 @pytest.mark.asyncio
 async def test_get_last_checkin(cleanup_file):
-    agent = WellnessCompanion()
-    agent.data_file = TEST_FILE
-    if os.path.exists(TEST_FILE):
-        with open(TEST_FILE, "r", encoding="utf-8") as f:
-            agent.history = json.load(f)
+    agent = WellnessCompanion(store=CheckinJournal(TEST_FILE))
 
     last = await agent.get_last_checkin(None)
     assert last is not None
@@ -168,8 +168,8 @@ async def test_get_last_checkin(cleanup_file):
 
 
 @pytest.mark.asyncio
-async def test_format_for_tts():
-    agent = WellnessCompanion()
+async def test_format_for_tts(tmp_path):
+    agent = WellnessCompanion(store=CheckinJournal(str(tmp_path / "log.jsonl")))
     agent.state = {"mood": "5", "energy": "4", "stress": "3"}
     tts_text = agent.format_for_tts()
     # Check that numbers are not directly present
@@ -182,10 +182,132 @@ async def test_format_for_tts():
 
 
 @pytest.mark.asyncio
-async def test_get_welcome_tts():
-    agent = WellnessCompanion()
+async def test_get_welcome_tts(tmp_path):
+    agent = WellnessCompanion(store=CheckinJournal(str(tmp_path / "log.jsonl")))
     tts_text = agent.get_welcome_tts()
     assert "Hi!" in tts_text
     assert "mood" in tts_text
     assert "energy" in tts_text
     assert "stress" in tts_text
+
+
+@pytest.mark.asyncio
+async def test_last_checkin_is_per_user(tmp_path):
+    store = CheckinJournal(str(tmp_path / "log.jsonl"))
+    store.append({"user_id": "alex", "mood": "4", "energy": "3", "goals": "Walk"})
+    store.append({"user_id": "sam", "mood": "2", "energy": "2", "goals": "Rest"})
+
+    agent = WellnessCompanion(store=store, user_id="alex")
+    last = await agent.get_last_checkin(None)
+    assert last["goals"] == "Walk"
+
+    await agent.update_checkin(None, "mood", "5")
+    await agent.update_checkin(None, "energy", "4")
+    await agent.update_checkin(None, "goals", "Read")
+    await agent.save()
+    assert store.last(1)[0]["user_id"] == "alex"
+
+
+@pytest.mark.asyncio
+async def test_instructions_include_history_summary(tmp_path):
+    store = CheckinJournal(str(tmp_path / "log.jsonl"))
+    for day in range(30):
+        store.append(
+            {
+                "user_id": "alex",
+                "mood": "4",
+                "energy": "3",
+                "goals": "Walk, Read",
+                "timestamp": f"2025-11-{day + 1:02d}T09:00:00",
+            }
+        )
+
+    agent = WellnessCompanion(store=store, user_id="alex")
+    assert "30 previous check-ins" in agent.instructions
+    assert "walk (30x)" in agent.instructions
+
+    await agent.update_checkin(None, "mood", "2")
+    await agent.update_checkin(None, "energy", "2")
+    await agent.update_checkin(None, "goals", "Rest")
+    await agent.save()
+    assert agent.trend.count == 31
+    assert agent.trend.latest["mood"] == 2
+
+
+@pytest.mark.asyncio
+async def test_update_checkin_fields_is_atomic(tmp_path):
+    store = CheckinJournal(str(tmp_path / "log.jsonl"))
+    agent = WellnessCompanion(store=store)
+
+    result = await agent.update_checkin_fields(None, mood="good", energy="purple")
+    assert "Could not read energy" in result
+    assert agent.state.to_dict() == {}
+
+    result = await agent.update_checkin_fields(
+        None, mood="good", energy="two", goals="Stretch"
+    )
+    assert "Check-in complete" in result
+    await agent.save()
+    assert store.last(1)[0]["mood"] == "4"
+    assert store.last(1)[0]["energy"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_ratings_are_recorded_from_the_transcript(tmp_path):
+    agent = WellnessCompanion(store=CheckinJournal(str(tmp_path / "log.jsonl")))
+    turn_ctx = llm.ChatContext()
+    message = llm.ChatMessage(
+        role="user", content=["Mood's good, energy's low, and I'm a bit stressed."]
+    )
+
+    await agent.on_user_turn_completed(turn_ctx, message)
+    assert agent.state.to_dict() == {"mood": "4", "energy": "2", "stress": "2"}
+    assert "mood=4, energy=2, stress=2" in turn_ctx.items[-1].text_content
+
+    # Nothing new to record, so the context is left alone
+    await agent.on_user_turn_completed(turn_ctx, message)
+    assert len(turn_ctx.items) == 1
+
+    agent = WellnessCompanion(
+        store=CheckinJournal(str(tmp_path / "other.jsonl")), fast_path=False
+    )
+    await agent.on_user_turn_completed(llm.ChatContext(), message)
+    assert agent.state.to_dict() == {}
+
+
+@pytest.mark.asyncio
+async def test_bare_answer_rates_the_scale_just_asked(tmp_path):
+    agent = WellnessCompanion(store=CheckinJournal(str(tmp_path / "log.jsonl")))
+    turn_ctx = llm.ChatContext()
+    turn_ctx.add_message(role="assistant", content="And how is your energy today?")
+
+    await agent.on_user_turn_completed(
+        turn_ctx, llm.ChatMessage(role="user", content=["Pretty low, honestly."])
+    )
+    assert agent.state.to_dict() == {"energy": "2"}
+
+    await agent.on_user_turn_completed(
+        turn_ctx, llm.ChatMessage(role="user", content=["I'm going to run 5 km"])
+    )
+    assert agent.state.to_dict() == {"energy": "2"}
+
+
+@pytest.mark.asyncio
+async def test_checkin_is_saved_once(tmp_path):
+    store = CheckinJournal(str(tmp_path / "log.jsonl"))
+    agent = WellnessCompanion(store=store)
+    assert not await agent.save()  # incomplete check-ins are not saved
+
+    result = await agent.update_checkin_fields(None, mood="4", energy="3", goals="Walk")
+    assert "Check-in complete" in result
+    assert len(store) == 0
+
+    # Answers after the required fields are part of the saved check-in
+    await agent.update_checkin(None, "stress", "2")
+    await agent.update_checkin(None, "summary", "Calm day, short walk")
+    assert await agent.save()
+    assert await agent.save()
+    assert len(store) == 1
+    assert store.last(1)[0]["stress"] == "2"
+    assert store.last(1)[0]["summary"] == "Calm day, short walk"
+    assert agent.trend.count == 1
@@ -0,0 +1,117 @@
+import csv
+import json
+
+import pytest
+
+from wellness import CheckinColumns, SQLiteStore
+from wellness.analytics import History, write_report
+
+
+def _checkin(user_id, day, mood, energy="3", stress="3"):
+    return {
+        "user_id": user_id,
+        "mood": mood,
+        "energy": energy,
+        "stress": stress,
+        "timestamp": f"2025-11-{day:02d}T12:00:00+00:00",
+    }
+
+
+# Weeks of Monday 3 and 10 November; sam starts a week after alex
+CHECKINS = [
+    _checkin("alex", 4, "4"),
+    _checkin("alex", 5, "4"),
+    _checkin("alex", 6, "5"),
+    _checkin("alex", 11, "4", stress="2"),
+    _checkin("alex", 12, "1", stress="5"),
+    _checkin("sam", 11, "2"),
+    _checkin("sam", 13, ""),
+]
+
+
+def test_weekly_trends_per_user_and_week():
+    rows = History(CheckinColumns.from_dicts(CHECKINS)).weekly_trends()
+
+    assert [(r["user_id"], r["week"], r["checkins"]) for r in rows] == [
+        ("alex", "2025-11-03", 3),
+        ("alex", "2025-11-10", 2),
+        ("sam", "2025-11-10", 2),
+    ]
+    assert rows[0]["mood"] == pytest.approx(4.33)
+    assert rows[1]["stress"] == 3.5
+    # Unrated check-ins count, but not towards the average
+    assert rows[2]["mood"] == 2.0
+
+
+def test_cohort_averages_by_first_week():
+    rows = History(CheckinColumns.from_dicts(CHECKINS)).cohort_averages()
+
+    assert [
+        (r["cohort"], r["weeks_since"], r["users"], r["checkins"]) for r in rows
+    ] == [
+        ("2025-11-03", 0, 1, 3),
+        ("2025-11-03", 1, 1, 2),
+        ("2025-11-10", 0, 1, 2),
+    ]
+    assert rows[1]["mood"] == 2.5
+
+
+def test_anomalies_flag_sharp_changes_against_recent_history():
+    history = History(CheckinColumns.from_dicts(CHECKINS))
+
+    rows = history.anomalies(window=3, threshold=2)
+    assert [(r["user_id"], r["scale"], r["value"], r["baseline"]) for r in rows] == [
+        ("alex", "mood", 1, 4.33),
+        ("alex", "stress", 5, 2.67),
+    ]
+    assert rows[0]["timestamp"] == "2025-11-12T12:00:00+00:00"
+    assert rows[0]["change"] == -3.33
+    # Not enough history for sam, and none in a two-rating window
+    assert history.anomalies(window=2, threshold=2, min_history=3) == []
+
+
+def test_empty_history():
+    history = History(CheckinColumns())
+    assert history.weekly_trends() == []
+    assert history.cohort_averages() == []
+    assert history.anomalies() == []
+
+
+def test_sqlite_columns_match_stored_checkins(tmp_path):
+    store = SQLiteStore(str(tmp_path / "wellness.db"))
+    for checkin in CHECKINS:
+        store.append(dict(checkin, goals="walk"))
+
+    columns = store.columns()
+    by_time = sorted(CHECKINS, key=lambda c: c["timestamp"])
+    expected = CheckinColumns.from_dicts(dict(c, goals="walk") for c in by_time)
+    assert [r.to_dict() for r in columns] == [r.to_dict() for r in expected]
+    assert [r.user_id for r in store.columns("sam")] == ["sam", "sam"]
+    store.close()
+
+
+def test_write_report_csv_and_json(tmp_path):
+    rows = History(CheckinColumns.from_dicts(CHECKINS)).weekly_trends()
+
+    with open(tmp_path / "weekly.csv", "w", newline="") as f:
+        write_report(rows, f, "csv")
+    with open(tmp_path / "weekly.csv", newline="") as f:
+        read = list(csv.DictReader(f))
+    assert read[0]["user_id"] == "alex" and read[0]["checkins"] == "3"
+
+    with open(tmp_path / "weekly.json", "w") as f:
+        write_report(rows, f, "json")
+    with open(tmp_path / "weekly.json") as f:
+        assert json.load(f) == rows
+
+
+def test_analytics_without_a_store_creates_nothing(tmp_path, monkeypatch, capsys):
+    from wellness.commands import run_analytics
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("WELLNESS_STORE", "sqlite")
+    (tmp_path / "backend").mkdir()
+
+    assert run_analytics([]) == 1
+    assert "does not exist" in capsys.readouterr().out
+    assert list((tmp_path / "backend").iterdir()) == []
@@ -0,0 +1,47 @@
+import aiohttp
+import pytest
+from aiohttp import web
+
+from wellness.connections import ConnectionStats, speech_session
+
+
+@pytest.fixture
+async def server():
+    async def hello(request):
+        return web.Response(text="hi")
+
+    app = web.Application()
+    app.router.add_get("/hello", hello)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    yield f"http://127.0.0.1:{port}"
+    await runner.cleanup()
+
+
+async def test_session_keeps_connections_alive(server):
+    stats = ConnectionStats()
+    session = speech_session(stats)
+    for _ in range(3):
+        async with session.get(server + "/hello") as resp:
+            assert await resp.text() == "hi"
+    await session.close()
+
+    assert (stats.opened, stats.reused) == (1, 2)
+    assert stats.reuse_rate == pytest.approx(2 / 3)
+    assert stats.connect_time > 0
+
+
+async def test_closed_connections_are_counted_again(server):
+    stats = ConnectionStats()
+    connector = aiohttp.TCPConnector(force_close=True)
+    async with aiohttp.ClientSession(
+        connector=connector, trace_configs=[stats.trace_config()]
+    ) as session:
+        for _ in range(2):
+            async with session.get(server + "/hello") as resp:
+                await resp.read()
+
+    assert (stats.opened, stats.reused) == (2, 0)
@@ -0,0 +1,73 @@
+import pytest
+
+from wellness.extract import asked_scale, extract_ratings, parse_rating
+
+
+@pytest.mark.parametrize(
+    "transcript, expected",
+    [
+        (
+            "Mood's good, energy's low, a bit stressed",
+            {"mood": 4, "energy": 2, "stress": 2},
+        ),
+        ("My mood is a 3 and energy is five.", {"mood": 3, "energy": 5}),
+        ("I'm feeling great but pretty tired", {"mood": 5, "energy": 2}),
+        ("Not stressed at all today", {"stress": 1}),
+        ("My mood isn't great", {}),
+        ("I'd say a four.", {}),
+        ("Go for a walk and read a chapter.", {}),
+    ],
+)
+def test_extract_ratings(transcript, expected):
+    assert extract_ratings(transcript) == expected
+
+
+@pytest.mark.parametrize(
+    "transcript",
+    [
+        "I'm going to run 5 km",
+        "Going down to the gym later",
+        "I'm fine with that",
+        "I am meeting two friends",
+        "It's a good idea",
+    ],
+)
+def test_no_ratings_without_a_scale_or_a_bare_answer(transcript):
+    assert extract_ratings(transcript) == {}
+    assert extract_ratings(transcript, asked="mood") == {}
+
+
+@pytest.mark.parametrize(
+    "transcript, asked, expected",
+    [
+        ("Pretty good.", "mood", {"mood": 4}),
+        ("I'd say a four.", "energy", {"energy": 4}),
+        ("Probably 2 out of 5", "stress", {"stress": 2}),
+        ("Relaxed, and my mood is great", "stress", {"stress": 1, "mood": 5}),
+        ("I'm fine", None, {"mood": 3}),
+        ("I'm 5", None, {}),
+    ],
+)
+def test_bare_answers_rate_the_scale_asked_about(transcript, asked, expected):
+    assert extract_ratings(transcript, asked=asked) == expected
+
+
+def test_asked_scale():
+    assert asked_scale("And how is your energy today?") == "energy"
+    assert asked_scale("How are your mood, energy and stress?") is None
+    assert asked_scale("What are your goals?") is None
+
+
+def test_parse_rating():
+    assert parse_rating("mood", "4") == 4
+    assert parse_rating("mood", "four out of five") == 4
+    assert parse_rating("energy", "very low") == 1
+    assert parse_rating("stress", "overwhelmed") == 5
+    assert parse_rating("mood", "purple") is None
+    assert parse_rating("mood", "7") is None
+    # Number words count as whole words only, after level phrases
+    assert parse_rating("mood", "honestly good") == 4
+    assert parse_rating("mood", "gone down") == 2
+    assert parse_rating("mood", "great network of friends") == 5
+    assert parse_rating("mood", "one of my good days") == 4
+    assert parse_rating("mood", "someone") is None
@@ -0,0 +1,183 @@
+import datetime
+import json
+
+from wellness import CheckinJournal
+
+
+def _append_checkins(path, worker, count):
+    journal = CheckinJournal(path)
+    for i in range(count):
+        journal.append({"user_id": f"user-{worker}", "mood": str(i)})
+    journal.close()
+
+
+def test_append_and_read(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    journal.append({"mood": "4", "goals": "walk"})
+    journal.append({"mood": "2", "goals": "rest"})
+
+    assert [r["goals"] for r in journal] == ["walk", "rest"]
+
+
+def test_recovers_torn_tail(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(b'{"mood":"4"}\n{"mood":"3"}\n{"mood":"2", "goa')
+
+    journal = CheckinJournal(str(path))
+
+    assert [r["mood"] for r in journal] == ["4", "3"]
+    journal.append({"mood": "5"})
+    assert [r["mood"] for r in journal] == ["4", "3", "5"]
+
+
+def test_imports_legacy_json_log(tmp_path):
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(json.dumps([{"mood": "good"}, {"mood": "happy"}]))
+
+    journal = CheckinJournal(
+        str(tmp_path / "wellness_log.jsonl"), legacy_path=str(legacy)
+    )
+
+    assert [r["mood"] for r in journal] == ["good", "happy"]
+
+
+def test_compact_drops_duplicates_and_old_records(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    for mood in ["1", "2", "2", "3", "4"]:
+        journal.append({"mood": mood})
+
+    assert journal.compact(max_records=3) == 3
+    assert [r["mood"] for r in journal] == ["2", "3", "4"]
+
+
+def test_indexed_lookups(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    journal = CheckinJournal(path)
+    for day in range(1, 6):
+        journal.append({"mood": str(day), "timestamp": f"2025-11-0{day}T09:00:00"})
+
+    reopened = CheckinJournal(path)
+    assert len(reopened) == 5
+    assert reopened[-1]["mood"] == "5"
+    assert [r["mood"] for r in reopened.last(2)] == ["4", "5"]
+    window = reopened.between(
+        datetime.datetime(2025, 11, 2), datetime.datetime(2025, 11, 4)
+    )
+    assert [r["mood"] for r in window] == ["2", "3"]
+
+
+def test_between_reads_as_it_goes(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    for day in range(1, 6):
+        journal.append({"mood": str(day), "timestamp": f"2025-11-0{day}T09:00:00"})
+
+    window = journal.between(
+        datetime.datetime(2025, 11, 1), datetime.datetime(2025, 11, 5)
+    )
+    assert next(window)["mood"] == "1"
+    # The journal stays usable while a range is read, even when it is rewritten
+    journal.append({"mood": "0", "timestamp": "2025-11-02T12:00:00"})
+    assert journal.compact(max_records=2) == 2
+    assert [r["mood"] for r in window] == ["2", "3", "4"]
+
+
+def test_corrupt_lines_in_the_middle_are_skipped(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_bytes(
+        b'{"mood":"1","timestamp":"2025-11-01T09:00:00"}\n'
+        b'{"mood":"2","timest\n'
+        b"\x00\x00\x00\n"
+        b'{"mood":"3","timestamp":"2025-11-03T09:00:00"}\n'
+    )
+
+    journal = CheckinJournal(str(path))
+    assert len(journal) == 2
+    assert [journal[0]["mood"], journal[1]["mood"]] == ["1", "3"]
+    assert [r["mood"] for r in journal.last(2)] == ["1", "3"]
+    window = journal.between(
+        datetime.datetime(2025, 11, 1), datetime.datetime(2025, 11, 4)
+    )
+    assert [r["mood"] for r in window] == ["1", "3"]
+    assert journal.trend().count == 2
+
+
+def test_index_catches_up_after_crash(tmp_path):
+    path = tmp_path / "log.jsonl"
+    journal = CheckinJournal(str(path))
+    journal.append({"mood": "1"})
+    journal.close()
+    # Simulate a crash after the journal write but before the index write
+    with open(path, "ab") as f:
+        f.write(b'{"mood":"2"}\n')
+
+    reopened = CheckinJournal(str(path))
+    assert len(reopened) == 2
+    assert reopened[-1]["mood"] == "2"
+
+
+def test_last_by_user_reads_only_their_records(tmp_path, monkeypatch):
+    path = str(tmp_path / "log.jsonl")
+    journal = CheckinJournal(path)
+    journal.append({"mood": "1", "user_id": "alex"})
+    journal.append_many([{"mood": "3", "user_id": "sam"} for _ in range(500)])
+    for mood in range(2, 22):
+        journal.append({"mood": str(mood), "user_id": "alex"})
+    journal.trend()  # folds the recent positions into the sidecar
+
+    reopened = CheckinJournal(path)
+    reads = []
+    read_record = reopened._read_record
+    monkeypatch.setattr(
+        reopened,
+        "_read_record",
+        lambda i: reads.append(i) or read_record(i),
+    )
+    assert [r["mood"] for r in reopened.last(2, user_id="alex")] == ["20", "21"]
+    assert len(reads) == 2
+    # Older than the kept positions: walks back from the oldest of them
+    assert [r["mood"] for r in reopened.last(21, user_id="alex")] == [
+        str(m) for m in range(1, 22)
+    ]
+    assert reopened.last(1, user_id="nobody") == []
+
+
+def test_time_range_reads_the_ends_of_the_index(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    assert journal.time_range() == (0.0, 0.0)
+    journal.append({"mood": "1"})
+    for day in range(1, 4):
+        journal.append({"mood": "2", "timestamp": f"2025-11-0{day}T09:00:00"})
+    journal.append({"mood": "3"})
+
+    start, end = journal.time_range()
+    assert datetime.datetime.fromtimestamp(start) == datetime.datetime(2025, 11, 1, 9)
+    assert datetime.datetime.fromtimestamp(end) == datetime.datetime(2025, 11, 3, 9)
+
+
+def test_concurrent_processes_share_a_journal(tmp_path, run_processes):
+    path = str(tmp_path / "log.jsonl")
+    journal = CheckinJournal(path)
+    journal.append({"user_id": "user-0", "mood": "0"})
+
+    run_processes(_append_checkins, [(path, w, 50) for w in range(4)])
+
+    # This handle catches up with the other processes' appends
+    assert len(journal) == 201
+    for worker in range(4):
+        moods = [r["mood"] for r in journal.last(50, user_id=f"user-{worker}")]
+        assert moods == [str(i) for i in range(50)]
+    assert len(CheckinJournal(path)) == 201
+
+
+def test_sees_compaction_by_another_handle(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    first, second = CheckinJournal(path), CheckinJournal(path)
+    for mood in ["1", "1", "2"]:
+        first.append({"mood": mood})
+
+    assert second[-1]["mood"] == "2"
+    assert second.compact() == 2
+    first.append({"mood": "3"})
+
+    assert [r["mood"] for r in second] == ["1", "2", "3"]
+    assert [r["mood"] for r in first.last(3)] == ["1", "2", "3"]
@@ -0,0 +1,82 @@
+import random
+
+from livekit.agents import metrics
+
+from wellness.latency import LatencyAggregator, LogHistogram, load_snapshot
+
+
+def test_quantiles_within_relative_error():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-1.5, 0.8) for _ in range(20000)]
+    hist = LogHistogram(relative_error=0.01)
+    for value in values:
+        hist.record(value)
+
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(hist.quantile(q) - exact) <= 0.01 * exact
+    assert hist.count == len(values)
+
+
+def test_merge_matches_single_histogram():
+    a, b, both = LogHistogram(), LogHistogram(), LogHistogram()
+    for i in range(1, 200):
+        (a if i % 2 else b).record(i / 100)
+        both.record(i / 100)
+    a.merge(b)
+    assert a.buckets == both.buckets
+    assert a.quantile(0.99) == both.quantile(0.99)
+
+
+def test_end_to_end_latency_joined_on_speech_id():
+    agg = LatencyAggregator()
+    agg.collect(
+        metrics.EOUMetrics(
+            timestamp=0,
+            end_of_utterance_delay=0.3,
+            transcription_delay=0.1,
+            on_user_turn_completed_delay=0.0,
+            speech_id="s1",
+        )
+    )
+    agg.collect(
+        metrics.LLMMetrics(
+            label="llm", request_id="r1", timestamp=0, duration=1.0, ttft=0.4,
+            cancelled=False, completion_tokens=1, prompt_tokens=1,
+            prompt_cached_tokens=0, total_tokens=2, tokens_per_second=1.0,
+            speech_id="s1",
+        )
+    )  # fmt: skip
+    assert agg.histograms["e2e_latency"].count == 0
+    agg.collect(
+        metrics.TTSMetrics(
+            label="tts", request_id="r2", timestamp=0, ttfb=0.2, duration=1.0,
+            audio_duration=1.0, cancelled=False, characters_count=5,
+            streamed=True, speech_id="s1",
+        )
+    )  # fmt: skip
+
+    e2e = agg.histograms["e2e_latency"]
+    assert e2e.count == 1
+    assert abs(e2e.quantile(0.5) - 0.9) <= 0.01 * 0.9
+    assert "e2e_latency p50=" in agg.summary()
+
+
+def test_snapshots_from_several_processes_are_merged(tmp_path):
+    path = str(tmp_path / "latency.json")
+    first, second = LatencyAggregator(), LatencyAggregator()
+    for _ in range(10):
+        first.record("llm_ttft", 0.5)
+        second.record("llm_ttft", 1.0)
+    first.write_snapshot(path)
+    second.write_snapshot(path)
+
+    # Only samples recorded since the last write are added again
+    first.record("llm_ttft", 0.5)
+    first.write_snapshot(path)
+    first.write_snapshot(path)
+
+    (stages,) = load_snapshot(path).values()
+    assert stages["llm_ttft"].count == 21
+    assert stages["llm_ttft"].max == 1.0
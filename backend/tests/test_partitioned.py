@@ -0,0 +1,62 @@
+import json
+import os
+
+from wellness import PartitionedJournalStore
+
+
+def _append_checkins(directory, legacy, worker, count):
+    store = PartitionedJournalStore(directory, legacy_paths=(legacy,))
+    for i in range(count):
+        store.append({"user_id": "alex", "mood": f"{worker}-{i}"})
+    store.close()
+
+
+def test_history_is_scoped_to_user(tmp_path):
+    store = PartitionedJournalStore(str(tmp_path / "log"))
+    store.append_many(
+        [
+            {"user_id": "alex", "mood": "4", "timestamp": "2025-11-01T09:00:00"},
+            {"user_id": "sam/2", "mood": "2", "timestamp": "2025-11-02T09:00:00"},
+            {"user_id": "alex", "mood": "5", "timestamp": "2025-11-03T09:00:00"},
+        ]
+    )
+
+    assert [r["mood"] for r in store.last(5, user_id="alex")] == ["4", "5"]
+    assert [r["mood"] for r in store.last(5, user_id="sam/2")] == ["2"]
+    assert store.last(1, user_id="nobody") == []
+    assert [r["mood"] for r in store.last(2)] == ["2", "5"]
+    assert sorted(u for u in store.users() if u) == ["alex", "sam/2"]
+
+
+def test_legacy_log_goes_to_anonymous_partition(tmp_path):
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(json.dumps([{"mood": "good"}, {"mood": "happy"}]))
+
+    store = PartitionedJournalStore(str(tmp_path / "log"), legacy_paths=(str(legacy),))
+
+    assert store.users() == [None]
+    assert [r["mood"] for r in store.last(5, user_id=None)] == ["good", "happy"]
+
+
+def test_evicted_partitions_reopen(tmp_path):
+    store = PartitionedJournalStore(str(tmp_path / "log"), max_open=1)
+    store.append({"user_id": "a", "mood": "1"})
+    store.append({"user_id": "b", "mood": "2"})
+    store.append({"user_id": "a", "mood": "3"})
+
+    assert len(store) == 3
+    assert [r["mood"] for r in store.last(5, user_id="a")] == ["1", "3"]
+
+
+def test_concurrent_processes_import_once_and_share_partitions(tmp_path, run_processes):
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(json.dumps([{"user_id": "alex", "mood": "old"}]))
+    directory = str(tmp_path / "log")
+
+    run_processes(_append_checkins, [(directory, str(legacy), w, 25) for w in range(4)])
+
+    store = PartitionedJournalStore(directory)
+    moods = [r["mood"] for r in store.last(200, user_id="alex")]
+    assert moods.count("old") == 1
+    assert sorted(moods[1:]) == sorted(f"{w}-{i}" for w in range(4) for i in range(25))
+    assert sorted(os.listdir(tmp_path)) == ["log", "wellness_log.json"]
@@ -0,0 +1,30 @@
+import time
+
+from src import agent
+from wellness.prewarm import WarmupTimer
+
+
+def test_timer_records_each_component():
+    timer = WarmupTimer()
+    with timer.measure("vad"):
+        time.sleep(0.01)
+    with timer.measure("stt"):
+        pass
+
+    assert set(timer.timings) == {"vad", "stt"}
+    assert timer.timings["vad"] >= 0.01
+    assert timer.total >= timer.timings["vad"]
+    assert "vad=" in timer.summary()
+
+
+def test_jobs_of_one_process_share_the_writer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "backend").mkdir()
+    monkeypatch.setenv("WELLNESS_METRICS_DIR", str(tmp_path / "metrics"))
+    monkeypatch.setattr(agent, "_process_shared", {})
+
+    # A thread executor runs prewarm once per job, in the same process
+    first, second = agent.process_shared(), agent.process_shared()
+    assert first["writer"] is second["writer"]
+    assert first["latency"] is second["latency"]
+    first["writer"].close()
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import time
+
+import pytest
+from livekit.agents import RunContext, function_tool, llm
+from livekit.agents.llm import utils as llm_utils
+
+from src.agent import WellnessCompanion
+from wellness import CheckinJournal
+from wellness.latency import LoopLagMonitor
+from wellness.profiling import ToolProfiler
+
+
+class _Companion(WellnessCompanion):
+    """The agent with extra tools: one holding the loop, one failing, one slow"""
+
+    cancelled: asyncio.Event
+
+    @function_tool
+    async def lookup(self, context: RunContext, key: str):
+        """Look something up.
+
+        Args:
+            key: What to look up
+        """
+        time.sleep(0.06)  # a synchronous read, holding the loop
+        await asyncio.sleep(0.05)
+        return key.upper()
+
+    @function_tool
+    async def broken(self, context: RunContext):
+        raise ValueError("nope")
+
+    @function_tool
+    async def wait(self, context: RunContext):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+def _tools(agent):
+    return {llm.tool_context.get_function_info(t).name: t for t in agent.tools}
+
+
+def _schemas(agent):
+    return {
+        name: llm_utils.build_legacy_openai_schema(tool)
+        for name, tool in _tools(agent).items()
+    }
+
+
+async def test_profiled_agent_tools_keep_their_schema(tmp_path):
+    plain = WellnessCompanion(store=CheckinJournal(str(tmp_path / "a.jsonl")))
+    profiled = WellnessCompanion(
+        store=CheckinJournal(str(tmp_path / "b.jsonl")), profiler=ToolProfiler()
+    )
+
+    assert len(profiled.tools) == len(plain.tools)
+    assert all(llm.is_function_tool(tool) for tool in profiled.tools)
+    assert _schemas(profiled) == _schemas(plain)
+
+
+async def test_agent_tools_are_timed(tmp_path, caplog):
+    profiler = ToolProfiler(slow_threshold=0.04)
+    agent = _Companion(
+        store=CheckinJournal(str(tmp_path / "log.jsonl")), profiler=profiler
+    )
+    tools = _tools(agent)
+
+    with caplog.at_level(logging.WARNING, logger="agent"):
+        assert await tools["lookup"](None, "mood") == "MOOD"
+        with pytest.raises(ValueError):
+            await tools["broken"](None)
+
+    stats = profiler.tools["lookup"]
+    assert stats.calls == 1
+    assert stats.wall.max >= 0.11
+    assert 0.06 <= stats.blocking < 0.1
+    assert 0.06 <= stats.longest_block < 0.1
+    assert profiler.tools["broken"].errors == 1
+    assert "Tool lookup blocked the event loop for" in caplog.text
+    assert "lookup n=1" in profiler.summary()
+
+
+async def test_cancellation_reaches_the_tool(tmp_path):
+    profiler = ToolProfiler()
+    agent = _Companion(
+        store=CheckinJournal(str(tmp_path / "log.jsonl")), profiler=profiler
+    )
+    agent.cancelled = asyncio.Event()
+    task = asyncio.create_task(_tools(agent)["wait"](None))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert agent.cancelled.is_set()
+    assert profiler.tools["wait"].calls == 1
+
+
+async def test_agent_tools_are_profiled(tmp_path):
+    profiler = ToolProfiler()
+    agent = WellnessCompanion(
+        store=CheckinJournal(str(tmp_path / "log.jsonl")), profiler=profiler
+    )
+    tools = _tools(agent)
+
+    assert await tools["update_checkin"](None, "mood", "4")
+    assert await tools["get_last_checkin"](None) is None
+    assert set(profiler.tools) == {"update_checkin", "get_last_checkin"}
+
+
+async def test_watchdog_logs_the_blocking_stack(caplog):
+    lag = LoopLagMonitor(interval=0.01, slow_threshold=0.05)
+    lag.start()
+    await asyncio.sleep(0.02)
+
+    def parse_history():
+        time.sleep(0.2)
+
+    with caplog.at_level(logging.WARNING, logger="agent"):
+        parse_history()
+        await asyncio.sleep(0.02)
+    await lag.aclose()
+
+    assert lag.stalls == 1
+    assert "Event loop blocked for" in caplog.text
+    assert "in parse_history" in caplog.text
+    assert lag.histogram.max >= 0.15
+    assert "stalls=1" in lag.summary()
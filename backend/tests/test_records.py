@@ -0,0 +1,57 @@
+import pytest
+
+from wellness import CheckinColumns, CheckinJournal, CheckinRecord, Rating
+
+STORED = {
+    "user_id": "alex",
+    "mood": "4",
+    "energy": "2",
+    "stress": "3",
+    "goals": "walk, read",
+    "timestamp": "2025-11-01T09:00:00",
+}
+
+
+def test_record_round_trips_the_stored_form():
+    record = CheckinRecord.from_dict(STORED)
+    assert record.mood is Rating.HIGH
+    assert isinstance(record.timestamp, float)
+    assert record.to_dict() == STORED
+    assert not hasattr(record, "__dict__")
+
+    record.set("energy", "five")
+    assert record.energy == 5
+    assert CheckinRecord.from_dict({"mood": "great"}).mood is None
+    assert Rating.parse("someone") is None
+
+
+def test_columns_store_typed_arrays():
+    other = dict(STORED, user_id="sam", mood="1", goals="rest")
+    columns = CheckinColumns.from_dicts([STORED, other, STORED, {"mood": "3"}])
+
+    assert len(columns) == 4
+    assert list(columns.mood) == [4, 1, 4, 3]
+    assert list(columns.energy) == [2, 2, 2, 0]
+    assert columns.strings == ["", "alex", "walk, read", "sam", "rest"]
+    assert columns[0] == CheckinRecord.from_dict(STORED)
+    assert columns[3].to_dict() == {"mood": "3"}
+
+    restored = CheckinColumns.from_bytes(columns.to_bytes())
+    assert [r.to_dict() for r in restored] == [r.to_dict() for r in columns]
+
+
+def test_numpy_view_shares_the_buffers():
+    np = pytest.importorskip("numpy")
+    columns = CheckinColumns.from_dicts([STORED] * 3)
+    arrays = columns.to_numpy()
+    assert arrays["mood"].dtype == np.uint8
+    assert (arrays["user_ids"] == columns.user_index("alex")).all()
+    columns.mood[0] = 1
+    assert arrays["mood"][0] == 1
+
+
+def test_store_columns(tmp_path):
+    store = CheckinJournal(str(tmp_path / "log.jsonl"))
+    store.append_many([STORED, dict(STORED, user_id="sam")])
+    assert len(store.columns()) == 2
+    assert list(store.columns("sam").user_ids) == [1]
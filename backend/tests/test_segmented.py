@@ -0,0 +1,153 @@
+import datetime
+import gzip
+import json
+import os
+
+import pytest
+
+from wellness import SegmentedJournalStore
+
+
+def _checkin(user_id, day, mood):
+    return {
+        "user_id": user_id,
+        "mood": str(mood),
+        "timestamp": f"2025-11-{day:02d}T09:00:00",
+    }
+
+
+def _append_days(directory, worker, count):
+    store = SegmentedJournalStore(directory, max_bytes=400)
+    for i in range(count):
+        store.append(_checkin(f"user-{worker}", 1 + i * 3 // count, i))
+    store.close()
+
+
+def test_rotates_daily_and_compresses_sealed_segments(tmp_path):
+    store = SegmentedJournalStore(str(tmp_path / "log"))
+    store.append_many([_checkin("alex", 1, 4), _checkin("sam", 1, 2)])
+    store.append(_checkin("alex", 2, 5))
+    store.append(_checkin("sam", 4, 3))
+
+    segments = store.segments
+    assert [s["name"] for s in segments] == [
+        "000001_2025-11-01.jsonl.gz",
+        "000002_2025-11-02.jsonl.gz",
+    ]
+    assert [s["count"] for s in segments] == [2, 1]
+    assert segments[0]["start"] == datetime.datetime(2025, 11, 1, 9).timestamp()
+    with gzip.open(tmp_path / "log" / segments[0]["name"]) as f:
+        assert json.loads(f.readline())["user_id"] == "alex"
+    assert sorted(os.listdir(tmp_path / "log")) == [
+        ".lock",
+        "000001_2025-11-01.jsonl.gz",
+        "000002_2025-11-02.jsonl.gz",
+        "000003_2025-11-04.jsonl",
+        "000003_2025-11-04.jsonl.idx",
+        "000003_2025-11-04.jsonl.lock",
+        "manifest.json",
+    ]
+
+    assert len(store) == 4
+    assert [r["mood"] for r in store] == ["4", "2", "5", "3"]
+    assert [r["mood"] for r in store.last(2)] == ["5", "3"]
+    assert [r["mood"] for r in store.last(5, user_id="alex")] == ["4", "5"]
+    assert store.last(1, user_id="nobody") == []
+    window = store.between(
+        datetime.datetime(2025, 11, 2), datetime.datetime(2025, 11, 5), user_id="sam"
+    )
+    assert [r["mood"] for r in window] == ["3"]
+    assert store.trend("alex").count == 2
+
+
+def test_rotates_by_size_without_compression(tmp_path):
+    store = SegmentedJournalStore(
+        str(tmp_path / "log"), daily=False, max_bytes=120, compression=None
+    )
+    for mood in range(1, 6):
+        store.append(_checkin("alex", mood, mood))
+
+    assert [s["count"] for s in store.segments] == [2, 2]
+    assert all(s["name"].endswith(".jsonl") for s in store.segments)
+    assert [r["mood"] for r in store.last(5, user_id="alex")] == list("12345")
+
+
+def test_reopen_and_recent_reads_skip_old_segments(tmp_path, monkeypatch):
+    store = SegmentedJournalStore(str(tmp_path / "log"))
+    for day in range(1, 6):
+        store.append(_checkin("alex" if day < 5 else "sam", day, day))
+    store.trend()  # as each session does on start
+    store.close()
+
+    store = SegmentedJournalStore(str(tmp_path / "log"))
+    assert len(store) == 5
+    opened = []
+    read = store._read
+    monkeypatch.setattr(store, "_read", lambda s: opened.append(s["name"]) or read(s))
+
+    assert [r["mood"] for r in store.last(1)] == ["5"]
+    assert [r["mood"] for r in store.last(1, user_id="alex")] == ["4"]
+    assert opened == ["000004_2025-11-04.jsonl.gz"]
+
+    store.append(_checkin("alex", 6, 1))
+    assert [s["count"] for s in store.segments] == [1, 1, 1, 1, 1]
+
+
+def test_interrupted_seal_is_finished_on_open(tmp_path):
+    store = SegmentedJournalStore(str(tmp_path / "log"))
+    store.append(_checkin("alex", 1, 4))
+    store.append(_checkin("alex", 2, 5))
+    store.close()
+    # A crash after the segment was listed, before its journal was removed
+    with open(tmp_path / "log" / "000001_2025-11-01.jsonl", "w") as f:
+        f.write(json.dumps(_checkin("alex", 1, 4)) + "\n")
+    (tmp_path / "log" / "000002_2025-11-02.jsonl.gz.tmp").write_bytes(b"partial")
+
+    store = SegmentedJournalStore(str(tmp_path / "log"))
+    assert [r["mood"] for r in store] == ["4", "5"]
+    assert sorted(os.listdir(tmp_path / "log")) == [
+        ".lock",
+        "000001_2025-11-01.jsonl.gz",
+        "000002_2025-11-02.jsonl",
+        "000002_2025-11-02.jsonl.idx",
+        "000002_2025-11-02.jsonl.lock",
+        "manifest.json",
+    ]
+
+
+def test_imports_legacy_log_into_segments(tmp_path):
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(
+        json.dumps([_checkin("alex", 2, 3), _checkin("alex", 1, 4), {"mood": "5"}])
+    )
+
+    store = SegmentedJournalStore(str(tmp_path / "log"), legacy_paths=(str(legacy),))
+
+    assert [s["count"] for s in store.segments] == [1]
+    assert [r["mood"] for r in store] == ["4", "3", "5"]
+
+
+def test_rejects_unknown_compression(tmp_path):
+    with pytest.raises(ValueError):
+        SegmentedJournalStore(str(tmp_path / "log"), compression="lz4")
+
+
+def test_concurrent_processes_share_the_segments(tmp_path, run_processes):
+    directory = str(tmp_path / "log")
+    store = SegmentedJournalStore(directory, max_bytes=400)
+    store.append(_checkin("user-0", 1, 99))
+
+    run_processes(_append_days, [(directory, w, 30) for w in range(4)])
+
+    # This handle reloads the manifest and active segment the others changed
+    assert len(store) == 121
+    seen = sorted((r["user_id"], int(r["mood"])) for r in store)
+    expected = [("user-0", 99)] + [
+        (f"user-{w}", i) for w in range(4) for i in range(30)
+    ]
+    assert seen == sorted(expected)
+    names = [s["name"] for s in store.segments]
+    assert len({name[:6] for name in names}) == len(names)
+    for worker in range(4):
+        moods = [r["mood"] for r in store.last(3, user_id=f"user-{worker}")]
+        assert moods == ["27", "28", "29"]
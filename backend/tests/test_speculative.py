@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from wellness.speculative import SpeculativeSpeech
+from wellness.tts_cache import PhraseCache
+
+RECAP = "So your mood seems high. What are your goals for today?"
+
+
+async def _text(*chunks):
+    for chunk in chunks:
+        await asyncio.sleep(0.01)
+        yield chunk
+
+
+def _fallback(said):
+    async def node(text):
+        said.append("".join([chunk async for chunk in text]))
+        yield "fallback frame"
+
+    return node
+
+
+async def _frames(speech, text, said):
+    return [frame async for frame in speech.tts_node(text, _fallback(said))]
+
+
+@pytest.mark.asyncio
+async def test_matching_reply_plays_prepared_audio(silence_tts):
+    speech = SpeculativeSpeech(PhraseCache(voice="v"), silence_tts(delay=0.05))
+    speech.prepare(RECAP)
+    said = []
+    frames = await _frames(
+        speech,
+        _text("So your mood seems ", "high. What are ", "your goals for today?"),
+        said,
+    )
+
+    assert said == []
+    assert sum(frame.duration for frame in frames) == pytest.approx(
+        len(RECAP) * 0.02, abs=0.02
+    )
+    assert (speech.stats.hits, speech.stats.misses) == (1, 0)
+    assert not speech.pending
+
+
+@pytest.mark.asyncio
+async def test_other_reply_discards_prepared_audio(silence_tts):
+    speech = SpeculativeSpeech(PhraseCache(voice="v"), silence_tts(delay=0.05))
+    speech.prepare(RECAP)
+    said = []
+    frames = await _frames(
+        speech, _text("So your mood ", "is great! Tell me more."), said
+    )
+
+    assert frames == ["fallback frame"]
+    assert said == ["So your mood is great! Tell me more."]
+    assert (speech.stats.hits, speech.stats.misses) == (0, 1)
+
+    # Without a prepared utterance every reply goes to the regular TTS
+    await _frames(speech, _text(RECAP), said)
+    assert said[-1] == RECAP
+
+
+@pytest.mark.asyncio
+async def test_prepared_sentences_play_until_the_reply_differs(silence_tts):
+    speech = SpeculativeSpeech(PhraseCache(voice="v"), silence_tts(delay=0.05))
+    speech.prepare(RECAP)
+    said = []
+    frames = await _frames(
+        speech, _text("So your mood seems high. What ", "would you like to do?"), said
+    )
+
+    first = "So your mood seems high."
+    assert sum(f.duration for f in frames[:-1]) == pytest.approx(
+        len(first) * 0.02, abs=0.02
+    )
+    assert frames[-1] == "fallback frame"
+    assert said == ["What would you like to do?"]
+    assert (speech.stats.misses, speech.stats.sentences) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_reply_without_text_keeps_prepared_audio(silence_tts):
+    speech = SpeculativeSpeech(PhraseCache(voice="v"), silence_tts(delay=0.05))
+    speech.prepare(RECAP)
+    assert await _frames(speech, _text(), []) == []
+    assert speech.pending
+
+    speech.discard()
+    assert speech.stats.unused == 1
@@ -0,0 +1,104 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from wellness import SQLiteStore
+
+
+def _write_checkins(path, worker, count):
+    store = SQLiteStore(path)
+    for i in range(count):
+        store.append({"user_id": f"user-{worker}", "mood": str(i)})
+    store.close()
+
+
+def test_last_and_between_by_user(tmp_path):
+    store = SQLiteStore(str(tmp_path / "wellness.db"))
+    for day in range(1, 6):
+        store.append(
+            {
+                "user_id": "alex" if day % 2 else "sam",
+                "mood": str(day),
+                "timestamp": f"2025-11-0{day}T09:00:00",
+            }
+        )
+
+    assert len(store) == 5
+    assert [r["mood"] for r in store.last(2)] == ["4", "5"]
+    assert [r["mood"] for r in store.last(2, user_id="sam")] == ["2", "4"]
+    window = store.between(
+        datetime.datetime(2025, 11, 2), datetime.datetime(2025, 11, 5), user_id="alex"
+    )
+    assert [r["mood"] for r in window] == ["3"]
+
+
+def test_concurrent_writers_do_not_lose_checkins(tmp_path, run_processes):
+    path = str(tmp_path / "wellness.db")
+    SQLiteStore(path).close()
+
+    run_processes(_write_checkins, [(path, w, 25) for w in range(4)])
+
+    assert len(SQLiteStore(path)) == 100
+
+
+def test_import_legacy_log_once(tmp_path):
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(json.dumps([{"mood": "good"}, {"mood": "happy"}]))
+    store = SQLiteStore(str(tmp_path / "wellness.db"))
+
+    assert store.import_log(str(legacy)) == 2
+    assert store.import_log(str(legacy)) == 0
+    assert [r["mood"] for r in store] == ["good", "happy"]
+
+
+def test_import_leaves_the_source_journal_untouched(tmp_path):
+    journal = tmp_path / "wellness_log.jsonl"
+    contents = b'{"mood":"4"}\n{"mood":"3"}\n{"mood":"2", "goa'
+    journal.write_bytes(contents)
+    store = SQLiteStore(str(tmp_path / "wellness.db"))
+
+    assert store.import_log(str(journal)) == 2
+    assert journal.read_bytes() == contents
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["wellness_log.jsonl", "wellness.db", "wellness.db-shm", "wellness.db-wal"]
+    )
+
+
+def test_reads_do_not_wait_for_a_blocked_write(tmp_path):
+    path = str(tmp_path / "wellness.db")
+    store = SQLiteStore(path, busy_timeout=2.0)
+    store.append({"user_id": "alex", "mood": "3"})
+    # Another process holds the write lock, so this append waits
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    writer = threading.Thread(target=store.append, args=({"mood": "4"},))
+    writer.start()
+    time.sleep(0.1)
+
+    started = time.perf_counter()
+    assert [r["mood"] for r in store.last(1, user_id="alex")] == ["3"]
+    assert store.trend("alex").count == 1
+    assert time.perf_counter() - started < 0.5
+
+    other.execute("ROLLBACK")
+    writer.join()
+    assert len(store) == 2
+
+
+def test_scans_use_the_busy_timeout(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "wellness.db"), busy_timeout=0.5)
+    store.append({"mood": "3"})
+    timeouts = []
+    connect = sqlite3.connect
+
+    def recording_connect(*args, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, "connect", recording_connect)
+    assert [r["mood"] for r in store] == ["3"]
+    assert timeouts == [0.5]
+    store.close()
@@ -0,0 +1,51 @@
+import pytest
+
+from wellness.tokenizer import EarlyChunkTokenizer, first_chunk_end
+
+
+def test_first_chunk_end():
+    assert first_chunk_end("Welcome back! How", 2, 8) == len("Welcome back!")
+    # A single word before the comma is too short a first chunk
+    assert first_chunk_end("Okay, so how is your", 2, 8) is None
+    assert first_chunk_end("one two three four five", 2, 3) == len("one two three")
+    # The last word may still be arriving
+    assert first_chunk_end("Glad to hear", 2, 8) is None
+
+
+async def _tokens(tokenizer, pieces):
+    stream = tokenizer.stream()
+    for piece in pieces:
+        stream.push_text(piece)
+    stream.end_input()
+    return [ev.token async for ev in stream]
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_is_sent_before_the_sentence_ends():
+    tokenizer = EarlyChunkTokenizer()
+    stream = tokenizer.stream()
+    stream.push_text("I hear you, mornings like ")
+    assert (await stream.__anext__()).token == "I hear you,"
+    await stream.aclose()
+
+    pieces = ["I hear you, mornings like that ", "can be rough. Would it ", "help?"]
+    assert await _tokens(tokenizer, pieces) == [
+        "I hear you,",
+        "mornings like that can be rough.",
+        "Would it help?",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_each_segment_gets_an_early_chunk():
+    stream = EarlyChunkTokenizer(max_words=3).stream()
+    stream.push_text("one two three four. ")
+    stream.flush()
+    stream.push_text("five six seven eight")
+    stream.end_input()
+    assert [ev.token async for ev in stream] == [
+        "one two three",
+        "four.",
+        "five six seven",
+        "eight",
+    ]
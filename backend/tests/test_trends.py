@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from wellness import CheckinJournal, PartitionedJournalStore, SQLiteStore, TrendSummary
+from wellness.trends import scale_value, split_goals
+
+START = datetime.datetime(2025, 11, 1, 9, 0)
+
+
+def checkin(day, mood, goals="walk, read", user_id="alex"):
+    return {
+        "user_id": user_id,
+        "mood": str(mood),
+        "energy": "3",
+        "stress": "2",
+        "goals": goals,
+        "timestamp": (START + datetime.timedelta(days=day)).isoformat(),
+    }
+
+
+def test_scale_and_goal_parsing():
+    assert scale_value("4") == 4
+    assert scale_value("four out of five") == 4
+    assert scale_value(5) == 5
+    assert scale_value("great") is None
+    assert scale_value("9") is None
+    assert scale_value("honestly") is None
+    assert scale_value("network") is None
+    assert split_goals("Go for a walk, read; and to meditate") == [
+        "go for a walk",
+        "read",
+        "meditate",
+    ]
+
+
+def test_summary_tracks_averages_streaks_and_goals():
+    trend = TrendSummary()
+    for day in (0, 1, 2, 5, 6):
+        trend.update(checkin(day, mood=day % 5 + 1))
+
+    assert trend.count == 5
+    assert trend.latest["mood"] == 2
+    assert 1 <= trend.averages["mood"] <= 5
+    assert (trend.streak, trend.best_streak) == (2, 3)
+    assert trend.recurring_goals() == [("read", 5), ("walk", 5)]
+
+    now = (START + datetime.timedelta(days=8)).timestamp()
+    text = trend.describe(now=now)
+    assert "5 previous check-ins, the last one 2 days ago" in text
+    assert "Daily streak 0 (best 3)" in text
+
+
+def test_summary_size_does_not_grow_with_history():
+    trend = TrendSummary(max_goals=5)
+    for day in range(2000):
+        trend.update(checkin(day, mood=3, goals=f"goal {day}, walk"))
+    assert len(trend.goals) == 5
+    assert trend.recurring_goals(1) == [("walk", 2000)]
+    assert len(trend.describe(max_chars=200)) <= 200
+
+
+@pytest.mark.parametrize("backend", ["journal", "sqlite", "partitioned"])
+def test_store_trend_is_updated_incrementally(tmp_path, backend):
+    def open_store():
+        if backend == "sqlite":
+            return SQLiteStore(str(tmp_path / "wellness.db"))
+        if backend == "partitioned":
+            return PartitionedJournalStore(str(tmp_path / "log"))
+        return CheckinJournal(str(tmp_path / "log.jsonl"))
+
+    store = open_store()
+    store.append_many([checkin(day, mood=4) for day in range(3)])
+    store.append(checkin(0, mood=1, user_id="sam"))
+    assert store.trend("alex").count == 3
+
+    # Reopened: the stored summary only needs the newer check-in folded in
+    store.close()
+    store = open_store()
+    store.append(checkin(3, mood=2))
+    trend = store.trend("alex")
+
+    expected = TrendSummary()
+    for day, mood in ((0, 4), (1, 4), (2, 4), (3, 2)):
+        expected.update(checkin(day, mood=mood))
+    assert trend.to_dict() == expected.to_dict()
+    assert store.trend("sam").count == 1
+    assert store.trend("nobody").count == 0
@@ -0,0 +1,86 @@
+import wave
+
+import pytest
+
+from wellness.tts_cache import PhraseCache, _Clip
+
+
+async def _duration(cache, engine, text):
+    return sum([frame.duration async for frame in cache.audio(engine, text)])
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_memory(silence_tts):
+    engine = silence_tts()
+    cache = PhraseCache(voice="v", style="s")
+
+    first = await _duration(cache, engine, "hello")
+    second = await _duration(cache, engine, "hello")
+
+    assert engine.calls == 1
+    assert first >= 0.1
+    assert second == pytest.approx(first)
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_phrase(silence_tts):
+    engine = silence_tts()
+    cache = PhraseCache(voice="v")
+    await _duration(cache, engine, "aaaaa")
+    # Room for two clips of the same length
+    cache.max_bytes = cache.stats.bytes * 5 // 2
+
+    for text in ["bbbbb", "ccccc"]:
+        await _duration(cache, engine, text)
+
+    assert "aaaaa" not in cache
+    assert "ccccc" in cache
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_restart(tmp_path, silence_tts):
+    engine = silence_tts()
+    await PhraseCache(voice="v", disk_dir=str(tmp_path)).warm(engine, ["hi", "bye"])
+
+    restarted = PhraseCache(voice="v", disk_dir=str(tmp_path))
+    assert restarted.load_disk(["hi", "bye", "unseen"]) == 2
+    assert await _duration(restarted, engine, "bye") >= 0.06
+    assert engine.calls == 2
+
+    other_voice = PhraseCache(voice="w", disk_dir=str(tmp_path))
+    assert other_voice.load_disk(["hi"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_empty_audio_is_not_cached(tmp_path, silence_tts):
+    engine = silence_tts(ms_per_char=0)
+    cache = PhraseCache(voice="v", disk_dir=str(tmp_path))
+
+    assert await cache.warm(engine, ["hi"]) == 0
+    assert "hi" not in cache
+    assert list(tmp_path.iterdir()) == []
+    with pytest.raises(ValueError):
+        cache._write_disk(cache.key("hi"), _Clip(b"", 16000, 1))
+
+
+@pytest.mark.asyncio
+async def test_empty_disk_entries_are_synthesized_again(tmp_path, silence_tts):
+    cache = PhraseCache(voice="v", disk_dir=str(tmp_path))
+    with wave.open(str(tmp_path / f"{cache.key('hi')}.wav"), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(16000)
+
+    assert cache.load_disk(["hi"]) == 0
+    assert await cache.warm(silence_tts(), ["hi"]) == 1
+    assert await _duration(cache, silence_tts(), "hi") >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_disk_writes_leave_no_temporary_files(tmp_path, silence_tts):
+    cache = PhraseCache(voice="v", disk_dir=str(tmp_path))
+    await cache.warm(silence_tts(), ["hi", "bye"])
+
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".wav", ".wav"]
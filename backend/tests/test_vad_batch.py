@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+from livekit import rtc
+from livekit.agents import vad
+from livekit.plugins import silero
+from livekit.plugins.silero import onnx_model
+
+from wellness.vad_batch import BatchedModel, VADBatcher, load_batched_vad
+
+WINDOW = 512
+CONTEXT = 64
+
+
+def _audio(seed, windows):
+    rng = np.random.default_rng(seed)
+    t = np.arange(WINDOW * windows) / 16000
+    tone = np.sin(2 * np.pi * (150 + 50 * seed) * t) * np.sin(2 * np.pi * 3 * t)
+    return (0.3 * tone + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def _reference(session, samples):
+    """Window by window through the plugin's own model"""
+    model = onnx_model.OnnxModel(onnx_session=session, sample_rate=16000)
+    return [
+        model(samples[start : start + WINDOW])
+        for start in range(0, samples.size, WINDOW)
+    ]
+
+
+def _speech(seconds):
+    """A voiced, harmonic tone in bursts, which Silero takes for speech"""
+    t = np.arange(int(16000 * seconds)) / 16000
+    voiced = np.sin(2 * np.pi * 0.4 * t) > 0
+    phase = 2 * np.pi * np.cumsum(140 + 30 * np.sin(2 * np.pi * 3 * t)) / 16000
+    tone = sum(np.sin(k * phase) / k for k in range(1, 12))
+    audio = tone * voiced * (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    return (audio / np.abs(audio).max() * 0.5 * 32767).astype(np.int16)
+
+
+@pytest.fixture(scope="module")
+def session():
+    return onnx_model.new_inference_session(True)
+
+
+async def test_batches_streams_and_matches_one_at_a_time(session):
+    batcher = VADBatcher(session, tick=0.01)
+    audio = [_audio(seed, 6) for seed in range(3)]
+
+    async def run(samples):
+        model = BatchedModel(batcher)
+        return [
+            await batcher.infer(model, samples[start : start + WINDOW])
+            for start in range(0, samples.size, WINDOW)
+        ]
+
+    results = await asyncio.gather(*(run(samples) for samples in audio))
+    batcher.close()
+
+    for samples, probs in zip(audio, results):
+        assert probs == pytest.approx(_reference(session, samples), abs=1e-5)
+    assert batcher.stats.windows == 18
+    assert batcher.stats.batches < 18
+    assert batcher.stats.largest == 3
+
+
+def test_serves_streams_of_several_event_loops(session):
+    batcher = VADBatcher(session, tick=0.01)
+    results = {}
+
+    def job(seed):
+        async def run():
+            model = BatchedModel(batcher)
+            samples = _audio(seed, 4)
+            return [
+                await batcher.infer(model, samples[start : start + WINDOW])
+                for start in range(0, samples.size, WINDOW)
+            ]
+
+        results[seed] = asyncio.run(run())
+
+    threads = [threading.Thread(target=job, args=(seed,)) for seed in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    for seed in range(2):
+        assert results[seed] == pytest.approx(
+            _reference(session, _audio(seed, 4)), abs=1e-5
+        )
+
+
+async def test_batched_vad_streams_emit_inference_events():
+    silero_vad = load_batched_vad(tick=0.01)
+    assert load_batched_vad(tick=0.01).batcher is silero_vad.batcher
+    windows_before = silero_vad.batcher.stats.windows
+
+    async def run(seed):
+        stream = silero_vad.stream()
+        samples = (_audio(seed, 10) * 32767).astype(np.int16)
+        for start in range(0, samples.size, WINDOW):
+            frame = rtc.AudioFrame(
+                samples[start : start + WINDOW].tobytes(), 16000, 1, WINDOW
+            )
+            stream.push_frame(frame)
+        stream.end_input()
+        events = [ev async for ev in stream]
+        return [ev for ev in events if ev.type == vad.VADEventType.INFERENCE_DONE]
+
+    results = await asyncio.gather(run(0), run(1))
+
+    assert [len(events) for events in results] == [10, 10]
+    assert all(0.0 <= ev.probability <= 1.0 for ev in results[0])
+    assert silero_vad.batcher.stats.windows - windows_before == 20
+
+
+async def test_batched_and_plugin_streams_make_the_same_decisions():
+    pcm = _speech(8)
+
+    async def run(detector):
+        stream = detector.stream()
+        for start in range(0, pcm.size, 160):
+            stream.push_frame(
+                rtc.AudioFrame(pcm[start : start + 160].tobytes(), 16000, 1, 160)
+            )
+        stream.end_input()
+        return [ev async for ev in stream]
+
+    plugin = await run(silero.VAD.load())
+    batched = await run(load_batched_vad(tick=0.01))
+
+    def decisions(events):
+        return [
+            (ev.type, ev.samples_index, ev.speaking, len(ev.frames[0].data))
+            for ev in events
+            if ev.type != vad.VADEventType.INFERENCE_DONE
+        ]
+
+    def probabilities(events):
+        return [
+            ev.probability
+            for ev in events
+            if ev.type == vad.VADEventType.INFERENCE_DONE
+        ]
+
+    assert len(decisions(plugin)) > 2  # speech started and ended
+    assert decisions(batched) == decisions(plugin)
+    assert probabilities(batched) == pytest.approx(probabilities(plugin), abs=1e-6)
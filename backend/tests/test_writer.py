@@ -0,0 +1,77 @@
+import asyncio
+import time
+
+import pytest
+
+from wellness import CheckinJournal, PersistenceWriter, WriterFullError
+
+
+@pytest.mark.asyncio
+async def test_submit_and_drain(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    writer = PersistenceWriter(journal, fsync_policy="always")
+
+    await asyncio.gather(*(writer.submit({"mood": str(i)}) for i in range(50)))
+    await writer.drain(timeout=5)
+
+    assert len(journal) == 50
+    assert writer.stats.written == 50
+    assert writer.stats.batches <= 50
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_queue_is_full(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    writer = PersistenceWriter(journal, max_queue=2, fsync_policy="never")
+
+    for i in range(20):
+        await writer.submit({"mood": str(i)})
+    await writer.drain(timeout=5)
+
+    assert [r["mood"] for r in journal.last(2)] == ["18", "19"]
+    writer.close()
+
+
+@pytest.mark.asyncio
+async def test_submit_gives_up_when_the_store_does_not_keep_up(tmp_path):
+    journal = _SlowJournal(str(tmp_path / "log.jsonl"))
+    writer = PersistenceWriter(
+        journal, max_queue=1, fsync_policy="never", put_timeout=0.05
+    )
+
+    with pytest.raises(WriterFullError, match=r"\(1 waiting\) after 0.05s"):
+        for i in range(4):
+            await writer.submit({"mood": str(i)})
+    await writer.drain(timeout=5)
+    writer.close()
+
+
+def test_rejects_unknown_fsync_policy(tmp_path):
+    journal = CheckinJournal(str(tmp_path / "log.jsonl"))
+    with pytest.raises(ValueError):
+        PersistenceWriter(journal, fsync_policy="sometimes")
+
+
+class _SlowJournal(CheckinJournal):
+    def append_many(self, records, *, fsync=None):
+        time.sleep(0.3)
+        super().append_many(records, fsync=fsync)
+
+
+@pytest.mark.asyncio
+async def test_drain_times_out_without_blocking(tmp_path):
+    journal = _SlowJournal(str(tmp_path / "log.jsonl"))
+    writer = PersistenceWriter(journal, fsync_policy="always")
+    await writer.submit({"mood": "1"})
+
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        await writer.drain(timeout=0.05)
+    assert time.perf_counter() - started < 0.2
+    assert writer.pending() == 1
+
+    await writer.drain(timeout=5)
+    assert writer.pending() == 0
+    assert len(journal) == 1
+    writer.close()